@@ -6,16 +6,19 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.views import APIView
+from moto_maintenance.roteamento import LeituraAnaliticaMixin
 from motos.models import Moto
 from manutencoes.models import Manutencao
+from manutencoes.services.hodometro_service import HodometroService
 from datetime import datetime, timedelta
+from django.utils.dateparse import parse_date, parse_datetime
 from django.db.models import Count, Sum, Avg
 from django.db.models.functions import TruncMonth
 
 
-class AnaliseViewSet(viewsets.ViewSet):
+class AnaliseViewSet(LeituraAnaliticaMixin, viewsets.ViewSet):
     """
-    ViewSet for analysis operations.
+    ViewSet for analysis operations (read from the replica when configured).
     """
     permission_classes = [AllowAny]  # Temporário para desenvolvimento
     """
@@ -60,6 +63,51 @@ class AnaliseViewSet(viewsets.ViewSet):
                 'message': f'Erro ao analisar gastos mensais: {str(e)}'
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
     
+    @action(detail=False, methods=['get'])
+    def km_na_data(self, request):
+        """
+        Return the interpolated odometer of motorcycles at given dates.
+
+        `moto_ids` and `datas` are comma-separated lists (dates as
+        YYYY-MM-DD or ISO datetimes); every combination is answered from one
+        batched load of the odometer history.
+        """
+        try:
+            moto_ids = [int(valor) for valor in request.query_params.get('moto_ids', '').split(',') if valor]
+            datas = []
+            for valor in request.query_params.get('datas', '').split(','):
+                if not valor:
+                    continue
+                momento = parse_datetime(valor) or parse_date(valor)
+                if momento is None:
+                    raise ValueError(valor)
+                datas.append((valor, momento))
+        except ValueError:
+            return Response({
+                'success': False,
+                'message': 'moto_ids deve conter números inteiros e datas, datas válidas'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        if not moto_ids or not datas:
+            return Response({
+                'success': False,
+                'message': 'Os parâmetros moto_ids e datas são obrigatórios'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        historicos = HodometroService.carregar(moto_ids)
+        dados = []
+        for moto_id in moto_ids:
+            kms = historicos[moto_id].kms_em(momento for _, momento in datas)
+            dados.append({
+                'moto_id': moto_id,
+                'km': {valor: round(km) if km is not None else None for (valor, _), km in zip(datas, kms)}
+            })
+
+        return Response({
+            'success': True,
+            'data': dados
+        })
+    
     @action(detail=False, methods=['get'])
     def gastos_por_moto(self, request):
         """
@@ -0,0 +1,139 @@
+"""
+API Views for Arquivos app.
+"""
+import io
+import re
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.http import FileResponse, Http404, HttpResponseRedirect
+from rest_framework import mixins, viewsets, status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from . import armazenamento, imagens
+from .models import SessaoUpload
+from .serializers import SessaoUploadSerializer
+
+
+CONTENT_RANGE = re.compile(r'^bytes (\d+)-(\d+)/(\d+)$')
+
+
+class SessaoUploadViewSet(mixins.CreateModelMixin,
+                          mixins.RetrieveModelMixin,
+                          mixins.DestroyModelMixin,
+                          viewsets.GenericViewSet):
+    """
+    Resumable chunked uploads.
+
+    POST opens a session (`nome_original`, `tamanho_total`, `destino`,
+    `objeto_id`); each PUT sends the raw bytes of one part with
+    `Content-Range: bytes <inicio>-<fim>/<total>`; GET tells where to
+    resume. The last part stores the file by content hash and attaches it
+    to the destination field.
+    """
+    serializer_class = SessaoUploadSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        """
+        Return the current user's upload sessions.
+        """
+        return SessaoUpload.objects.filter(usuario=self.request.user).select_related('conteudo')
+
+    def perform_create(self, serializer):
+        """
+        Set the owner when saving.
+        """
+        serializer.save(usuario=self.request.user)
+
+    def update(self, request, *args, **kwargs):
+        """
+        Receive one part of the file, streamed straight to disk.
+        """
+        sessao = self.get_object()
+        if sessao.estado != 'em_andamento':
+            return Response({
+                'success': False,
+                'message': f'O upload está {sessao.estado}'
+            }, status=status.HTTP_409_CONFLICT)
+
+        intervalo = CONTENT_RANGE.match(request.META.get('HTTP_CONTENT_RANGE', ''))
+        if not intervalo:
+            return Response({
+                'success': False,
+                'message': 'Cabeçalho Content-Range (bytes inicio-fim/total) obrigatório'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        inicio, fim, total = (int(valor) for valor in intervalo.groups())
+        if fim < inicio or total != sessao.tamanho_total:
+            return Response({
+                'success': False,
+                'message': 'Content-Range inválido'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        if fim - inicio + 1 > settings.ARQUIVOS_TAMANHO_PARTE:
+            return Response({
+                'success': False,
+                'message': f'As partes são limitadas a {settings.ARQUIVOS_TAMANHO_PARTE} bytes'
+            }, status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+
+        try:
+            sessao = armazenamento.receber_parte(
+                sessao, inicio, request.stream or io.BytesIO(), fim - inicio + 1
+            )
+        except armazenamento.PosicaoInvalida as e:
+            return Response({
+                'success': False,
+                'message': str(e),
+                'recebido': e.recebido
+            }, status=status.HTTP_409_CONFLICT)
+        except armazenamento.UploadInvalido as e:
+            return Response({
+                'success': False,
+                'message': str(e)
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            'success': True,
+            'data': self.get_serializer(sessao).data
+        })
+
+    def perform_destroy(self, instance):
+        """
+        Cancel the upload and remove the partial file.
+        """
+        armazenamento.cancelar(instance)
+        instance.delete()
+
+
+class ImagemAPIView(APIView):
+    """
+    Serve a resized rendition (`tamanho`, `formato`) of an uploaded image.
+
+    URLs carry `?v=<source hash>`, so the response never changes and is
+    cached as immutable; an outdated `v` redirects to the current one.
+    Renditions include maintenance photos, so they need an authenticated
+    user (like the history endpoints) and are only cached by the browser.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, tamanho, formato, nome):
+        if tamanho not in imagens.TAMANHOS or formato not in imagens.FORMATOS:
+            raise Http404
+        if not imagens.imagem_permitida(nome) or not default_storage.exists(nome):
+            raise Http404
+
+        sha256 = imagens.hash_origem(nome)
+        if sha256 is None:
+            raise Http404
+        versao = request.query_params.get('v')
+        if versao and versao != sha256[:16]:
+            return HttpResponseRedirect(f'{request.path}?v={sha256[:16]}')
+
+        caminho = imagens.gerar_rendicao(nome, sha256, tamanho, formato)
+        resposta = FileResponse(open(caminho, 'rb'), content_type=f'image/{formato}')
+        resposta['ETag'] = f'"{sha256[:16]}-{tamanho}-{formato}"'
+        if versao:
+            resposta['Cache-Control'] = f'private, max-age={imagens.CACHE_IMUTAVEL}, immutable'
+        else:
+            resposta['Cache-Control'] = 'private, max-age=300'
+        return resposta
@@ -0,0 +1,295 @@
+"""
+Uploads em partes (retomáveis) com armazenamento endereçado por conteúdo.
+
+O cliente abre uma SessaoUpload e envia o arquivo em partes com
+Content-Range. Cada parte vai direto do corpo da requisição para o arquivo
+parcial, atualizando o SHA-256 no caminho. Ao receber o último byte o
+arquivo é validado e movido para arquivos/<hash>, de modo que conteúdos
+iguais (a mesma nota fiscal anexada duas vezes) são guardados uma só vez.
+"""
+import hashlib
+import os
+import threading
+from datetime import timedelta
+from typing import Dict, Optional, Tuple
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files import File, locks
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from PIL import Image, UnidentifiedImageError
+from .imagens import preaquecer
+from .models import ArquivoConteudo, SessaoUpload
+from .signals import arquivo_anexado
+
+
+TAMANHO_BLOCO = 64 * 1024
+
+TIPOS_IMAGEM = ('image/jpeg', 'image/png', 'image/webp')
+TIPOS_DOCUMENTO = ('application/pdf',) + TIPOS_IMAGEM
+
+# Campos que aceitam upload: destino -> (modelo, campo, tipos aceitos)
+DESTINOS = {
+    'moto.imagem_principal': ('motos.Moto', 'imagem_principal', TIPOS_IMAGEM),
+    'moto.documento_compra': ('motos.Moto', 'documento_compra', TIPOS_DOCUMENTO),
+    'perfil.imagem_perfil': ('motos.PerfilMoto', 'imagem_perfil', TIPOS_IMAGEM),
+    'perfil.documento_perfil': ('motos.PerfilMoto', 'documento_perfil', TIPOS_DOCUMENTO),
+    'item_utilizado.nota_fiscal': ('manutencoes.ItemManutencaoRealizada', 'nota_fiscal', TIPOS_DOCUMENTO),
+    'historico.fotos_antes': ('manutencoes.HistoricoManutencao', 'fotos_antes', TIPOS_IMAGEM),
+    'historico.fotos_depois': ('manutencoes.HistoricoManutencao', 'fotos_depois', TIPOS_IMAGEM),
+    'historico.relatorio_tecnico': ('manutencoes.HistoricoManutencao', 'relatorio_tecnico', TIPOS_DOCUMENTO),
+    'analise_visual.imagem_original': ('analises.AnaliseVisual', 'imagem_original', TIPOS_IMAGEM),
+}
+
+EXTENSOES = {
+    'application/pdf': '.pdf',
+    'image/jpeg': '.jpg',
+    'image/png': '.png',
+    'image/webp': '.webp',
+}
+
+FORMATOS_PIL = {'JPEG': 'image/jpeg', 'PNG': 'image/png', 'WEBP': 'image/webp'}
+
+
+class UploadInvalido(Exception):
+    """Arquivo recusado (tipo, tamanho ou imagem inválida)"""
+
+
+class PosicaoInvalida(Exception):
+    """A parte não começa onde o upload parou"""
+
+    def __init__(self, recebido: int):
+        super().__init__(f'Upload parado em {recebido} bytes')
+        self.recebido = recebido
+
+
+def detectar_tipo(cabecalho: bytes) -> Optional[str]:
+    """Identifica o tipo pelos primeiros bytes, sem confiar no nome ou no Content-Type"""
+    if cabecalho.startswith(b'%PDF-'):
+        return 'application/pdf'
+    if cabecalho.startswith(b'\xff\xd8\xff'):
+        return 'image/jpeg'
+    if cabecalho.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'image/png'
+    if cabecalho[:4] == b'RIFF' and cabecalho[8:12] == b'WEBP':
+        return 'image/webp'
+    return None
+
+
+def obter_destino(destino: str, objeto_id: int):
+    """Retorna (instância, campo, tipos aceitos) ou levanta UploadInvalido"""
+    if destino not in DESTINOS:
+        raise UploadInvalido('Destino inválido')
+    modelo, campo, tipos = DESTINOS[destino]
+    modelo = apps.get_model(modelo)
+    filtros = {'pk': objeto_id}
+    if any(field.name == 'ativo' for field in modelo._meta.fields):
+        filtros['ativo'] = True
+    instancia = modelo.objects.filter(**filtros).first()
+    if instancia is None:
+        raise UploadInvalido('Objeto de destino não encontrado')
+    return instancia, campo, tipos
+
+
+def caminho_parcial(sessao: SessaoUpload) -> str:
+    return os.path.join(settings.ARQUIVOS_DIRETORIO_PARCIAL, f'{sessao.pk}.part')
+
+
+# SHA-256 parcial de cada sessão: id -> (bytes já somados, hash). Se o
+# processo reiniciar ou a parte cair em outro worker, o hash é refeito a
+# partir do arquivo parcial.
+_hashes: Dict[str, Tuple[int, 'hashlib._Hash']] = {}
+_hashes_lock = threading.Lock()
+
+
+def _hash_ate(sessao: SessaoUpload):
+    with _hashes_lock:
+        posicao, sha = _hashes.pop(str(sessao.pk), (None, None))
+    if posicao == sessao.recebido:
+        return sha
+
+    sha = hashlib.sha256()
+    restante = sessao.recebido
+    if restante:
+        with open(caminho_parcial(sessao), 'rb') as parcial:
+            while restante:
+                bloco = parcial.read(min(TAMANHO_BLOCO, restante))
+                if not bloco:
+                    raise PosicaoInvalida(0)
+                sha.update(bloco)
+                restante -= len(bloco)
+    return sha
+
+
+def _guardar_hash(sessao: SessaoUpload, sha) -> None:
+    with _hashes_lock:
+        _hashes[str(sessao.pk)] = (sessao.recebido, sha)
+
+
+def _descartar(sessao: SessaoUpload) -> None:
+    with _hashes_lock:
+        _hashes.pop(str(sessao.pk), None)
+    try:
+        os.remove(caminho_parcial(sessao))
+    except FileNotFoundError:
+        pass
+
+
+def receber_parte(sessao: SessaoUpload, inicio: int, fluxo, tamanho: int) -> SessaoUpload:
+    """
+    Grava uma parte do upload a partir de `fluxo` (lido em blocos)
+
+    A parte precisa começar exatamente em `sessao.recebido`; caso contrário
+    PosicaoInvalida informa de onde o cliente deve continuar. Ao completar o
+    arquivo, ele é finalizado e anexado ao destino.
+
+    O arquivo parcial fica travado (lock exclusivo) do momento em que a
+    posição é conferida até o avanço de `recebido` ser gravado: uma parte
+    repetida pelo cliente, concorrente com a seguinte, espera e é recusada
+    em vez de sobrescrever bytes já aceitos.
+    """
+    if inicio + tamanho > sessao.tamanho_total:
+        raise UploadInvalido('A parte ultrapassa o tamanho declarado')
+
+    os.makedirs(settings.ARQUIVOS_DIRETORIO_PARCIAL, exist_ok=True)
+    # 'a+b' cria o arquivo sem truncar: nada é alterado antes do lock
+    with open(caminho_parcial(sessao), 'a+b') as parcial:
+        locks.lock(parcial, locks.LOCK_EX)
+        try:
+            # Posição de quem gravou por último, lida já com o lock
+            sessao.refresh_from_db(fields=['recebido', 'estado'])
+            if sessao.estado != 'em_andamento' or inicio != sessao.recebido:
+                raise PosicaoInvalida(sessao.recebido)
+
+            sha = _hash_ate(sessao)
+            # Descarta sobras de uma parte interrompida; em modo append as
+            # escritas seguem a partir daqui
+            parcial.truncate(inicio)
+            gravados = 0
+            while gravados < tamanho:
+                bloco = fluxo.read(min(TAMANHO_BLOCO, tamanho - gravados))
+                if not bloco:
+                    break
+                if inicio == 0 and gravados == 0:
+                    _validar_cabecalho(sessao, bloco)
+                parcial.write(bloco)
+                sha.update(bloco)
+                gravados += len(bloco)
+            parcial.flush()
+
+            if gravados != tamanho:
+                raise UploadInvalido('Corpo menor que o Content-Range informado')
+
+            # Só avança quem partiu da posição esperada (outro servidor, por exemplo)
+            if not SessaoUpload.objects.filter(pk=sessao.pk, recebido=inicio, estado='em_andamento').update(
+                recebido=inicio + gravados, atualizado_em=timezone.now()
+            ):
+                sessao.refresh_from_db()
+                raise PosicaoInvalida(sessao.recebido)
+            sessao.recebido = inicio + gravados
+        finally:
+            locks.unlock(parcial)
+
+    if sessao.recebido < sessao.tamanho_total:
+        _guardar_hash(sessao, sha)
+        return sessao
+    return finalizar(sessao, sha.hexdigest())
+
+
+def _validar_cabecalho(sessao: SessaoUpload, bloco: bytes) -> None:
+    """Recusa logo na primeira parte arquivos de tipo não aceito pelo destino"""
+    _, _, tipos = DESTINOS[sessao.destino]
+    if detectar_tipo(bloco[:16]) not in tipos:
+        cancelar(sessao)
+        raise UploadInvalido('Tipo de arquivo não aceito para este destino')
+
+
+def _ler_imagem(caminho: str, tipo: str) -> Tuple[int, int]:
+    """
+    Confere formato e dimensões pelo cabeçalho
+
+    Image.open() só lê o cabeçalho; os pixels não são decodificados aqui.
+    """
+    try:
+        with Image.open(caminho) as imagem:
+            formato = imagem.format
+            largura, altura = imagem.size
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError):
+        raise UploadInvalido('Imagem inválida')
+    if FORMATOS_PIL.get(formato) != tipo:
+        raise UploadInvalido('Imagem inválida')
+    if largura * altura > settings.ARQUIVOS_MAXIMO_PIXELS:
+        raise UploadInvalido('Imagem com resolução acima do permitido')
+    return largura, altura
+
+
+class _ArquivoParcial(File):
+    """Faz o FileSystemStorage mover o arquivo parcial em vez de copiá-lo"""
+
+    def temporary_file_path(self):
+        return self.name
+
+
+def finalizar(sessao: SessaoUpload, sha256: str) -> SessaoUpload:
+    """Valida o arquivo completo, guarda pelo hash e anexa ao destino"""
+    caminho = caminho_parcial(sessao)
+    try:
+        with open(caminho, 'rb') as parcial:
+            tipo = detectar_tipo(parcial.read(16))
+        largura = altura = None
+        if tipo in TIPOS_IMAGEM:
+            largura, altura = _ler_imagem(caminho, tipo)
+        instancia, campo, _ = obter_destino(sessao.destino, sessao.objeto_id)
+    except UploadInvalido:
+        cancelar(sessao)
+        raise
+
+    conteudo = ArquivoConteudo.objects.filter(sha256=sha256).first()
+    if conteudo is None:
+        nome = f'arquivos/{sha256[:2]}/{sha256}{EXTENSOES[tipo]}'
+        with open(caminho, 'rb') as parcial:
+            nome = default_storage.save(nome, _ArquivoParcial(parcial, name=caminho))
+        try:
+            conteudo = ArquivoConteudo.objects.create(
+                sha256=sha256, arquivo=nome, tamanho=sessao.tamanho_total,
+                tipo_conteudo=tipo, largura=largura, altura=altura,
+            )
+        except IntegrityError:
+            # Mesmo conteúdo finalizado em paralelo por outra sessão
+            default_storage.delete(nome)
+            conteudo = ArquivoConteudo.objects.get(sha256=sha256)
+    _descartar(sessao)
+
+    with transaction.atomic():
+        valores = {campo: conteudo.arquivo.name}
+        if any(field.name == 'atualizado_em' for field in type(instancia)._meta.fields):
+            valores['atualizado_em'] = timezone.now()
+        type(instancia).objects.filter(pk=instancia.pk).update(**valores)
+
+        sessao.estado = 'concluido'
+        sessao.conteudo = conteudo
+        sessao.save(update_fields=['estado', 'conteudo', 'recebido', 'atualizado_em'])
+
+    if tipo in TIPOS_IMAGEM:
+        # O UPDATE direto não dispara signals; as renditions são geradas aqui
+        preaquecer(conteudo.arquivo.name)
+    arquivo_anexado.send(sender=type(instancia), instance=instancia, campo=campo, conteudo=conteudo)
+    return sessao
+
+
+def cancelar(sessao: SessaoUpload) -> None:
+    """Cancela a sessão e apaga o arquivo parcial"""
+    _descartar(sessao)
+    SessaoUpload.objects.filter(pk=sessao.pk).update(estado='cancelado', atualizado_em=timezone.now())
+    sessao.estado = 'cancelado'
+
+
+def limpar_sessoes_expiradas(horas: int = 24) -> int:
+    """Cancela sessões sem atividade há mais de `horas` e apaga os parciais"""
+    limite = timezone.now() - timedelta(hours=horas)
+    expiradas = list(SessaoUpload.objects.filter(estado='em_andamento', atualizado_em__lt=limite))
+    for sessao in expiradas:
+        cancelar(sessao)
+    return len(expiradas)
@@ -0,0 +1,244 @@
+"""
+Versões reduzidas (renditions) das imagens enviadas.
+
+Cada imagem ganha miniaturas em tamanhos fixos, em WebP e JPEG, geradas sob
+demanda e guardadas em disco pela chave (hash do arquivo de origem, tamanho,
+formato). Como a URL leva o hash, o conteúdo de uma URL nunca muda e pode
+ser servido com cache imutável.
+"""
+import hashlib
+import logging
+import os
+import re
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.urls import reverse
+from PIL import Image, ImageOps
+
+
+logger = logging.getLogger(__name__)
+
+# Nome -> maior lado em pixels
+TAMANHOS = {
+    'miniatura': 160,
+    'media': 480,
+    'grande': 1080,
+}
+
+FORMATOS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+# Pastas de upload cujas imagens podem ter renditions
+PASTAS_PERMITIDAS = ('motos/', 'perfis/', 'arquivos/', 'manutencao/fotos_antes/', 'manutencao/fotos_depois/')
+EXTENSOES_IMAGEM = ('.jpg', '.jpeg', '.png', '.webp')
+
+# Nomes gravados pelo app arquivos já trazem o SHA-256 do conteúdo
+_NOME_ENDERECADO = re.compile(r'^arquivos/[0-9a-f]{2}/([0-9a-f]{64})\.\w+$')
+
+TAMANHO_BLOCO = 64 * 1024
+
+ORIENTACAO_EXIF = 0x0112
+
+# Um ano: o conteúdo de uma URL versionada nunca muda
+CACHE_IMUTAVEL = 365 * 24 * 60 * 60
+
+
+def imagem_permitida(nome: str) -> bool:
+    return (
+        bool(nome)
+        and nome.startswith(PASTAS_PERMITIDAS)
+        and nome.lower().endswith(EXTENSOES_IMAGEM)
+        and '..' not in nome.split('/')
+    )
+
+
+def hash_origem(nome: str, calcular: bool = True) -> Optional[str]:
+    """
+    SHA-256 do arquivo de origem
+
+    Para arquivos endereçados por conteúdo vem do próprio nome; para os
+    demais é calculado uma vez e guardado no cache junto com tamanho e data
+    de modificação, que invalidam a entrada se o arquivo for substituído.
+    Com `calcular=False` só consulta o cache (None se ainda não calculado).
+    """
+    encontrado = _NOME_ENDERECADO.match(nome)
+    if encontrado:
+        return encontrado.group(1)
+
+    try:
+        caminho = default_storage.path(nome)
+        estado = os.stat(caminho)
+    except (NotImplementedError, OSError):
+        return None
+    chave = 'imagem_hash:' + hashlib.md5(f'{nome}:{estado.st_size}:{estado.st_mtime_ns}'.encode()).hexdigest()
+    sha256 = cache.get(chave)
+    if sha256 is None and not calcular:
+        return None
+    if sha256 is None:
+        sha = hashlib.sha256()
+        with open(caminho, 'rb') as arquivo:
+            for bloco in iter(lambda: arquivo.read(TAMANHO_BLOCO), b''):
+                sha.update(bloco)
+        sha256 = sha.hexdigest()
+        cache.set(chave, sha256, timeout=None)
+    return sha256
+
+
+def caminho_rendicao(sha256: str, tamanho: str, formato: str) -> str:
+    extensao = 'jpg' if formato == 'jpeg' else formato
+    return os.path.join(settings.IMAGENS_DIRETORIO_CACHE, sha256[:2], f'{sha256}_{tamanho}.{extensao}')
+
+
+def gerar_rendicao(nome: str, sha256: str, tamanho: str, formato: str) -> str:
+    """Gera (se ainda não existir) a rendition e retorna o caminho em disco"""
+    destino = caminho_rendicao(sha256, tamanho, formato)
+    if os.path.exists(destino):
+        return destino
+
+    lado = TAMANHOS[tamanho]
+    formato_pil, opcoes = FORMATOS[formato]
+    # Pillow só grava EXIF quando recebe exif=...: as renditions saem sem
+    # metadados (GPS, câmera) e já na orientação correta
+    with Image.open(default_storage.path(nome)) as imagem:
+        # Em JPEG, draft() decodifica já reduzido (1/2, 1/4, 1/8)
+        imagem.draft('RGB', (lado, lado))
+        imagem = ImageOps.exif_transpose(imagem)
+        imagem.thumbnail((lado, lado), Image.Resampling.LANCZOS)
+        if formato_pil == 'JPEG' and imagem.mode != 'RGB':
+            imagem = imagem.convert('RGB')
+
+        os.makedirs(os.path.dirname(destino), exist_ok=True)
+        # Grava em arquivo temporário e renomeia: leitores nunca veem arquivo pela metade
+        descritor, temporario = tempfile.mkstemp(dir=os.path.dirname(destino), suffix='.tmp')
+        try:
+            with os.fdopen(descritor, 'wb') as saida:
+                imagem.save(saida, formato_pil, **opcoes)
+            os.replace(temporario, destino)
+        except BaseException:
+            os.unlink(temporario)
+            raise
+    return destino
+
+
+def montar_urls(nome: str, sha256: Optional[str], tamanhos=None) -> Dict[str, Dict[str, str]]:
+    """URLs das renditions de `nome`: {tamanho: {formato: url}}, versionadas quando há hash"""
+    versao = f'?v={sha256[:16]}' if sha256 else ''
+    return {
+        tamanho: {
+            formato: f"{reverse('api_imagem', args=[tamanho, formato, nome])}{versao}"
+            for formato in FORMATOS
+        }
+        for tamanho in (tamanhos or TAMANHOS)
+    }
+
+
+def urls_rendicoes(arquivo, tamanhos=None) -> Optional[Dict[str, Dict[str, str]]]:
+    """
+    URLs das renditions de um ImageField (None se não houver imagem)
+
+    Não lê o arquivo na requisição: imagens antigas, sem hash no cache,
+    saem com URLs sem versão (cache curto) e o hash é calculado em segundo
+    plano (ou pelo comando preaquecer_imagens).
+    """
+    if not arquivo or not imagem_permitida(arquivo.name):
+        return None
+    sha256 = hash_origem(arquivo.name, calcular=False)
+    if sha256 is None:
+        agendar_hash(arquivo.name)
+    return montar_urls(arquivo.name, sha256, tamanhos)
+
+
+def dimensoes(nome: str) -> Dict[str, int]:
+    """
+    Largura e altura já com a orientação EXIF aplicada
+
+    Lê só o cabeçalho (e o bloco EXIF); os pixels não são decodificados.
+    """
+    with Image.open(default_storage.path(nome)) as imagem:
+        largura, altura = imagem.size
+        orientacao = imagem.getexif().get(ORIENTACAO_EXIF, 1)
+    if orientacao in (5, 6, 7, 8):
+        largura, altura = altura, largura
+    return {'largura': largura, 'altura': altura, 'orientacao_exif': orientacao}
+
+
+def rendicoes_prontas(nome: str) -> bool:
+    sha256 = _NOME_ENDERECADO.match(nome) and hash_origem(nome)
+    if not sha256:
+        return False
+    return all(
+        os.path.exists(caminho_rendicao(sha256, tamanho, formato))
+        for tamanho in TAMANHOS for formato in FORMATOS
+    )
+
+
+# Pré-aquecimento em segundo plano, com fila limitada: se os workers estiverem
+# ocupados a tarefa é descartada e a rendition é gerada no primeiro acesso.
+_executor = ThreadPoolExecutor(max_workers=settings.IMAGENS_WORKERS, thread_name_prefix='imagens')
+_vagas = threading.BoundedSemaphore(settings.IMAGENS_WORKERS * 4)
+
+
+def executar_em_segundo_plano(funcao, *args) -> bool:
+    """Agenda `funcao` no pool de imagens; retorna False se a fila estiver cheia"""
+    if not _vagas.acquire(blocking=False):
+        return False
+
+    def _tarefa():
+        try:
+            funcao(*args)
+        except Exception:
+            logger.exception('Falha no processamento de imagem em segundo plano')
+        finally:
+            _vagas.release()
+
+    _executor.submit(_tarefa)
+    return True
+
+
+_hashes_agendados = set()
+_hashes_lock = threading.Lock()
+
+
+def agendar_hash(nome: str) -> bool:
+    """Calcula o hash de `nome` em segundo plano (uma tarefa por imagem de cada vez)"""
+    with _hashes_lock:
+        if nome in _hashes_agendados:
+            return False
+        _hashes_agendados.add(nome)
+
+    def _calcular():
+        try:
+            hash_origem(nome)
+        finally:
+            with _hashes_lock:
+                _hashes_agendados.discard(nome)
+
+    if not executar_em_segundo_plano(_calcular):
+        with _hashes_lock:
+            _hashes_agendados.discard(nome)
+        return False
+    return True
+
+
+def gerar_todas(nome: str) -> None:
+    sha256 = hash_origem(nome)
+    if sha256 is None:
+        return
+    for tamanho in TAMANHOS:
+        for formato in FORMATOS:
+            gerar_rendicao(nome, sha256, tamanho, formato)
+
+
+def preaquecer(nome: str) -> bool:
+    """Gera as renditions de uma imagem recém-enviada sem bloquear a requisição"""
+    if not imagem_permitida(nome) or rendicoes_prontas(nome):
+        return False
+    return executar_em_segundo_plano(gerar_todas, nome)
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from arquivos.armazenamento import limpar_sessoes_expiradas
+
+
+class Command(BaseCommand):
+    help = 'Cancela uploads em partes abandonados e apaga os arquivos parciais'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--horas', type=int, default=24,
+                            help='Horas sem atividade para considerar o upload abandonado (padrão: 24)')
+
+    def handle(self, *args, **options):
+        total = limpar_sessoes_expiradas(horas=options['horas'])
+        self.stdout.write(self.style.SUCCESS(f'{total} upload(s) cancelado(s).'))
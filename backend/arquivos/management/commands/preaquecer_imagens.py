@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from arquivos import imagens
+from motos.models import Moto, PerfilMoto
+
+
+class Command(BaseCommand):
+    help = 'Calcula o hash e gera as renditions das imagens de motos e perfis já enviadas'
+
+    def handle(self, *args, **options):
+        nomes = set(
+            Moto.objects.exclude(imagem_principal__isnull=True).exclude(imagem_principal='')
+            .values_list('imagem_principal', flat=True)
+        )
+        nomes.update(
+            PerfilMoto.objects.exclude(imagem_perfil__isnull=True).exclude(imagem_perfil='')
+            .values_list('imagem_perfil', flat=True)
+        )
+
+        total = 0
+        for nome in sorted(nomes):
+            if not imagens.imagem_permitida(nome):
+                continue
+            try:
+                imagens.gerar_todas(nome)
+            except Exception as erro:
+                self.stderr.write(f'{nome}: {erro}')
+                continue
+            total += 1
+        self.stdout.write(self.style.SUCCESS(f'{total} imagem(ns) processada(s).'))
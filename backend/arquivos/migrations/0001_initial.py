@@ -0,0 +1,57 @@
+# Generated by Django 5.2.6 on 2026-10-19 14:03
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArquivoConteudo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(max_length=64, unique=True, verbose_name='SHA-256')),
+                ('arquivo', models.FileField(max_length=255, upload_to='arquivos/', verbose_name='Arquivo')),
+                ('tamanho', models.PositiveBigIntegerField(verbose_name='Tamanho (bytes)')),
+                ('tipo_conteudo', models.CharField(max_length=100, verbose_name='Tipo de Conteúdo')),
+                ('largura', models.PositiveIntegerField(blank=True, null=True, verbose_name='Largura')),
+                ('altura', models.PositiveIntegerField(blank=True, null=True, verbose_name='Altura')),
+                ('criado_em', models.DateTimeField(auto_now_add=True, verbose_name='Criado em')),
+            ],
+            options={
+                'verbose_name': 'Conteúdo de Arquivo',
+                'verbose_name_plural': 'Conteúdos de Arquivo',
+            },
+        ),
+        migrations.CreateModel(
+            name='SessaoUpload',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('nome_original', models.CharField(max_length=255, verbose_name='Nome Original')),
+                ('tamanho_total', models.PositiveBigIntegerField(verbose_name='Tamanho Total (bytes)')),
+                ('recebido', models.PositiveBigIntegerField(default=0, verbose_name='Bytes Recebidos')),
+                ('destino', models.CharField(max_length=50, verbose_name='Destino')),
+                ('objeto_id', models.PositiveBigIntegerField(verbose_name='ID do Objeto')),
+                ('estado', models.CharField(choices=[('em_andamento', 'Em Andamento'), ('concluido', 'Concluído'), ('cancelado', 'Cancelado')], default='em_andamento', max_length=20, verbose_name='Estado')),
+                ('criado_em', models.DateTimeField(auto_now_add=True, verbose_name='Criado em')),
+                ('atualizado_em', models.DateTimeField(auto_now=True, verbose_name='Atualizado em')),
+                ('conteudo', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='sessoes', to='arquivos.arquivoconteudo')),
+                ('usuario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sessoes_upload', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Sessão de Upload',
+                'verbose_name_plural': 'Sessões de Upload',
+                'ordering': ['-criado_em'],
+                'indexes': [models.Index(fields=['estado', 'atualizado_em'], name='sessao_upload_estado_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,67 @@
+import uuid
+
+from django.contrib.auth.models import User
+from django.db import models
+
+
+class ArquivoConteudo(models.Model):
+    """Arquivo armazenado uma única vez, identificado pelo SHA-256 do conteúdo"""
+
+    sha256 = models.CharField('SHA-256', max_length=64, unique=True)
+    arquivo = models.FileField('Arquivo', upload_to='arquivos/', max_length=255)
+    tamanho = models.PositiveBigIntegerField('Tamanho (bytes)')
+    tipo_conteudo = models.CharField('Tipo de Conteúdo', max_length=100)
+
+    # Preenchidos para imagens (lidos do cabeçalho)
+    largura = models.PositiveIntegerField('Largura', blank=True, null=True)
+    altura = models.PositiveIntegerField('Altura', blank=True, null=True)
+
+    criado_em = models.DateTimeField('Criado em', auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Conteúdo de Arquivo'
+        verbose_name_plural = 'Conteúdos de Arquivo'
+
+    def __str__(self):
+        return f"{self.sha256[:12]} ({self.tipo_conteudo})"
+
+
+class SessaoUpload(models.Model):
+    """Upload em partes, retomável, de um arquivo destinado a um campo de modelo"""
+
+    ESTADO_CHOICES = [
+        ('em_andamento', 'Em Andamento'),
+        ('concluido', 'Concluído'),
+        ('cancelado', 'Cancelado'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    usuario = models.ForeignKey(User, on_delete=models.CASCADE, related_name='sessoes_upload')
+
+    # Arquivo enviado
+    nome_original = models.CharField('Nome Original', max_length=255)
+    tamanho_total = models.PositiveBigIntegerField('Tamanho Total (bytes)')
+    recebido = models.PositiveBigIntegerField('Bytes Recebidos', default=0)
+
+    # Campo de destino (ver arquivos.armazenamento.DESTINOS)
+    destino = models.CharField('Destino', max_length=50)
+    objeto_id = models.PositiveBigIntegerField('ID do Objeto')
+
+    estado = models.CharField('Estado', max_length=20, choices=ESTADO_CHOICES, default='em_andamento')
+    conteudo = models.ForeignKey(ArquivoConteudo, on_delete=models.SET_NULL, null=True, blank=True,
+                                 related_name='sessoes')
+
+    # Metadados
+    criado_em = models.DateTimeField('Criado em', auto_now_add=True)
+    atualizado_em = models.DateTimeField('Atualizado em', auto_now=True)
+
+    class Meta:
+        verbose_name = 'Sessão de Upload'
+        verbose_name_plural = 'Sessões de Upload'
+        ordering = ['-criado_em']
+        indexes = [
+            models.Index(fields=['estado', 'atualizado_em'], name='sessao_upload_estado_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.nome_original} ({self.recebido}/{self.tamanho_total})"
@@ -0,0 +1,52 @@
+"""
+Serializers for Arquivos app.
+"""
+from django.conf import settings
+from rest_framework import serializers
+from .armazenamento import UploadInvalido, obter_destino
+from .models import ArquivoConteudo, SessaoUpload
+
+
+class ArquivoConteudoSerializer(serializers.ModelSerializer):
+    """
+    Serializer for stored (content-addressed) files.
+    """
+
+    class Meta:
+        model = ArquivoConteudo
+        fields = ['sha256', 'arquivo', 'tamanho', 'tipo_conteudo', 'largura', 'altura']
+
+
+class SessaoUploadSerializer(serializers.ModelSerializer):
+    """
+    Serializer for chunked upload sessions.
+    """
+    conteudo = ArquivoConteudoSerializer(read_only=True)
+    tamanho_parte_maximo = serializers.SerializerMethodField()
+
+    class Meta:
+        model = SessaoUpload
+        fields = [
+            'id', 'nome_original', 'tamanho_total', 'recebido', 'destino', 'objeto_id',
+            'estado', 'conteudo', 'tamanho_parte_maximo', 'criado_em', 'atualizado_em'
+        ]
+        read_only_fields = ['id', 'recebido', 'estado', 'conteudo', 'criado_em', 'atualizado_em']
+
+    def get_tamanho_parte_maximo(self, obj):
+        return settings.ARQUIVOS_TAMANHO_PARTE
+
+    def validate_tamanho_total(self, value):
+        if value <= 0:
+            raise serializers.ValidationError('O arquivo está vazio.')
+        if value > settings.ARQUIVOS_TAMANHO_MAXIMO:
+            raise serializers.ValidationError(
+                f'O arquivo excede o limite de {settings.ARQUIVOS_TAMANHO_MAXIMO} bytes.'
+            )
+        return value
+
+    def validate(self, data):
+        try:
+            obter_destino(data['destino'], data['objeto_id'])
+        except UploadInvalido as e:
+            raise serializers.ValidationError({'destino': str(e)})
+        return data
@@ -0,0 +1,27 @@
+from django.db.models.signals import post_save
+from django.dispatch import Signal, receiver
+from motos.models import Moto, PerfilMoto
+from .imagens import preaquecer
+
+
+# Enviado quando um upload em partes é anexado a um campo (o UPDATE direto
+# não dispara post_save). Argumentos: instance, campo, conteudo.
+arquivo_anexado = Signal()
+
+
+@receiver(post_save, sender=Moto)
+def preaquecer_imagem_moto(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Gera em segundo plano as renditions da imagem principal enviada"""
+    if raw or not instance.imagem_principal:
+        return
+    if update_fields is None or 'imagem_principal' in update_fields:
+        preaquecer(instance.imagem_principal.name)
+
+
+@receiver(post_save, sender=PerfilMoto)
+def preaquecer_imagem_perfil(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Gera em segundo plano as renditions da imagem do perfil"""
+    if raw or not instance.imagem_perfil:
+        return
+    if update_fields is None or 'imagem_perfil' in update_fields:
+        preaquecer(instance.imagem_perfil.name)
@@ -0,0 +1,59 @@
+"""
+API Views for Busca app.
+"""
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework.permissions import IsAuthenticated
+from rest_framework import status
+from .backends import obter_backend
+from .models import DocumentoBusca
+
+
+LIMITE_PADRAO = 20
+LIMITE_MAXIMO = 100
+
+
+class BuscaAPIView(APIView):
+    """
+    Full-text search over maintenance, maintenance history and diagnostic text.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        """
+        Search with `?q=`; optional `tipo`, `moto_id` and `limit` filters.
+        """
+        consulta = (request.query_params.get('q') or '').strip()
+        if not consulta:
+            return Response({
+                'success': False,
+                'message': 'q parameter is required'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        tipo = request.query_params.get('tipo') or None
+        if tipo and tipo not in dict(DocumentoBusca.TIPO_CHOICES):
+            return Response({
+                'success': False,
+                'message': 'Invalid tipo'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            moto_id = request.query_params.get('moto_id')
+            moto_id = int(moto_id) if moto_id else None
+            limite = min(int(request.query_params.get('limit', LIMITE_PADRAO)), LIMITE_MAXIMO)
+        except ValueError:
+            return Response({
+                'success': False,
+                'message': 'moto_id and limit must be integers'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        resultados = obter_backend().buscar(consulta, tipo=tipo, moto_id=moto_id, limite=max(1, limite))
+
+        return Response({
+            'success': True,
+            'data': {
+                'consulta': consulta,
+                'total': len(resultados),
+                'resultados': resultados
+            }
+        })
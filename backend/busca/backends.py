@@ -0,0 +1,127 @@
+import re
+from typing import Any, Dict, List, Optional
+
+from django.db import connection
+from django.db.models import Q
+from .models import DocumentoBusca
+
+
+MARCA_INICIO = '<mark>'
+MARCA_FIM = '</mark>'
+
+_TERMO = re.compile(r'\w+', re.UNICODE)
+
+
+def _termos(consulta: str) -> List[str]:
+    return _TERMO.findall(consulta or '')
+
+
+def _filtros_sql(tipo: Optional[str], moto_id: Optional[int], alias: str):
+    condicoes, parametros = [], []
+    if tipo:
+        condicoes.append(f'{alias}.tipo = %s')
+        parametros.append(tipo)
+    if moto_id is not None:
+        condicoes.append(f'{alias}.moto_id = %s')
+        parametros.append(moto_id)
+    return ''.join(f' AND {c}' for c in condicoes), parametros
+
+
+def _linhas(cursor) -> List[Dict[str, Any]]:
+    colunas = [coluna[0] for coluna in cursor.description]
+    return [dict(zip(colunas, linha)) for linha in cursor.fetchall()]
+
+
+class BackendSQLite:
+    """Busca com a tabela virtual FTS5 (ranking BM25 e trechos com snippet())"""
+
+    def buscar(self, consulta, tipo=None, moto_id=None, limite=20):
+        termos = _termos(consulta)
+        if not termos:
+            return []
+        # Cada termo entre aspas (sem sintaxe FTS do usuário), com busca por prefixo
+        expressao = ' '.join('"{}"*'.format(termo.replace('"', '')) for termo in termos)
+        filtros, parametros = _filtros_sql(tipo, moto_id, 'd')
+
+        with connection.cursor() as cursor:
+            cursor.execute(f"""
+                SELECT d.tipo, d.objeto_id, d.moto_id, d.titulo,
+                       bm25(busca_documentobusca_fts, 5.0, 1.0) AS relevancia,
+                       snippet(busca_documentobusca_fts, -1, %s, %s, '…', 16) AS trecho
+                FROM busca_documentobusca_fts
+                JOIN busca_documentobusca d ON d.id = busca_documentobusca_fts.rowid
+                WHERE busca_documentobusca_fts MATCH %s{filtros}
+                ORDER BY relevancia
+                LIMIT %s
+            """, [MARCA_INICIO, MARCA_FIM, expressao, *parametros, limite])
+            resultados = _linhas(cursor)
+
+        # bm25() é negativo: quanto menor, mais relevante
+        for resultado in resultados:
+            resultado['relevancia'] = round(-resultado['relevancia'], 4)
+        return resultados
+
+
+class BackendPostgres:
+    """Busca com tsvector/tsquery (ranking ts_rank_cd e trechos com ts_headline)"""
+
+    def buscar(self, consulta, tipo=None, moto_id=None, limite=20):
+        if not _termos(consulta):
+            return []
+        filtros, parametros = _filtros_sql(tipo, moto_id, 'd')
+        # Mesma expressão do índice GIN busca_documentobusca_tsv_idx
+        documento = "to_tsvector('portuguese', d.titulo || ' ' || d.conteudo)"
+
+        with connection.cursor() as cursor:
+            cursor.execute(f"""
+                SELECT d.tipo, d.objeto_id, d.moto_id, d.titulo,
+                       ts_rank_cd({documento}, q) AS relevancia,
+                       ts_headline('portuguese', d.conteudo, q,
+                                   'StartSel=' || %s || ', StopSel=' || %s || ', MaxWords=32, MinWords=8') AS trecho
+                FROM busca_documentobusca d, websearch_to_tsquery('portuguese', %s) q
+                WHERE {documento} @@ q{filtros}
+                ORDER BY relevancia DESC
+                LIMIT %s
+            """, [MARCA_INICIO, MARCA_FIM, consulta, *parametros, limite])
+            resultados = _linhas(cursor)
+
+        for resultado in resultados:
+            resultado['relevancia'] = round(float(resultado['relevancia']), 4)
+        return resultados
+
+
+class BackendSimples:
+    """Busca por icontains para bancos sem índice textual"""
+
+    def buscar(self, consulta, tipo=None, moto_id=None, limite=20):
+        termos = _termos(consulta)
+        if not termos:
+            return []
+        documentos = DocumentoBusca.objects.all()
+        for termo in termos:
+            documentos = documentos.filter(Q(titulo__icontains=termo) | Q(conteudo__icontains=termo))
+        if tipo:
+            documentos = documentos.filter(tipo=tipo)
+        if moto_id is not None:
+            documentos = documentos.filter(moto_id=moto_id)
+
+        return [
+            {
+                'tipo': documento.tipo,
+                'objeto_id': documento.objeto_id,
+                'moto_id': documento.moto_id,
+                'titulo': documento.titulo,
+                'relevancia': None,
+                'trecho': documento.conteudo[:200],
+            }
+            for documento in documentos.order_by('-atualizado_em')[:limite]
+        ]
+
+
+def obter_backend():
+    """Escolhe o backend de busca de acordo com o banco configurado"""
+    if connection.vendor == 'sqlite':
+        return BackendSQLite()
+    if connection.vendor == 'postgresql':
+        return BackendPostgres()
+    return BackendSimples()
@@ -0,0 +1,114 @@
+from typing import Iterable, List
+
+from django.db import transaction
+from analises.models import Diagnostico
+from manutencoes.models import Manutencao, HistoricoManutencao
+from .models import DocumentoBusca
+
+
+TAMANHO_LOTE = 1000
+
+
+def _juntar(*partes) -> str:
+    return '\n'.join(parte for parte in partes if parte)
+
+
+def documento_manutencao(manutencao: Manutencao) -> DocumentoBusca:
+    return DocumentoBusca(
+        tipo='manutencao',
+        objeto_id=manutencao.pk,
+        moto_id=manutencao.moto_id,
+        titulo=manutencao.titulo[:200],
+        conteudo=_juntar(manutencao.descricao, manutencao.observacoes),
+    )
+
+
+def documento_historico(historico: HistoricoManutencao) -> DocumentoBusca:
+    manutencao = historico.manutencao
+    return DocumentoBusca(
+        tipo='historico',
+        objeto_id=historico.pk,
+        moto_id=manutencao.moto_id,
+        titulo=f"Histórico - {manutencao.titulo}"[:200],
+        conteudo=_juntar(historico.sintomas, historico.diagnostico, historico.procedimentos_realizados),
+    )
+
+
+def documento_diagnostico(diagnostico: Diagnostico) -> DocumentoBusca:
+    return DocumentoBusca(
+        tipo='diagnostico',
+        objeto_id=diagnostico.pk,
+        moto_id=diagnostico.analise.moto_id,
+        titulo=diagnostico.titulo[:200],
+        conteudo=_juntar(diagnostico.descricao, diagnostico.causa_provavel),
+    )
+
+
+# Modelo de origem -> (tipo do documento, construtor, select_related para reindexação)
+FONTES = {
+    Manutencao: ('manutencao', documento_manutencao, []),
+    HistoricoManutencao: ('historico', documento_historico, ['manutencao']),
+    Diagnostico: ('diagnostico', documento_diagnostico, ['analise']),
+}
+
+
+def indexar(instancia) -> None:
+    """Cria ou atualiza o documento de busca de uma instância"""
+    _, construtor, _ = FONTES[type(instancia)]
+    documento = construtor(instancia)
+    DocumentoBusca.objects.update_or_create(
+        tipo=documento.tipo,
+        objeto_id=documento.objeto_id,
+        defaults={'moto_id': documento.moto_id, 'titulo': documento.titulo, 'conteudo': documento.conteudo},
+    )
+
+
+def remover(instancia) -> None:
+    """Remove o documento de busca de uma instância excluída"""
+    tipo, _, _ = FONTES[type(instancia)]
+    DocumentoBusca.objects.filter(tipo=tipo, objeto_id=instancia.pk).delete()
+
+
+def indexar_em_lote(instancias: Iterable) -> int:
+    """
+    Indexa instâncias gravadas com bulk_create (que não disparam signals)
+
+    Todas as instâncias devem ser do mesmo modelo e já ter pk.
+    """
+    documentos = []
+    for instancia in instancias:
+        _, construtor, _ = FONTES[type(instancia)]
+        documentos.append(construtor(instancia))
+    _gravar(documentos)
+    return len(documentos)
+
+
+def reindexar_tudo() -> int:
+    """Reconstrói todos os documentos de busca a partir das tabelas de origem"""
+    total = 0
+    with transaction.atomic():
+        DocumentoBusca.objects.all().delete()
+        for modelo, (_, construtor, relacionados) in FONTES.items():
+            lote: List[DocumentoBusca] = []
+            for instancia in modelo.objects.select_related(*relacionados).order_by('pk').iterator(chunk_size=TAMANHO_LOTE):
+                lote.append(construtor(instancia))
+                if len(lote) >= TAMANHO_LOTE:
+                    DocumentoBusca.objects.bulk_create(lote)
+                    total += len(lote)
+                    lote = []
+            DocumentoBusca.objects.bulk_create(lote)
+            total += len(lote)
+    return total
+
+
+def _gravar(documentos: List[DocumentoBusca]) -> None:
+    """Insere documentos novos e atualiza os existentes"""
+    if not documentos:
+        return
+    DocumentoBusca.objects.bulk_create(
+        documentos,
+        batch_size=TAMANHO_LOTE,
+        update_conflicts=True,
+        unique_fields=['tipo', 'objeto_id'],
+        update_fields=['moto', 'titulo', 'conteudo', 'atualizado_em'],
+    )
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from busca.indexacao import reindexar_tudo
+
+
+class Command(BaseCommand):
+    help = 'Reconstrói o índice de busca textual de manutenções, históricos e diagnósticos'
+
+    def handle(self, *args, **options):
+        total = reindexar_tudo()
+        self.stdout.write(self.style.SUCCESS(f'{total} documentos indexados.'))
@@ -0,0 +1,96 @@
+# Generated by Django 5.2.6 on 2026-10-19 13:56
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+SQLITE_FTS = [
+    """
+    CREATE VIRTUAL TABLE busca_documentobusca_fts USING fts5(
+        titulo, conteudo,
+        content='busca_documentobusca', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER busca_documentobusca_ai AFTER INSERT ON busca_documentobusca BEGIN
+        INSERT INTO busca_documentobusca_fts(rowid, titulo, conteudo)
+        VALUES (new.id, new.titulo, new.conteudo);
+    END
+    """,
+    """
+    CREATE TRIGGER busca_documentobusca_ad AFTER DELETE ON busca_documentobusca BEGIN
+        INSERT INTO busca_documentobusca_fts(busca_documentobusca_fts, rowid, titulo, conteudo)
+        VALUES ('delete', old.id, old.titulo, old.conteudo);
+    END
+    """,
+    """
+    CREATE TRIGGER busca_documentobusca_au AFTER UPDATE ON busca_documentobusca BEGIN
+        INSERT INTO busca_documentobusca_fts(busca_documentobusca_fts, rowid, titulo, conteudo)
+        VALUES ('delete', old.id, old.titulo, old.conteudo);
+        INSERT INTO busca_documentobusca_fts(rowid, titulo, conteudo)
+        VALUES (new.id, new.titulo, new.conteudo);
+    END
+    """,
+]
+
+SQLITE_FTS_REVERSO = [
+    'DROP TRIGGER IF EXISTS busca_documentobusca_au',
+    'DROP TRIGGER IF EXISTS busca_documentobusca_ad',
+    'DROP TRIGGER IF EXISTS busca_documentobusca_ai',
+    'DROP TABLE IF EXISTS busca_documentobusca_fts',
+]
+
+POSTGRES_TSVECTOR = [
+    """
+    CREATE INDEX busca_documentobusca_tsv_idx ON busca_documentobusca
+    USING GIN (to_tsvector('portuguese', titulo || ' ' || conteudo))
+    """,
+]
+
+POSTGRES_TSVECTOR_REVERSO = [
+    'DROP INDEX IF EXISTS busca_documentobusca_tsv_idx',
+]
+
+
+def _executar(schema_editor, por_banco):
+    for instrucao in por_banco.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(instrucao)
+
+
+def criar_indice_textual(apps, schema_editor):
+    _executar(schema_editor, {'sqlite': SQLITE_FTS, 'postgresql': POSTGRES_TSVECTOR})
+
+
+def remover_indice_textual(apps, schema_editor):
+    _executar(schema_editor, {'sqlite': SQLITE_FTS_REVERSO, 'postgresql': POSTGRES_TSVECTOR_REVERSO})
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('motos', '0005_indices_listagem'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentoBusca',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(choices=[('manutencao', 'Manutenção'), ('historico', 'Histórico de Manutenção'), ('diagnostico', 'Diagnóstico')], max_length=20, verbose_name='Tipo')),
+                ('objeto_id', models.PositiveBigIntegerField(verbose_name='ID do Objeto')),
+                ('titulo', models.CharField(max_length=200, verbose_name='Título')),
+                ('conteudo', models.TextField(blank=True, verbose_name='Conteúdo')),
+                ('atualizado_em', models.DateTimeField(auto_now=True, verbose_name='Atualizado em')),
+                ('moto', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='documentos_busca', to='motos.moto')),
+            ],
+            options={
+                'verbose_name': 'Documento de Busca',
+                'verbose_name_plural': 'Documentos de Busca',
+                'unique_together': {('tipo', 'objeto_id')},
+            },
+        ),
+        migrations.RunPython(criar_indice_textual, remover_indice_textual),
+    ]
@@ -0,0 +1,30 @@
+from django.db import models
+from motos.models import Moto
+
+
+class DocumentoBusca(models.Model):
+    """Texto indexado para a busca textual (manutenções, históricos e diagnósticos)"""
+
+    TIPO_CHOICES = [
+        ('manutencao', 'Manutenção'),
+        ('historico', 'Histórico de Manutenção'),
+        ('diagnostico', 'Diagnóstico'),
+    ]
+    tipo = models.CharField('Tipo', max_length=20, choices=TIPO_CHOICES)
+    objeto_id = models.PositiveBigIntegerField('ID do Objeto')
+    moto = models.ForeignKey(Moto, on_delete=models.CASCADE, related_name='documentos_busca', blank=True, null=True)
+
+    # Conteúdo indexado
+    titulo = models.CharField('Título', max_length=200)
+    conteudo = models.TextField('Conteúdo', blank=True)
+
+    # Metadados
+    atualizado_em = models.DateTimeField('Atualizado em', auto_now=True)
+
+    class Meta:
+        verbose_name = 'Documento de Busca'
+        verbose_name_plural = 'Documentos de Busca'
+        unique_together = ['tipo', 'objeto_id']
+
+    def __str__(self):
+        return f"{self.get_tipo_display()} #{self.objeto_id} - {self.titulo}"
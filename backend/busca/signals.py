@@ -0,0 +1,23 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from analises.models import Diagnostico
+from manutencoes.models import Manutencao, HistoricoManutencao
+from . import indexacao
+
+
+@receiver(post_save, sender=Manutencao)
+@receiver(post_save, sender=HistoricoManutencao)
+@receiver(post_save, sender=Diagnostico)
+def indexar_documento(sender, instance, raw=False, **kwargs):
+    """Mantém o índice de busca sincronizado com as gravações"""
+    if raw:
+        return
+    indexacao.indexar(instance)
+
+
+@receiver(post_delete, sender=Manutencao)
+@receiver(post_delete, sender=HistoricoManutencao)
+@receiver(post_delete, sender=Diagnostico)
+def remover_documento(sender, instance, **kwargs):
+    """Remove do índice os registros excluídos"""
+    indexacao.remover(instance)
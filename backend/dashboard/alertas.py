@@ -0,0 +1,59 @@
+"""
+Alertas gerados a partir das verificações da frota.
+"""
+from typing import Dict, Iterable, Optional
+
+from django.db import transaction
+from django.utils import timezone
+from motos.services.calibragem_service import CalibragemService
+from .models import Alerta
+
+
+TITULO_CALIBRAGEM = 'Calibragem dos pneus'
+
+DESCRICAO_PROBLEMAS = {
+    'dianteira_baixa': 'pneu dianteiro abaixo da calibragem recomendada',
+    'dianteira_alta': 'pneu dianteiro acima da calibragem recomendada',
+    'traseira_baixa': 'pneu traseiro abaixo da calibragem recomendada',
+    'traseira_alta': 'pneu traseiro acima da calibragem recomendada',
+    'calibragem_vencida': 'calibragem vencida para o estilo de uso',
+}
+
+
+def sincronizar_alertas_calibragem(moto_ids: Optional[Iterable[int]] = None) -> Dict[str, int]:
+    """
+    Abre alertas para as motos fora da conformidade e resolve os que deixaram de valer
+
+    Sem `moto_ids` verifica a frota inteira (rodar diariamente, já que a
+    calibragem vence com o tempo); com `moto_ids`, só essas motos.
+    """
+    pendentes = CalibragemService.pendentes()
+    abertos = Alerta.objects.filter(tipo='seguranca', titulo=TITULO_CALIBRAGEM, status__in=['ativo', 'lido'])
+    if moto_ids is not None:
+        moto_ids = list(moto_ids)
+        pendentes = pendentes.filter(moto_id__in=moto_ids)
+        abertos = abertos.filter(moto_id__in=moto_ids)
+
+    com_alerta = set(abertos.values_list('moto_id', flat=True))
+    fora = set()
+    novos = []
+    for perfil in pendentes.iterator(chunk_size=1000):
+        fora.add(perfil.moto_id)
+        if perfil.moto_id in com_alerta or perfil.moto.criado_por_id is None:
+            continue
+        resumo = CalibragemService.descrever(perfil)
+        novos.append(Alerta(
+            usuario_id=perfil.moto.criado_por_id,
+            moto_id=perfil.moto_id,
+            tipo='seguranca',
+            severidade=resumo['severidade'],
+            titulo=TITULO_CALIBRAGEM,
+            mensagem=f"{resumo['moto']}: " + '; '.join(DESCRICAO_PROBLEMAS[p] for p in resumo['problemas']) + '.',
+            acao_recomendada='Calibrar os pneus e registrar a calibragem no perfil da moto.',
+        ))
+
+    with transaction.atomic():
+        Alerta.objects.bulk_create(novos, batch_size=1000)
+        resolvidos = abertos.exclude(moto_id__in=fora).update(status='resolvido', resolvido_em=timezone.now())
+
+    return {'pendentes': len(fora), 'criados': len(novos), 'resolvidos': resolvidos}
@@ -5,15 +5,17 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework import status
+from arquivos.imagens import urls_rendicoes
+from moto_maintenance.roteamento import LeituraAnaliticaMixin
 from motos.models import Moto
 from manutencoes.models import Manutencao
 from datetime import datetime, timedelta
 from django.db.models import Count, Sum
 
 
-class DashboardAPIView(APIView):
+class DashboardAPIView(LeituraAnaliticaMixin, APIView):
     """
-    API view for dashboard statistics.
+    API view for dashboard statistics (read from the replica when configured).
     """
     permission_classes = [AllowAny]  # Temporário para desenvolvimento
     
@@ -51,6 +53,7 @@ class DashboardAPIView(APIView):
                         'km_atual': moto.km_atual,
                         'km_total_percorridos': moto.km_total_percorridos,
                         'imagem_url': moto.imagem_principal.url if moto.imagem_principal else None,
+                        'imagem_urls': urls_rendicoes(moto.imagem_principal),
                     }
             
             # Statistics by brand
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from dashboard.alertas import sincronizar_alertas_calibragem
+
+
+class Command(BaseCommand):
+    help = 'Abre alertas de calibragem para as motos fora da conformidade e resolve os que deixaram de valer'
+
+    def handle(self, *args, **options):
+        resultado = sincronizar_alertas_calibragem()
+        self.stdout.write(self.style.SUCCESS(
+            f"{resultado['pendentes']} motos fora da conformidade, {resultado['criados']} alertas criados, "
+            f"{resultado['resolvidos']} resolvidos."
+        ))
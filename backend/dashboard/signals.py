@@ -0,0 +1,13 @@
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from motos.models import PerfilMoto
+from .alertas import sincronizar_alertas_calibragem
+
+
+@receiver(post_save, sender=PerfilMoto)
+def perfil_salvo(sender, instance, raw=False, **kwargs):
+    """Reavalia o alerta de calibragem da moto após gravar o perfil"""
+    if raw:
+        return
+    transaction.on_commit(lambda: sincronizar_alertas_calibragem([instance.moto_id]))
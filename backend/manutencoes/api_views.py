@@ -1,33 +1,57 @@
 """
 API Views for Manutencoes app.
 """
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Avg, BigIntegerField, Count, Max, Min
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
-from .models import Manutencao
-from .serializers import ManutencaoSerializer
+from rest_framework.parsers import JSONParser, MultiPartParser
+from moto_maintenance.pagination import OptionalCursorPagination
+from moto_maintenance.roteamento import LeituraAnaliticaMixin
+from .models import Manutencao, HistoricoManutencao, TransicaoStatusManutencao
+from .catalogo import obter_catalogo, obter_precos
+from .serializers import ManutencaoSerializer, HistoricoManutencaoSerializer
+from .services.importacao_service import ImportacaoManutencaoService
+from .services.plano_service import PlanoManutencaoService
 
 
-class ManutencaoViewSet(viewsets.ModelViewSet):
+class ManutencaoViewSet(LeituraAnaliticaMixin, viewsets.ModelViewSet):
     """
     ViewSet for Manutencao operations.
     """
     serializer_class = ManutencaoSerializer
     permission_classes = [AllowAny]  # Temporário para desenvolvimento
     permission_classes = [IsAuthenticated]
+    pagination_class = OptionalCursorPagination
+    cursor_ordering = ('-criado_em', '-id')  # index manutencao_criado_idx
+    # Reports and exports read from the replica when configured
+    acoes_analiticas = ('estatisticas', 'tempo_por_status', 'linha_do_tempo')
     
     def get_queryset(self):
         """
-        Return active maintenances.
+        Return maintenances of active motorcycles.
         """
-        return Manutencao.objects.filter(ativo=True).order_by('-data_manutencao')
+        return Manutencao.objects.de_motos_ativas().select_related('moto').order_by('-criado_em', '-id')
     
     def perform_create(self, serializer):
         """
         Set creator when saving.
         """
         serializer.save(criado_por=self.request.user)
+
+    def perform_update(self, serializer):
+        """
+        Record who changed the status in the transition log.
+        """
+        serializer.instance.usuario_transicao = self.request.user
+        serializer.save()
     
     @action(detail=False, methods=['get'])
     def por_moto(self, request):
@@ -49,6 +73,244 @@ class ManutencaoViewSet(viewsets.ModelViewSet):
             'data': serializer.data
         })
     
+    @action(detail=False, methods=['get'])
+    def historicos(self, request):
+        """
+        List maintenance histories with photo previews.
+
+        Optional `moto_id` filter; previews are a few KB each instead of the
+        full-resolution photos.
+        """
+        historicos = HistoricoManutencao.objects.filter(
+            manutencao__moto__ativo=True
+        ).order_by('-criado_em', '-id')
+        moto_id = request.query_params.get('moto_id')
+        if moto_id:
+            historicos = historicos.filter(manutencao__moto_id=moto_id)
+
+        pagina = self.paginate_queryset(historicos)
+        if pagina is not None:
+            return self.get_paginated_response(HistoricoManutencaoSerializer(pagina, many=True).data)
+        return Response({
+            'success': True,
+            'data': HistoricoManutencaoSerializer(historicos, many=True).data
+        })
+
+    @action(detail=False, methods=['post'])
+    def alterar_status(self, request):
+        """
+        Change the status of several maintenances at once.
+
+        Expects `ids` (list) and `status`; transitions are logged in bulk.
+        """
+        ids = request.data.get('ids')
+        novo_status = request.data.get('status')
+        if not isinstance(ids, list) or novo_status not in dict(Manutencao.STATUS_CHOICES):
+            return Response({
+                'success': False,
+                'message': 'ids (list) and a valid status are required'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        alteradas = self.get_queryset().filter(id__in=ids).alterar_status(novo_status, usuario=request.user)
+
+        return Response({
+            'success': True,
+            'data': {'alteradas': alteradas}
+        })
+
+    @action(detail=False, methods=['get'])
+    def linha_do_tempo(self, request):
+        """
+        Stream the status transitions of a motorcycle as JSON Lines.
+
+        Reads the log in `(moto, timestamp)` order (index transicao_moto_ts_idx);
+        `?desde=` limits it to transitions after an ISO datetime.
+        """
+        moto_id = request.query_params.get('moto_id')
+        if not moto_id:
+            return Response({
+                'success': False,
+                'message': 'moto_id parameter is required'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        # Validated before streaming: an error inside the generator would
+        # break the response instead of returning a 400
+        try:
+            moto_id = _ler_id(moto_id)
+            desde = _ler_momento(request.query_params.get('desde'))
+        except ValueError:
+            return Response({
+                'success': False,
+                'message': 'moto_id must be a valid id and desde an ISO datetime'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        transicoes = TransicaoStatusManutencao.objects.filter(
+            moto_id=moto_id, moto__ativo=True
+        ).order_by('timestamp', 'id')
+        if desde:
+            transicoes = transicoes.filter(timestamp__gt=desde)
+
+        linhas = transicoes.values(
+            'manutencao_id', 'manutencao__titulo', 'status_anterior', 'status_novo',
+            'timestamp', 'duracao_anterior', 'usuario__username'
+        ).iterator(chunk_size=1000)
+
+        def gerar():
+            for linha in linhas:
+                duracao = linha['duracao_anterior']
+                yield json.dumps({
+                    'manutencao_id': linha['manutencao_id'],
+                    'titulo': linha['manutencao__titulo'],
+                    'status_anterior': linha['status_anterior'],
+                    'status_novo': linha['status_novo'],
+                    'timestamp': linha['timestamp'],
+                    'duracao_anterior_segundos': duracao.total_seconds() if duracao is not None else None,
+                    'usuario': linha['usuario__username'],
+                }, cls=DjangoJSONEncoder) + '\n'
+
+        return StreamingHttpResponse(gerar(), content_type='application/x-ndjson')
+
+    @action(detail=False, methods=['get'])
+    def tempo_por_status(self, request):
+        """
+        Return how long maintenances stay in each status (lead time).
+
+        Optional filters: `moto_id`, `tipo_id`.
+        """
+        transicoes = TransicaoStatusManutencao.objects.filter(
+            status_anterior__isnull=False, duracao_anterior__isnull=False
+        )
+        try:
+            moto_id = _ler_id(request.query_params.get('moto_id'))
+            tipo_id = _ler_id(request.query_params.get('tipo_id'))
+        except ValueError:
+            return Response({
+                'success': False,
+                'message': 'moto_id and tipo_id must be valid ids'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        if moto_id:
+            transicoes = transicoes.filter(moto_id=moto_id)
+        if tipo_id:
+            transicoes = transicoes.filter(manutencao__tipo_id=tipo_id)
+
+        resumo = transicoes.values('status_anterior').annotate(
+            quantidade=Count('id'),
+            media=Avg('duracao_anterior'),
+            minimo=Min('duracao_anterior'),
+            maximo=Max('duracao_anterior'),
+        ).order_by('status_anterior')
+
+        return Response({
+            'success': True,
+            'data': [
+                {
+                    'status': linha['status_anterior'],
+                    'quantidade': linha['quantidade'],
+                    'media_horas': round(linha['media'].total_seconds() / 3600, 2),
+                    'minimo_horas': round(linha['minimo'].total_seconds() / 3600, 2),
+                    'maximo_horas': round(linha['maximo'].total_seconds() / 3600, 2),
+                }
+                for linha in resumo
+            ]
+        })
+
+    @action(detail=False, methods=['post'], parser_classes=[MultiPartParser, JSONParser])
+    def importar(self, request):
+        """
+        Bulk import maintenance history.
+
+        Accepts a CSV/JSON/JSON Lines file in `arquivo` or a JSON body with
+        a `registros` list. Returns a per-row error report.
+        """
+        dry_run = str(request.query_params.get('dry_run', '')).lower() in ('1', 'true')
+        arquivo = request.FILES.get('arquivo')
+
+        if arquivo is not None:
+            formato = request.data.get('formato') or arquivo.name.rsplit('.', 1)[-1].lower()
+            if formato not in ('csv', 'json', 'jsonl'):
+                return Response({
+                    'success': False,
+                    'message': 'Unsupported file format (use csv, json or jsonl)'
+                }, status=status.HTTP_400_BAD_REQUEST)
+            registros = ImportacaoManutencaoService.ler_registros(arquivo.file, formato)
+        elif isinstance(request.data.get('registros'), list):
+            registros = enumerate(request.data['registros'], start=1)
+        else:
+            return Response({
+                'success': False,
+                'message': 'arquivo or registros is required'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            resultado = ImportacaoManutencaoService.importar(registros, usuario=request.user, dry_run=dry_run)
+        except (ValueError, UnicodeDecodeError) as e:
+            return Response({
+                'success': False,
+                'message': f'Could not read file: {str(e)}'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            'success': resultado['success'],
+            'data': resultado
+        })
+
+    @action(detail=False, methods=['post'])
+    def gerar_planos(self, request):
+        """
+        Generate planned maintenances from each type's km/month interval.
+        """
+        completo = str(request.data.get('completo', '')).lower() in ('1', 'true')
+        resultado = PlanoManutencaoService.gerar_planos(completo=completo)
+
+        if not resultado['success']:
+            return Response(resultado, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            'success': True,
+            'data': resultado
+        })
+
+    @action(detail=False, methods=['get'])
+    def catalogo(self, request):
+        """
+        Return active maintenance types and items with price-based estimates.
+
+        Served from the in-process catalog; `?tipo_id=` limits it to one type.
+        """
+        catalogo = obter_catalogo()
+        precos = obter_precos()
+
+        tipos = catalogo.tipos_ativos()
+        tipo_id = request.query_params.get('tipo_id')
+        if tipo_id:
+            tipos = [tipo for tipo in tipos if str(tipo['id']) == tipo_id]
+
+        dados = []
+        for tipo in tipos:
+            itens = []
+            valor_tipo = 0
+            for item in catalogo.itens_do_tipo(tipo['id']):
+                valor_estimado = precos.valor_estimado(item['id'], padrao=item['valor_estimado'])
+                resumo = precos.resumo(item['id'])
+                itens.append({
+                    **item,
+                    'valor_estimado': valor_estimado,
+                    'precos': {
+                        'quantidade_compras': resumo['quantidade_compras'],
+                        'valor_medio': resumo['valor_medio'],
+                        'valor_minimo': resumo['valor_minimo'],
+                        'valor_maximo': resumo['valor_maximo'],
+                        'ultima_compra': resumo['ultima_compra'],
+                    } if resumo else None,
+                })
+                if valor_estimado is not None:
+                    valor_tipo += valor_estimado * (item['quantidade_padrao'] or 1)
+            dados.append({**tipo, 'valor_estimado': valor_tipo, 'itens': itens})
+
+        return Response({
+            'success': True,
+            'data': dados
+        })
+
     @action(detail=False, methods=['get'])
     def estatisticas(self, request):
         """
@@ -76,3 +338,25 @@ class ManutencaoViewSet(viewsets.ModelViewSet):
                 'estatisticas_por_tipo': tipos
             }
         })
+
+
+def _ler_id(valor):
+    """Optional id query parameter (ValueError when invalid or out of the column range)."""
+    if not valor:
+        return None
+    valor = int(valor)
+    if not 0 < valor <= BigIntegerField.MAX_BIGINT:
+        raise ValueError(valor)
+    return valor
+
+
+def _ler_momento(valor):
+    """Optional ISO datetime query parameter, made aware (ValueError when invalid)."""
+    if not valor:
+        return None
+    momento = parse_datetime(valor)
+    if momento is None:
+        raise ValueError(valor)
+    if timezone.is_naive(momento):
+        momento = timezone.make_aware(momento)
+    return momento
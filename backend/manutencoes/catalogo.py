@@ -0,0 +1,149 @@
+"""
+Catálogo em memória de tipos e itens de manutenção.
+
+Tipos e itens são tabelas pequenas e quase só de leitura: cada processo
+carrega tudo uma vez em dicionários e só recarrega quando o contador de
+versão (moto_maintenance.versoes) muda. O histórico de preços, derivado de
+ItemManutencaoRealizada, tem um contador próprio para que novas compras não
+invalidem o catálogo inteiro.
+"""
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.db.models import Avg, Count, F, Max, Min, Window
+from django.db.models.functions import RowNumber
+from moto_maintenance.versoes import CacheVersionado, invalidar_versao
+
+
+VERSAO_CATALOGO = 'catalogo_manutencao'
+VERSAO_PRECOS = 'precos_manutencao'
+
+# Preços mais recentes guardados por item (e usados na estimativa)
+PRECOS_POR_ITEM = 10
+
+
+def normalizar_nome(valor: Any) -> str:
+    """Normaliza um nome para uso como chave de busca"""
+    return ' '.join(str(valor or '').split()).casefold()
+
+
+def invalidar_catalogo() -> None:
+    invalidar_versao(VERSAO_CATALOGO)
+
+
+def invalidar_precos() -> None:
+    invalidar_versao(VERSAO_PRECOS)
+
+
+class Catalogo:
+    """Fotografia imutável dos tipos e itens de manutenção"""
+
+    def __init__(self, tipos: List[Dict[str, Any]], itens: List[Dict[str, Any]]):
+        self.tipos_por_id = {tipo['id']: tipo for tipo in tipos}
+        self.tipos_por_nome = {normalizar_nome(tipo['nome']): tipo['id'] for tipo in tipos}
+
+        self.itens_por_id = {item['id']: item for item in itens}
+        self.itens_por_tipo_nome: Dict[Tuple[int, str], int] = {}
+        self.itens_por_nome: Dict[str, Optional[int]] = {}
+        for item in itens:
+            chave = normalizar_nome(item['nome'])
+            self.itens_por_tipo_nome[(item['tipo_id'], chave)] = item['id']
+            # Nomes repetidos em tipos diferentes ficam ambíguos sem o tipo
+            self.itens_por_nome[chave] = None if chave in self.itens_por_nome else item['id']
+
+    def tipo_por_nome(self, nome) -> Optional[int]:
+        return self.tipos_por_nome.get(normalizar_nome(nome))
+
+    def item_por_nome(self, nome, tipo_id: Optional[int] = None) -> Optional[int]:
+        chave = normalizar_nome(nome)
+        return self.itens_por_tipo_nome.get((tipo_id, chave)) or self.itens_por_nome.get(chave)
+
+    def tipos_ativos(self) -> List[Dict[str, Any]]:
+        return [tipo for tipo in self.tipos_por_id.values() if tipo['ativo']]
+
+    def itens_do_tipo(self, tipo_id: int) -> List[Dict[str, Any]]:
+        return [item for item in self.itens_por_id.values() if item['tipo_id'] == tipo_id and item['ativo']]
+
+
+class HistoricoPrecos:
+    """Fotografia dos preços praticados por item (ItemManutencaoRealizada.valor_unitario)"""
+
+    def __init__(self, resumos: Dict[int, Dict[str, Any]]):
+        self.resumos = resumos
+
+    def resumo(self, item_id: int) -> Optional[Dict[str, Any]]:
+        return self.resumos.get(item_id)
+
+    def valor_estimado(self, item_id: int, padrao: Optional[Decimal] = None) -> Optional[Decimal]:
+        """Média dos preços mais recentes, ou o valor estimado cadastrado"""
+        resumo = self.resumos.get(item_id)
+        if resumo and resumo['recentes']:
+            valores = [preco['valor_unitario'] for preco in resumo['recentes']]
+            return (sum(valores) / len(valores)).quantize(Decimal('0.01'))
+        return padrao
+
+
+def _construir_catalogo() -> Catalogo:
+    from .models import TipoManutencao, ItemManutencao
+
+    # Inativos entram para resolver nomes em históricos importados; as
+    # listagens usam tipos_ativos()/itens_do_tipo()
+    tipos = list(TipoManutencao.objects.values(
+        'id', 'nome', 'categoria', 'intervalo_km', 'intervalo_meses', 'ativo'
+    ))
+    itens = list(ItemManutencao.objects.values(
+        'id', 'tipo_id', 'nome', 'marca_recomendada', 'quantidade_padrao', 'unidade_medida',
+        'valor_estimado', 'ativo'
+    ))
+    return Catalogo(tipos, itens)
+
+
+def _construir_precos() -> HistoricoPrecos:
+    from .models import ItemManutencaoRealizada
+
+    # Estatísticas por item em uma consulta agrupada
+    resumos = {
+        linha['item_id']: {**linha, 'recentes': []}
+        for linha in ItemManutencaoRealizada.objects.values('item_id').annotate(
+            quantidade_compras=Count('id'),
+            valor_medio=Avg('valor_unitario'),
+            valor_minimo=Min('valor_unitario'),
+            valor_maximo=Max('valor_unitario'),
+            ultima_compra=Max('manutencao__criado_em'),
+        ).order_by()
+    }
+
+    # Os N preços mais recentes de cada item, numerados por janela
+    recentes = ItemManutencaoRealizada.objects.annotate(
+        ordem=Window(
+            RowNumber(),
+            partition_by=[F('item_id')],
+            order_by=[F('manutencao__criado_em').desc(), F('id').desc()],
+        )
+    ).filter(ordem__lte=PRECOS_POR_ITEM).values(
+        'item_id', 'valor_unitario', 'manutencao__criado_em'
+    )
+    for preco in recentes:
+        resumos[preco['item_id']]['recentes'].append({
+            'valor_unitario': preco['valor_unitario'],
+            'data': preco['manutencao__criado_em'],
+        })
+
+    for resumo in resumos.values():
+        del resumo['item_id']
+        resumo['valor_medio'] = Decimal(str(resumo['valor_medio'])).quantize(Decimal('0.01'))
+    return HistoricoPrecos(resumos)
+
+
+_catalogo = CacheVersionado(VERSAO_CATALOGO, _construir_catalogo)
+_precos = CacheVersionado(VERSAO_PRECOS, _construir_precos)
+
+
+def obter_catalogo() -> Catalogo:
+    """Catálogo atual do processo (recarregado só quando a versão muda)"""
+    return _catalogo.obter()
+
+
+def obter_precos() -> HistoricoPrecos:
+    """Histórico de preços atual do processo"""
+    return _precos.obter()
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand, CommandError
+from manutencoes.services.plano_service import PlanoManutencaoService
+
+
+class Command(BaseCommand):
+    help = 'Gera as manutenções planejadas a partir dos intervalos de km/meses de cada tipo'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--completo', action='store_true',
+                            help='Reprocessa todas as motos, não só as alteradas desde a última execução')
+
+    def handle(self, *args, **options):
+        resultado = PlanoManutencaoService.gerar_planos(completo=options['completo'])
+        if not resultado['success']:
+            raise CommandError(resultado['message'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{resultado['motos_processadas']} motos processadas, "
+            f"{resultado['planos_criados']} planos criados e "
+            f"{resultado['planos_atualizados']} atualizados."
+        ))
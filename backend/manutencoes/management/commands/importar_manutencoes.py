@@ -0,0 +1,58 @@
+import json
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from manutencoes.services.importacao_service import ImportacaoManutencaoService, TAMANHO_LOTE_PADRAO
+
+
+class Command(BaseCommand):
+    help = 'Importa o histórico de manutenções a partir de um arquivo CSV, JSON ou JSON Lines'
+
+    def add_arguments(self, parser):
+        parser.add_argument('arquivo', help='Caminho do arquivo a importar')
+        parser.add_argument('--formato', choices=['csv', 'json', 'jsonl'],
+                            help='Formato do arquivo (padrão: pela extensão)')
+        parser.add_argument('--lote', type=int, default=TAMANHO_LOTE_PADRAO,
+                            help='Linhas por transação (padrão: %(default)s)')
+        parser.add_argument('--usuario', help='Username registrado como criador das manutenções')
+        parser.add_argument('--dry-run', action='store_true', help='Apenas valida, sem gravar')
+        parser.add_argument('--relatorio', help='Grava o relatório de erros em JSON neste caminho')
+
+    def handle(self, *args, **options):
+        caminho = Path(options['arquivo'])
+        if not caminho.exists():
+            raise CommandError(f'Arquivo não encontrado: {caminho}')
+
+        formato = options['formato'] or caminho.suffix.lstrip('.').lower()
+        if formato not in ('csv', 'json', 'jsonl'):
+            raise CommandError('Não foi possível identificar o formato. Use --formato.')
+
+        usuario = None
+        if options['usuario']:
+            try:
+                usuario = User.objects.get(username=options['usuario'])
+            except User.DoesNotExist:
+                raise CommandError(f'Usuário não encontrado: {options["usuario"]}')
+
+        with caminho.open('rb') as arquivo:
+            registros = ImportacaoManutencaoService.ler_registros(arquivo, formato)
+            resultado = ImportacaoManutencaoService.importar(
+                registros, usuario=usuario, tamanho_lote=options['lote'], dry_run=options['dry_run']
+            )
+
+        if options['relatorio']:
+            Path(options['relatorio']).write_text(
+                json.dumps(resultado, ensure_ascii=False, indent=2), encoding='utf-8'
+            )
+        else:
+            for erro in resultado['erros'][:50]:
+                self.stdout.write(self.style.WARNING(f"Linha {erro['linha']}: {erro['erros']}"))
+            if len(resultado['erros']) > 50:
+                self.stdout.write(f"... e mais {len(resultado['erros']) - 50} linhas com erro")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{resultado['total_linhas']} linhas lidas, {resultado['validas']} válidas, "
+            f"{resultado['importadas']} manutenções e {resultado['itens_importados']} itens importados"
+            f"{' (dry-run)' if resultado['dry_run'] else ''}."
+        ))
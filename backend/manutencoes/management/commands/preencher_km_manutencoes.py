@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from manutencoes.services.hodometro_service import HodometroService
+
+
+class Command(BaseCommand):
+    help = 'Estima o km das manutenções gravadas com km 0 a partir do histórico do hodômetro'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Calcula sem gravar')
+
+    def handle(self, *args, **options):
+        resultado = HodometroService.preencher_km_manutencoes(dry_run=options['dry_run'])
+        sufixo = ' (dry-run, nada gravado)' if resultado['dry_run'] else ''
+        self.stdout.write(self.style.SUCCESS(
+            f"{resultado['preenchidas']} de {resultado['pendentes']} manutenções preenchidas{sufixo}."
+        ))
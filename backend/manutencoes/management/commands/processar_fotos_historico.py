@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from manutencoes.models import HistoricoManutencao
+from manutencoes.services.fotos_service import FotosHistoricoService
+
+
+class Command(BaseCommand):
+    help = 'Gera prévias e metadados das fotos de antes/depois dos históricos de manutenção'
+
+    def handle(self, *args, **options):
+        historicos = HistoricoManutencao.objects.exclude(
+            (Q(fotos_antes__isnull=True) | Q(fotos_antes='')) & (Q(fotos_depois__isnull=True) | Q(fotos_depois=''))
+        ).values_list('id', flat=True)
+
+        total = 0
+        for historico_id in historicos.iterator(chunk_size=500):
+            FotosHistoricoService.processar(historico_id)
+            total += 1
+        self.stdout.write(self.style.SUCCESS(f'{total} histórico(s) processado(s).'))
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.6 on 2026-10-19 13:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('manutencoes', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExecucaoPlanoManutencao',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('executado_em', models.DateTimeField(verbose_name='Executado em')),
+                ('completo', models.BooleanField(default=False, verbose_name='Execução Completa')),
+                ('motos_processadas', models.PositiveIntegerField(default=0, verbose_name='Motos Processadas')),
+                ('planos_criados', models.PositiveIntegerField(default=0, verbose_name='Planos Criados')),
+                ('planos_atualizados', models.PositiveIntegerField(default=0, verbose_name='Planos Atualizados')),
+            ],
+            options={
+                'verbose_name': 'Execução do Plano de Manutenção',
+                'verbose_name_plural': 'Execuções do Plano de Manutenção',
+                'ordering': ['-executado_em'],
+            },
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.6 on 2026-10-19 13:55
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('manutencoes', '0002_execucaoplanomanutencao'),
+        ('motos', '0005_indices_listagem'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='manutencao',
+            index=models.Index(fields=['-criado_em', '-id'], name='manutencao_criado_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='manutencao',
+            index=models.Index(fields=['moto', '-criado_em'], name='manutencao_moto_criado_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='manutencao',
+            index=models.Index(fields=['criado_por', '-criado_em'], name='manutencao_usuario_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='manutencao',
+            index=models.Index(fields=['moto', 'tipo', 'status'], name='manutencao_moto_tipo_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='manutencao',
+            index=models.Index(fields=['status', 'atualizado_em'], name='manutencao_status_idx'),
+        ),
+    ]
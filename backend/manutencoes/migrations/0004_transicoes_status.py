@@ -0,0 +1,57 @@
+# Generated by Django 5.2.6 on 2026-10-19 14:00
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+def registrar_status_atual(apps, schema_editor):
+    """Cada manutenção existente começa o log no status atual"""
+    Manutencao = apps.get_model('manutencoes', 'Manutencao')
+    TransicaoStatusManutencao = apps.get_model('manutencoes', 'TransicaoStatusManutencao')
+
+    lote = []
+    for manutencao in Manutencao.objects.values('id', 'moto_id', 'status', 'atualizado_em').iterator(chunk_size=1000):
+        lote.append(TransicaoStatusManutencao(
+            manutencao_id=manutencao['id'],
+            moto_id=manutencao['moto_id'],
+            status_novo=manutencao['status'],
+            timestamp=manutencao['atualizado_em'],
+        ))
+        if len(lote) >= 1000:
+            TransicaoStatusManutencao.objects.bulk_create(lote)
+            lote = []
+    TransicaoStatusManutencao.objects.bulk_create(lote)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('manutencoes', '0003_indices_listagem'),
+        ('motos', '0005_indices_listagem'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TransicaoStatusManutencao',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status_anterior', models.CharField(blank=True, choices=[('planejada', 'Planejada'), ('comprada', 'Itens Comprados'), ('em_andamento', 'Em Andamento'), ('concluida', 'Concluída'), ('cancelada', 'Cancelada')], max_length=20, null=True, verbose_name='Status Anterior')),
+                ('status_novo', models.CharField(choices=[('planejada', 'Planejada'), ('comprada', 'Itens Comprados'), ('em_andamento', 'Em Andamento'), ('concluida', 'Concluída'), ('cancelada', 'Cancelada')], max_length=20, verbose_name='Novo Status')),
+                ('timestamp', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Data da Transição')),
+                ('duracao_anterior', models.DurationField(blank=True, null=True, verbose_name='Tempo no Status Anterior')),
+                ('manutencao', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='transicoes', to='manutencoes.manutencao')),
+                ('moto', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='transicoes_manutencao', to='motos.moto')),
+                ('usuario', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='transicoes_manutencao', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Transição de Status',
+                'verbose_name_plural': 'Transições de Status',
+                'ordering': ['timestamp', 'id'],
+                'indexes': [models.Index(fields=['moto', 'timestamp'], name='transicao_moto_ts_idx'), models.Index(fields=['manutencao', 'timestamp'], name='transicao_manutencao_ts_idx')],
+            },
+        ),
+        migrations.RunPython(registrar_status_atual, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-19 14:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('manutencoes', '0004_transicoes_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='historicomanutencao',
+            name='fotos_metadados',
+            field=models.JSONField(blank=True, default=dict, verbose_name='Metadados das Fotos'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.6 on 2026-10-19 14:42
+
+from django.db import migrations, models
+
+
+def marcar_planos_gerados(apps, schema_editor):
+    """Planos criados pelo gerador antes do campo existir (mesma descrição, sem criador)"""
+    Manutencao = apps.get_model('manutencoes', 'Manutencao')
+    Manutencao.objects.filter(
+        criado_por__isnull=True,
+        descricao='Gerada automaticamente pelo plano de manutenção.',
+    ).update(origem='plano')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('manutencoes', '0005_fotos_metadados'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='manutencao',
+            name='origem',
+            field=models.CharField(choices=[('manual', 'Manual'), ('plano', 'Plano de Manutenção')], default='manual', editable=False, max_length=20, verbose_name='Origem'),
+        ),
+        migrations.RunPython(marcar_planos_gerados, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-19 14:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('manutencoes', '0006_origem_manutencao'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='execucaoplanomanutencao',
+            name='intervalos',
+            field=models.JSONField(blank=True, default=dict, verbose_name='Intervalos dos Tipos'),
+        ),
+    ]
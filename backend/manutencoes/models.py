@@ -1,7 +1,20 @@
-from django.db import models
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from django.db.models import ExpressionWrapper, F, FloatField, Max, Value
+from django.db.models.functions import Cast
+from django.db.models.functions import Round
+from django.utils import timezone
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator, MaxValueValidator
 from motos.models import Moto
+from .catalogo import invalidar_precos
+
+
+TAMANHO_LOTE_TRANSICOES = 500
+
+CENTAVOS = Decimal('0.01')
 
 
 class TipoManutencao(models.Model):
@@ -55,6 +68,66 @@ class ItemManutencao(models.Model):
         return f"{self.tipo} - {self.nome}"
 
 
+class ManutencaoQuerySet(models.QuerySet):
+    """QuerySet que registra as transições de status nas operações em lote"""
+
+    def de_motos_ativas(self):
+        return self.filter(moto__ativo=True)
+
+    def bulk_create(self, objs, *args, **kwargs):
+        """Insere o lote e o status inicial de cada manutenção na mesma transação"""
+        objs = list(objs)
+        with transaction.atomic(using=self.db):
+            criadas = super().bulk_create(objs, *args, **kwargs)
+            TransicaoStatusManutencao.objects.bulk_create([
+                TransicaoStatusManutencao(
+                    manutencao_id=manutencao.pk,
+                    moto_id=manutencao.moto_id,
+                    status_novo=manutencao.status,
+                    timestamp=manutencao.criado_em,
+                    usuario_id=manutencao.criado_por_id,
+                )
+                for manutencao in criadas
+            ])
+        return criadas
+
+    def alterar_status(self, status, usuario=None):
+        """
+        Altera o status das manutenções do queryset registrando as transições
+
+        Um UPDATE por lote e um bulk_create do log, na mesma transação.
+        Manutenções que já estão no status pedido são ignoradas. Retorna o
+        número de manutenções alteradas.
+        """
+        agora = timezone.now()
+        alteradas = 0
+        with transaction.atomic(using=self.db):
+            atuais = list(self.exclude(status=status).values_list('id', 'moto_id', 'status'))
+            for inicio in range(0, len(atuais), TAMANHO_LOTE_TRANSICOES):
+                lote = atuais[inicio:inicio + TAMANHO_LOTE_TRANSICOES]
+                ids = [manutencao_id for manutencao_id, _, _ in lote]
+                entradas = dict(
+                    TransicaoStatusManutencao.objects.filter(manutencao_id__in=ids)
+                    .values('manutencao_id').annotate(ultima=Max('timestamp'))
+                    .values_list('manutencao_id', 'ultima').order_by()
+                )
+                Manutencao.objects.filter(id__in=ids).update(status=status, atualizado_em=agora)
+                TransicaoStatusManutencao.objects.bulk_create([
+                    TransicaoStatusManutencao(
+                        manutencao_id=manutencao_id,
+                        moto_id=moto_id,
+                        status_anterior=status_anterior,
+                        status_novo=status,
+                        timestamp=agora,
+                        duracao_anterior=agora - entradas[manutencao_id] if manutencao_id in entradas else None,
+                        usuario=usuario,
+                    )
+                    for manutencao_id, moto_id, status_anterior in lote
+                ])
+                alteradas += len(lote)
+        return alteradas
+
+
 class Manutencao(models.Model):
     """Registro de manutenções realizadas ou planejadas"""
 
@@ -72,6 +145,13 @@ class Manutencao(models.Model):
     ]
     status = models.CharField('Status', max_length=20, choices=STATUS_CHOICES, default='planejada')
 
+    # Origem: o gerador de planos só atualiza as manutenções que ele criou
+    ORIGEM_CHOICES = [
+        ('manual', 'Manual'),
+        ('plano', 'Plano de Manutenção'),
+    ]
+    origem = models.CharField('Origem', max_length=20, choices=ORIGEM_CHOICES, default='manual', editable=False)
+
     # Informações básicas
     titulo = models.CharField('Título', max_length=200)
     descricao = models.TextField('Descrição', blank=True, null=True)
@@ -105,10 +185,48 @@ class Manutencao(models.Model):
         verbose_name = 'Manutenção'
         verbose_name_plural = 'Manutenções'
         ordering = ['-data_planejada', '-criado_em']
+        indexes = [
+            models.Index(fields=['-criado_em', '-id'], name='manutencao_criado_idx'),
+            models.Index(fields=['moto', '-criado_em'], name='manutencao_moto_criado_idx'),
+            models.Index(fields=['criado_por', '-criado_em'], name='manutencao_usuario_idx'),
+            models.Index(fields=['moto', 'tipo', 'status'], name='manutencao_moto_tipo_idx'),
+            models.Index(fields=['status', 'atualizado_em'], name='manutencao_status_idx'),
+        ]
+
+    objects = ManutencaoQuerySet.as_manager()
 
     def __str__(self):
         return f"{self.tipo} - {self.moto} ({self.get_status_display()})"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instancia = super().from_db(db, field_names, values)
+        # Status gravado, para detectar a transição no save()
+        instancia._status_gravado = instancia.__dict__.get('status')
+        return instancia
+
+    def save(self, *args, **kwargs):
+        """Grava a manutenção e, se o status mudou, a transição na mesma transação"""
+        update_fields = kwargs.get('update_fields')
+        registrar = update_fields is None or 'status' in update_fields
+        status_anterior = None
+        if registrar and not self._state.adding:
+            status_anterior = getattr(self, '_status_gravado', None)
+            if status_anterior is None:
+                status_anterior = Manutencao.objects.filter(pk=self.pk).values_list('status', flat=True).first()
+            registrar = status_anterior != self.status
+
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+            if registrar:
+                # usuario_transicao é definido pelas views; na criação vale o criador
+                usuario = getattr(self, 'usuario_transicao', None)
+                TransicaoStatusManutencao.registrar(
+                    self, status_anterior,
+                    usuario_id=usuario.pk if usuario else (self.criado_por_id if status_anterior is None else None),
+                )
+        self._status_gravado = self.status
+
     @property
     def duracao(self):
         """Retorna a duração da manutenção em dias"""
@@ -132,6 +250,92 @@ class Manutencao(models.Model):
         return 0
 
 
+def _validar_valor_total(valor_total: Decimal) -> None:
+    ItemManutencaoRealizada._meta.get_field('valor_total').run_validators(valor_total)
+
+
+def calcular_valor_total(quantidade, valor_unitario) -> Decimal:
+    """
+    quantidade * valor unitário arredondado a 2 casas, como o Round(..., 2) do update()
+
+    Raises:
+        ValidationError: se o total não cabe em valor_total (max_digits=10)
+    """
+    try:
+        valor_total = (Decimal(str(quantidade)) * Decimal(str(valor_unitario))).quantize(
+            CENTAVOS, rounding=ROUND_HALF_UP
+        )
+    except InvalidOperation:
+        raise ValidationError('Valor total inválido ou grande demais.')
+    _validar_valor_total(valor_total)
+    return valor_total
+
+
+class ItemManutencaoRealizadaQuerySet(models.QuerySet):
+    """QuerySet que mantém o valor_total correto nas operações em lote"""
+
+    @staticmethod
+    def _valor_total_expressao(quantidade=None, valor_unitario=None):
+        """Expressão SQL para quantidade_utilizada * valor_unitario"""
+        def _expressao(valor, campo):
+            if valor is None:
+                return F(campo)
+            return valor if hasattr(valor, 'resolve_expression') else Value(valor)
+
+        return ExpressionWrapper(
+            Round(_expressao(quantidade, 'quantidade_utilizada') * _expressao(valor_unitario, 'valor_unitario'), 2),
+            output_field=models.DecimalField(max_digits=10, decimal_places=2)
+        )
+
+    def bulk_create(self, objs, *args, **kwargs):
+        """Calcula o valor total de todo o lote antes de inserir"""
+        objs = list(objs)
+        for obj in objs:
+            obj.valor_total = calcular_valor_total(obj.quantidade_utilizada, obj.valor_unitario)
+        criados = super().bulk_create(objs, *args, **kwargs)
+        invalidar_precos()
+        return criados
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        """Recalcula o valor total quando quantidade ou valor unitário mudam"""
+        objs = list(objs)
+        fields = list(fields)
+        if {'quantidade_utilizada', 'valor_unitario'} & set(fields):
+            for obj in objs:
+                obj.valor_total = calcular_valor_total(obj.quantidade_utilizada, obj.valor_unitario)
+            if 'valor_total' not in fields:
+                fields.append('valor_total')
+        atualizados = super().bulk_update(objs, fields, *args, **kwargs)
+        if 'valor_unitario' in fields:
+            invalidar_precos()
+        return atualizados
+
+    def update(self, **kwargs):
+        """
+        Atualiza em um único UPDATE, recalculando valor_total na mesma instrução
+
+        Os novos valores de quantidade/valor unitário entram direto na expressão,
+        pois o lado direito do SET enxerga os valores antigos das colunas. Antes
+        do UPDATE, o maior total resultante é conferido contra max_digits.
+        """
+        if 'valor_total' not in kwargs and ({'quantidade_utilizada', 'valor_unitario'} & kwargs.keys()):
+            kwargs['valor_total'] = self._valor_total_expressao(
+                kwargs.get('quantidade_utilizada'), kwargs.get('valor_unitario')
+            )
+            # Em float: um total que não cabe no campo quebraria a conversão para Decimal
+            maior = self.aggregate(maior=Max(Cast(kwargs['valor_total'], FloatField())))['maior']
+            if maior is not None:
+                _validar_valor_total(Decimal(str(round(maior, 2))))
+        atualizados = super().update(**kwargs)
+        if 'valor_unitario' in kwargs:
+            invalidar_precos()
+        return atualizados
+
+    def recalcular_valor_total(self):
+        """UPDATE ... SET valor_total = quantidade_utilizada * valor_unitario"""
+        return super().update(valor_total=self._valor_total_expressao())
+
+
 class ItemManutencaoRealizada(models.Model):
     """Itens específicos utilizados em uma manutenção"""
 
@@ -154,6 +358,8 @@ class ItemManutencaoRealizada(models.Model):
     # Observações
     observacoes = models.TextField('Observações', blank=True, null=True)
 
+    objects = ItemManutencaoRealizadaQuerySet.as_manager()
+
     class Meta:
         verbose_name = 'Item Utilizado'
         verbose_name_plural = 'Itens Utilizados'
@@ -164,7 +370,7 @@ class ItemManutencaoRealizada(models.Model):
 
     def save(self, *args, **kwargs):
         """Calcula o valor total automaticamente"""
-        self.valor_total = self.quantidade_utilizada * self.valor_unitario
+        self.valor_total = calcular_valor_total(self.quantidade_utilizada, self.valor_unitario)
         super().save(*args, **kwargs)
 
 
@@ -187,6 +393,8 @@ class HistoricoManutencao(models.Model):
     fotos_antes = models.ImageField('Fotos Antes', upload_to='manutencao/fotos_antes/', blank=True, null=True)
     fotos_depois = models.ImageField('Fotos Depois', upload_to='manutencao/fotos_depois/', blank=True, null=True)
     relatorio_tecnico = models.FileField('Relatório Técnico', upload_to='manutencao/relatorios/', blank=True, null=True)
+    # Preenchido pelo processamento das fotos: hash, dimensões e tamanhos das prévias por campo
+    fotos_metadados = models.JSONField('Metadados das Fotos', default=dict, blank=True)
 
     # Metadados
     criado_em = models.DateTimeField('Criado em', auto_now_add=True)
@@ -199,3 +407,79 @@ class HistoricoManutencao(models.Model):
 
     def __str__(self):
         return f"Histórico - {self.manutencao}"
+
+
+class ExecucaoPlanoManutencao(models.Model):
+    """Registro das execuções do gerador de planos de manutenção"""
+
+    executado_em = models.DateTimeField('Executado em')
+    completo = models.BooleanField('Execução Completa', default=False)
+
+    # Resultado
+    motos_processadas = models.PositiveIntegerField('Motos Processadas', default=0)
+    planos_criados = models.PositiveIntegerField('Planos Criados', default=0)
+    planos_atualizados = models.PositiveIntegerField('Planos Atualizados', default=0)
+
+    # Tipo id -> [intervalo_km, intervalo_meses] usados na execução
+    intervalos = models.JSONField('Intervalos dos Tipos', default=dict, blank=True)
+
+    class Meta:
+        verbose_name = 'Execução do Plano de Manutenção'
+        verbose_name_plural = 'Execuções do Plano de Manutenção'
+        ordering = ['-executado_em']
+
+    def __str__(self):
+        return f"Plano de manutenção - {self.executado_em:%d/%m/%Y %H:%M}"
+
+
+class TransicaoStatusManutencao(models.Model):
+    """
+    Log das mudanças de status de uma manutenção (somente inserção)
+
+    Cada linha guarda quanto tempo a manutenção ficou no status anterior,
+    para que o tempo médio por status seja uma consulta agrupada.
+    """
+
+    manutencao = models.ForeignKey(Manutencao, on_delete=models.CASCADE, related_name='transicoes')
+    # Denormalizado da manutenção para a linha do tempo por moto
+    moto = models.ForeignKey(Moto, on_delete=models.CASCADE, related_name='transicoes_manutencao')
+
+    status_anterior = models.CharField('Status Anterior', max_length=20, choices=Manutencao.STATUS_CHOICES,
+                                       blank=True, null=True)
+    status_novo = models.CharField('Novo Status', max_length=20, choices=Manutencao.STATUS_CHOICES)
+    timestamp = models.DateTimeField('Data da Transição', default=timezone.now)
+    duracao_anterior = models.DurationField('Tempo no Status Anterior', blank=True, null=True)
+
+    usuario = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True,
+                                related_name='transicoes_manutencao')
+
+    class Meta:
+        verbose_name = 'Transição de Status'
+        verbose_name_plural = 'Transições de Status'
+        ordering = ['timestamp', 'id']
+        indexes = [
+            models.Index(fields=['moto', 'timestamp'], name='transicao_moto_ts_idx'),
+            models.Index(fields=['manutencao', 'timestamp'], name='transicao_manutencao_ts_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.manutencao_id}: {self.status_anterior or '-'} -> {self.status_novo}"
+
+    @classmethod
+    def registrar(cls, manutencao, status_anterior, usuario_id=None):
+        """Registra uma transição calculando o tempo desde a anterior"""
+        agora = timezone.now()
+        duracao = None
+        if status_anterior is not None:
+            ultima = cls.objects.filter(manutencao=manutencao).aggregate(ultima=Max('timestamp'))['ultima']
+            if ultima is not None:
+                duracao = agora - ultima
+        return cls.objects.create(
+            manutencao=manutencao,
+            moto_id=manutencao.moto_id,
+            status_anterior=status_anterior,
+            status_novo=manutencao.status,
+            timestamp=agora,
+            duracao_anterior=duracao,
+            usuario_id=usuario_id,
+        )
@@ -2,7 +2,9 @@
 Serializers for Manutencoes app.
 """
 from rest_framework import serializers
-from .models import Manutencao
+from .catalogo import obter_catalogo
+from .models import Manutencao, HistoricoManutencao
+from .services.fotos_service import FotosHistoricoService
 
 
 class ManutencaoSerializer(serializers.ModelSerializer):
@@ -22,9 +24,13 @@ class ManutencaoSerializer(serializers.ModelSerializer):
         data = super().to_representation(instance)
         
         # Format dates
-        if instance.data_manutencao:
-            data['data_manutencao_formatada'] = instance.data_manutencao.strftime('%d/%m/%Y')
+        if instance.data_planejada:
+            data['data_planejada_formatada'] = instance.data_planejada.strftime('%d/%m/%Y')
         
+        # Type name from the in-memory catalog (no extra query)
+        tipo = self._catalogo().tipos_por_id.get(instance.tipo_id)
+        data['tipo_nome'] = tipo['nome'] if tipo else None
+
         # Add motorcycle info
         if instance.moto:
             data['moto_info'] = {
@@ -35,3 +41,33 @@ class ManutencaoSerializer(serializers.ModelSerializer):
             }
         
         return data
+
+    def _catalogo(self):
+        """
+        Catalog resolved once per serializer call.
+
+        The context dict is shared by every row of a list, so the version
+        check (a cache round trip) runs once instead of once per row.
+        """
+        if 'catalogo' not in self.context:
+            self.context['catalogo'] = obter_catalogo()
+        return self.context['catalogo']
+
+
+class HistoricoManutencaoSerializer(serializers.ModelSerializer):
+    """
+    Serializer for HistoricoManutencao with photo previews.
+    """
+
+    class Meta:
+        model = HistoricoManutencao
+        exclude = ['fotos_metadados']
+        read_only_fields = ['id', 'criado_em', 'atualizado_em']
+
+    def to_representation(self, instance):
+        """
+        Add preview URLs and dimensions for the before/after photos.
+        """
+        data = super().to_representation(instance)
+        data['fotos_previas'] = FotosHistoricoService.previas(instance)
+        return data
@@ -0,0 +1,116 @@
+"""
+Service for processing HistoricoManutencao before/after photos.
+"""
+import logging
+import os
+from typing import Any, Dict
+
+from django.db import connection
+from arquivos import imagens
+from ..models import HistoricoManutencao
+
+
+logger = logging.getLogger(__name__)
+
+CAMPOS_FOTO = ('fotos_antes', 'fotos_depois')
+
+# Prévias para as telas de histórico; 'grande' é a versão de visualização
+TAMANHOS_PREVIA = ('miniatura', 'media', 'grande')
+
+
+class FotosHistoricoService:
+    """
+    Normaliza as fotos do histórico e gera as prévias.
+
+    As fotos originais ficam intactas; as prévias saem com a orientação EXIF
+    aplicada, sem metadados, em JPEG progressivo e WebP. Os tamanhos e
+    dimensões ficam em HistoricoManutencao.fotos_metadados.
+    """
+
+    @staticmethod
+    def processar(historico_id: int) -> Dict[str, Any]:
+        """Processa as fotos de um histórico (pula as que não mudaram)"""
+        historico = HistoricoManutencao.objects.filter(pk=historico_id).only(
+            'id', *CAMPOS_FOTO, 'fotos_metadados'
+        ).first()
+        if historico is None:
+            return {}
+
+        metadados = dict(historico.fotos_metadados or {})
+        for campo in CAMPOS_FOTO:
+            arquivo = getattr(historico, campo)
+            if not arquivo or not imagens.imagem_permitida(arquivo.name):
+                metadados.pop(campo, None)
+                continue
+
+            sha256 = imagens.hash_origem(arquivo.name)
+            if sha256 is None or (metadados.get(campo) or {}).get('sha256') == sha256:
+                continue
+
+            previas = {}
+            for tamanho in TAMANHOS_PREVIA:
+                previas[tamanho] = {
+                    formato: os.path.getsize(imagens.gerar_rendicao(arquivo.name, sha256, tamanho, formato))
+                    for formato in imagens.FORMATOS
+                }
+            metadados[campo] = {
+                'nome': arquivo.name,
+                'sha256': sha256,
+                'bytes_original': arquivo.size,
+                **imagens.dimensoes(arquivo.name),
+                'bytes_previas': previas,
+            }
+
+        # UPDATE direto: não dispara o post_save que agendou este processamento
+        HistoricoManutencao.objects.filter(pk=historico_id).update(fotos_metadados=metadados)
+        return metadados
+
+    @staticmethod
+    def agendar(historico_id: int) -> bool:
+        """
+        Processa em segundo plano, no pool limitado de imagens
+
+        Com a fila cheia processa na própria requisição, para os metadados
+        nunca ficarem sem gravar. Retorna False nesse caso.
+        """
+        if imagens.executar_em_segundo_plano(_processar_em_thread, historico_id):
+            return True
+        logger.warning('Fila de imagens cheia; processando fotos do histórico %s na requisição', historico_id)
+        try:
+            FotosHistoricoService.processar(historico_id)
+        except Exception:
+            logger.exception('Falha ao processar as fotos do histórico %s', historico_id)
+        return False
+
+    @staticmethod
+    def previas(historico: HistoricoManutencao) -> Dict[str, Any]:
+        """URLs das prévias de cada foto, a partir dos metadados gravados"""
+        resultado = {}
+        for campo in CAMPOS_FOTO:
+            arquivo = getattr(historico, campo)
+            if not arquivo:
+                resultado[campo] = None
+                continue
+            info = (historico.fotos_metadados or {}).get(campo)
+            if info and info.get('nome') == arquivo.name:
+                resultado[campo] = {
+                    'largura': info['largura'],
+                    'altura': info['altura'],
+                    'urls': imagens.montar_urls(arquivo.name, info['sha256'], TAMANHOS_PREVIA),
+                }
+            else:
+                # Ainda não processada: as URLs geram as prévias no primeiro acesso
+                resultado[campo] = {
+                    'largura': None,
+                    'altura': None,
+                    'urls': imagens.urls_rendicoes(arquivo, TAMANHOS_PREVIA),
+                }
+        return resultado
+
+
+def _processar_em_thread(historico_id: int) -> None:
+    try:
+        FotosHistoricoService.processar(historico_id)
+    finally:
+        # A thread do pool abre a própria conexão; fecha ao terminar
+        connection.close()
@@ -0,0 +1,149 @@
+"""
+Service for "km at date" lookups over the odometer history.
+"""
+from array import array
+from bisect import bisect_right
+from collections import defaultdict
+from datetime import date, datetime, time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.db import transaction
+from django.utils import timezone
+from motos.models import Moto, LeituraKm
+from ..models import Manutencao
+
+
+TAMANHO_LOTE = 1000
+
+
+def _segundos(momento) -> float:
+    """Datas e datetimes como segundos desde a época (datas à meia-noite local)"""
+    if isinstance(momento, datetime):
+        if timezone.is_naive(momento):
+            momento = timezone.make_aware(momento)
+        return momento.timestamp()
+    if isinstance(momento, date):
+        return timezone.make_aware(datetime.combine(momento, time.min)).timestamp()
+    return float(momento)
+
+
+class HistoricoKm:
+    """
+    Pontos (momento, km) de uma moto, ordenados e monotônicos
+
+    km_em() interpola linearmente entre os pontos vizinhos (busca binária)
+    e fica constante fora do intervalo conhecido.
+    """
+
+    __slots__ = ('tempos', 'kms')
+
+    def __init__(self, pontos: Iterable[Tuple[float, int]]):
+        self.tempos = array('d')
+        self.kms = array('d')
+        maximo = 0.0
+        for tempo, km in sorted(pontos):
+            # O hodômetro não volta: leituras fora de ordem não baixam a curva
+            maximo = max(maximo, float(km))
+            if self.tempos and tempo == self.tempos[-1]:
+                self.kms[-1] = maximo
+                continue
+            self.tempos.append(tempo)
+            self.kms.append(maximo)
+
+    def __len__(self):
+        return len(self.tempos)
+
+    def km_em(self, momento) -> Optional[float]:
+        if not self.tempos:
+            return None
+        tempo = _segundos(momento)
+        indice = bisect_right(self.tempos, tempo)
+        if indice == 0:
+            return self.kms[0]
+        if indice == len(self.tempos):
+            return self.kms[-1]
+        t0, t1 = self.tempos[indice - 1], self.tempos[indice]
+        k0, k1 = self.kms[indice - 1], self.kms[indice]
+        return k0 + (k1 - k0) * (tempo - t0) / (t1 - t0)
+
+    def kms_em(self, momentos: Iterable) -> List[Optional[float]]:
+        return [self.km_em(momento) for momento in momentos]
+
+
+class HodometroService:
+    """
+    Carrega o histórico de km de várias motos de uma vez e responde "km em t".
+
+    Pontos usados: a compra (km_compra), as leituras aceitas de LeituraKm,
+    o km registrado nas manutenções e o km_atual da moto.
+    """
+
+    @staticmethod
+    def carregar(moto_ids: Iterable[int]) -> Dict[int, HistoricoKm]:
+        """Três consultas por lote de motos"""
+        moto_ids = list(set(moto_ids))
+        pontos = defaultdict(list)
+
+        for inicio in range(0, len(moto_ids), TAMANHO_LOTE):
+            lote = moto_ids[inicio:inicio + TAMANHO_LOTE]
+
+            for moto in Moto.objects.filter(pk__in=lote).values(
+                'id', 'km_compra', 'data_compra', 'km_atual', 'criado_em', 'atualizado_em'
+            ):
+                pontos[moto['id']].append((_segundos(moto['data_compra'] or moto['criado_em']), moto['km_compra']))
+                pontos[moto['id']].append((_segundos(moto['atualizado_em']), moto['km_atual']))
+
+            for moto_id, lida_em, km in LeituraKm.objects.filter(
+                moto_id__in=lote, aceita=True
+            ).values_list('moto_id', 'lida_em', 'km').iterator(chunk_size=TAMANHO_LOTE):
+                pontos[moto_id].append((_segundos(lida_em), km))
+
+            for moto_id, momento, km in HodometroService._pontos_manutencoes(lote):
+                pontos[moto_id].append((_segundos(momento), km))
+
+        return {moto_id: HistoricoKm(pontos[moto_id]) for moto_id in moto_ids}
+
+    @staticmethod
+    def _pontos_manutencoes(moto_ids):
+        # km_atual = 0 é "não informado" e fica de fora
+        manutencoes = Manutencao.objects.filter(moto_id__in=moto_ids, km_atual__gt=0).values_list(
+            'moto_id', 'data_conclusao', 'data_inicio', 'criado_em', 'km_atual'
+        ).order_by()
+        for moto_id, conclusao, inicio, criado_em, km in manutencoes.iterator(chunk_size=TAMANHO_LOTE):
+            yield moto_id, conclusao or inicio or criado_em, km
+
+    @staticmethod
+    def km_em_lote(consultas: Iterable[Tuple[int, object]]) -> List[Optional[float]]:
+        """Responde uma lista de (moto_id, momento) carregando cada moto uma vez"""
+        consultas = list(consultas)
+        historicos = HodometroService.carregar(moto_id for moto_id, _ in consultas)
+        return [historicos[moto_id].km_em(momento) for moto_id, momento in consultas]
+
+    @staticmethod
+    def preencher_km_manutencoes(dry_run: bool = False) -> Dict[str, int]:
+        """
+        Estima km_atual das manutenções gravadas com 0
+
+        Usa a data de conclusão (ou início, ou criação) e o histórico da moto;
+        grava com bulk_update.
+        """
+        pendentes = list(Manutencao.objects.filter(km_atual=0).values_list(
+            'id', 'moto_id', 'data_conclusao', 'data_inicio', 'criado_em'
+        ))
+        historicos = HodometroService.carregar({moto_id for _, moto_id, _, _, _ in pendentes})
+
+        alteradas = []
+        for manutencao_id, moto_id, conclusao, inicio, criado_em in pendentes:
+            km = historicos[moto_id].km_em(conclusao or inicio or criado_em)
+            if km:
+                alteradas.append(Manutencao(id=manutencao_id, km_atual=round(km)))
+
+        if not dry_run:
+            with transaction.atomic():
+                Manutencao.objects.bulk_update(alteradas, ['km_atual'], batch_size=TAMANHO_LOTE)
+
+        return {
+            'pendentes': len(pendentes),
+            'preenchidas': len(alteradas),
+            'dry_run': dry_run,
+        }
@@ -0,0 +1,369 @@
+from datetime import date, datetime, time
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from django.core.exceptions import ValidationError
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from busca.indexacao import indexar_em_lote
+from moto_maintenance.importacao import ler_registros
+from motos.models import KM_MAXIMO, Moto
+from ..catalogo import obter_catalogo
+from ..models import Manutencao, ItemManutencaoRealizada, calcular_valor_total
+
+
+TAMANHO_LOTE_PADRAO = 1000
+
+STATUS_VALIDOS = {valor for valor, _ in Manutencao.STATUS_CHOICES}
+
+CAMPOS_TEXTO = {
+    'titulo': 200,
+    'local_manutencao': 100,
+    'responsavel': 100,
+}
+
+
+class ImportacaoManutencaoService:
+    """Service para importação em lote do histórico de manutenções"""
+
+    @staticmethod
+    def ler_registros(arquivo, formato: str) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """
+        Lê os registros do arquivo de forma incremental
+
+        Args:
+            arquivo: Arquivo (texto ou binário) com os dados
+            formato: 'csv', 'json' (lista de objetos) ou 'jsonl' (um objeto por linha)
+
+        Returns:
+            Iterador de tuplas (número da linha, registro)
+        """
+        return ler_registros(arquivo, formato)
+
+    @staticmethod
+    def importar(registros: Iterable[Tuple[int, Dict[str, Any]]], usuario=None,
+                 tamanho_lote: int = TAMANHO_LOTE_PADRAO, dry_run: bool = False) -> Dict[str, Any]:
+        """
+        Serviço para importar manutenções e itens utilizados em lote
+
+        Args:
+            registros: Iterável de tuplas (número da linha, registro)
+            usuario: Usuário registrado como criador das manutenções
+            tamanho_lote: Quantidade de linhas validadas e gravadas por transação
+            dry_run: Apenas valida, sem gravar no banco
+
+        Returns:
+            Dict com o resumo da importação e os erros por linha
+        """
+        importador = _Importador(usuario, dry_run)
+        registros = iter(registros)
+
+        while True:
+            lote = list(islice(registros, tamanho_lote))
+            if not lote:
+                break
+            importador.processar_lote(lote)
+
+        return {
+            'success': not importador.erros,
+            'total_linhas': importador.total_linhas,
+            'validas': importador.validas,
+            'importadas': importador.importadas,
+            'itens_importados': importador.itens_importados,
+            'dry_run': dry_run,
+            'erros': importador.erros,
+        }
+
+
+class _Importador:
+    """Estado de uma importação: catálogo de referência e contadores"""
+
+    def __init__(self, usuario, dry_run: bool):
+        self.usuario = usuario if usuario is not None and usuario.is_authenticated else None
+        self.dry_run = dry_run
+        self.total_linhas = 0
+        self.validas = 0
+        self.importadas = 0
+        self.itens_importados = 0
+        self.erros: List[Dict[str, Any]] = []
+        self.catalogo = obter_catalogo()
+
+    def processar_lote(self, lote: List[Tuple[int, Dict[str, Any]]]):
+        """Valida o lote inteiro e grava as linhas válidas em uma transação"""
+        self.total_linhas += len(lote)
+
+        ids_motos = set()
+        for _, registro in lote:
+            moto_id = _inteiro(registro.get('moto_id', registro.get('moto')) if isinstance(registro, dict) else None)
+            if moto_id is not None and _erro_campo(Moto, 'id', moto_id) is None:
+                ids_motos.add(moto_id)
+        motos_existentes = set(Moto.objects.filter(pk__in=ids_motos).values_list('pk', flat=True))
+
+        validas = []
+        for numero, registro in lote:
+            erros, manutencao, itens = self._validar(registro, motos_existentes)
+            if erros:
+                self.erros.append({'linha': numero, 'erros': erros})
+            else:
+                validas.append((numero, manutencao, itens))
+
+        self.validas += len(validas)
+        if not validas or self.dry_run:
+            return
+
+        try:
+            with transaction.atomic():
+                manutencoes = Manutencao.objects.bulk_create([m for _, m, _ in validas])
+                itens = []
+                for manutencao, (_, _, itens_linha) in zip(manutencoes, validas):
+                    for item in itens_linha:
+                        item.manutencao_id = manutencao.pk
+                        itens.append(item)
+                # O manager calcula valor_total de todo o lote antes de inserir
+                ItemManutencaoRealizada.objects.bulk_create(itens)
+                # bulk_create não dispara os signals que mantêm a busca textual
+                indexar_em_lote(manutencoes)
+        except DatabaseError as e:
+            for numero, _, _ in validas:
+                self.erros.append({'linha': numero, 'erros': {'__all__': [f'Erro ao gravar lote: {str(e)}']}})
+            return
+
+        self.importadas += len(manutencoes)
+        self.itens_importados += len(itens)
+
+    def _validar(self, registro, motos_existentes) -> Tuple[Dict[str, List[str]], Optional[Manutencao], list]:
+        """Valida uma linha e monta as instâncias (ainda não salvas)"""
+        erros: Dict[str, List[str]] = {}
+
+        if not isinstance(registro, dict):
+            return {'__all__': ['Registro deve ser um objeto.']}, None, []
+        if '__erro__' in registro:
+            return {'__all__': [registro['__erro__']]}, None, []
+
+        dados = {}
+
+        # Moto
+        moto_id = _inteiro(registro.get('moto_id', registro.get('moto')))
+        if moto_id is None:
+            erros['moto_id'] = ['Este campo é obrigatório.']
+        elif moto_id not in motos_existentes:
+            erros['moto_id'] = [f'Moto {moto_id} não encontrada.']
+        else:
+            dados['moto_id'] = moto_id
+
+        # Tipo de manutenção (por id ou nome)
+        tipo_id = self._resolver_tipo(registro)
+        if tipo_id is None:
+            erros['tipo'] = ['Tipo de manutenção não encontrado.']
+        else:
+            dados['tipo_id'] = tipo_id
+
+        # Status
+        status = _texto(registro.get('status')) or 'concluida'
+        if status not in STATUS_VALIDOS:
+            erros['status'] = [f'Status inválido: {status}.']
+        else:
+            dados['status'] = status
+
+        # Textos
+        for campo, tamanho in CAMPOS_TEXTO.items():
+            valor = _texto(registro.get(campo))
+            if len(valor) > tamanho:
+                erros[campo] = [f'Deve ter no máximo {tamanho} caracteres.']
+            elif valor:
+                dados[campo] = valor
+        if 'titulo' not in dados and tipo_id is not None:
+            dados['titulo'] = self.catalogo.tipos_por_id[tipo_id]['nome']
+        for campo in ('descricao', 'observacoes'):
+            valor = _texto(registro.get(campo))
+            if valor:
+                dados[campo] = valor
+
+        # Quilometragem
+        km_atual = registro.get('km_atual')
+        if km_atual in (None, ''):
+            erros['km_atual'] = ['Este campo é obrigatório.']
+        for campo in ('km_atual', 'km_proxima'):
+            valor = registro.get(campo)
+            if valor in (None, ''):
+                continue
+            km = _inteiro(valor)
+            if km is None or km < 0:
+                erros[campo] = ['Quilometragem deve ser um número inteiro não negativo.']
+            elif km > KM_MAXIMO:
+                erros[campo] = [f'Quilometragem deve ser no máximo {KM_MAXIMO}.']
+            else:
+                dados[campo] = km
+
+        # Datas
+        valor = registro.get('data_planejada')
+        if valor:
+            data = _data(valor)
+            if data is None:
+                erros['data_planejada'] = ['Data inválida. Use AAAA-MM-DD.']
+            else:
+                dados['data_planejada'] = data
+        for campo in ('data_inicio', 'data_conclusao'):
+            valor = registro.get(campo)
+            if not valor:
+                continue
+            data_hora = _data_hora(valor)
+            if data_hora is None:
+                erros[campo] = ['Data inválida. Use AAAA-MM-DD ou AAAA-MM-DDTHH:MM.']
+            else:
+                dados[campo] = data_hora
+
+        # Valores
+        for campo in ('valor_estimado', 'valor_real'):
+            valor = registro.get(campo)
+            if valor in (None, ''):
+                continue
+            decimal = _decimal(valor)
+            if decimal is None or decimal < 0:
+                erros[campo] = ['Valor deve ser um número não negativo.']
+            elif erro := _erro_campo(Manutencao, campo, decimal):
+                erros[campo] = [erro]
+            else:
+                dados[campo] = decimal
+
+        # Itens utilizados
+        itens = []
+        for indice, item in enumerate(_itens_do_registro(registro.get('itens')), start=1):
+            erro_item, instancia = self._validar_item(item, tipo_id)
+            if erro_item:
+                erros.setdefault('itens', []).append(f'Item {indice}: {erro_item}')
+            else:
+                itens.append(instancia)
+
+        if erros:
+            return erros, None, []
+
+        return {}, Manutencao(criado_por=self.usuario, **dados), itens
+
+    def _resolver_tipo(self, registro) -> Optional[int]:
+        """Resolve o tipo de manutenção pelo id ou pelo nome"""
+        tipo_id = _inteiro(registro.get('tipo_id'))
+        if tipo_id is not None:
+            return tipo_id if tipo_id in self.catalogo.tipos_por_id else None
+        return self.catalogo.tipo_por_nome(registro.get('tipo'))
+
+    def _validar_item(self, item, tipo_id) -> Tuple[Optional[str], Optional[ItemManutencaoRealizada]]:
+        """Valida um item utilizado e resolve o ItemManutencao pelo nome"""
+        if not isinstance(item, dict):
+            return 'formato inválido.', None
+
+        item_id = _inteiro(item.get('item_id'))
+        if item_id is not None:
+            if item_id not in self.catalogo.itens_por_id:
+                return f'item {item_id} não encontrado.', None
+        else:
+            item_id = self.catalogo.item_por_nome(item.get('item', item.get('nome')), tipo_id)
+            if item_id is None:
+                return f'item "{item.get("item", item.get("nome"))}" não encontrado.', None
+
+        quantidade = _decimal(item.get('quantidade', item.get('quantidade_utilizada')))
+        valor_unitario = _decimal(item.get('valor_unitario'))
+        if quantidade is None or quantidade <= 0:
+            return 'quantidade deve ser um número positivo.', None
+        if valor_unitario is None or valor_unitario < 0:
+            return 'valor unitário deve ser um número não negativo.', None
+        if erro := _erro_campo(ItemManutencaoRealizada, 'quantidade_utilizada', quantidade):
+            return f'quantidade: {erro}', None
+        if erro := _erro_campo(ItemManutencaoRealizada, 'valor_unitario', valor_unitario):
+            return f'valor unitário: {erro}', None
+        try:
+            # O mesmo cálculo do bulk_create: o total também precisa caber no campo
+            calcular_valor_total(quantidade, valor_unitario)
+        except ValidationError as e:
+            return f'valor total: {" ".join(e.messages)}', None
+
+        return None, ItemManutencaoRealizada(
+            item_id=item_id,
+            quantidade_utilizada=quantidade,
+            valor_unitario=valor_unitario,
+            marca_utilizada=_texto(item.get('marca_utilizada')) or None,
+            modelo_utilizado=_texto(item.get('modelo_utilizado')) or None,
+            fornecedor=_texto(item.get('fornecedor')) or None,
+            observacoes=_texto(item.get('observacoes')) or None,
+        )
+
+
+def _itens_do_registro(valor) -> list:
+    """
+    Converte a coluna de itens em uma lista de dicionários
+
+    Em JSON os itens vêm como lista de objetos. Em CSV a coluna usa o formato
+    "nome|quantidade|valor_unitario" com os itens separados por ";".
+    """
+    if not valor:
+        return []
+    if isinstance(valor, list):
+        return valor
+    if isinstance(valor, str):
+        itens = []
+        for parte in valor.split(';'):
+            if not parte.strip():
+                continue
+            campos = [c.strip() for c in parte.split('|')]
+            campos += [''] * (3 - len(campos))
+            itens.append({'item': campos[0], 'quantidade': campos[1], 'valor_unitario': campos[2]})
+        return itens
+    return [valor]
+
+
+def _erro_campo(modelo, campo: str, valor) -> Optional[str]:
+    """Validadores do próprio campo do modelo (faixa do inteiro no banco, max_digits/decimal_places)"""
+    try:
+        modelo._meta.get_field(campo).run_validators(valor)
+    except ValidationError as e:
+        return ' '.join(e.messages)
+    return None
+
+
+def _texto(valor) -> str:
+    return str(valor).strip() if valor is not None else ''
+
+
+def _inteiro(valor) -> Optional[int]:
+    if valor in (None, ''):
+        return None
+    try:
+        return int(str(valor).strip())
+    except (ValueError, TypeError):
+        return None
+
+
+def _decimal(valor) -> Optional[Decimal]:
+    if valor in (None, ''):
+        return None
+    try:
+        decimal = Decimal(str(valor).strip().replace(',', '.'))
+    except (InvalidOperation, ValueError):
+        return None
+    return decimal if decimal.is_finite() else None
+
+
+def _data(valor) -> Optional[date]:
+    try:
+        return parse_date(str(valor).strip()[:10])
+    except ValueError:
+        return None
+
+
+def _data_hora(valor) -> Optional[datetime]:
+    """Aceita data ou data/hora ISO e retorna um datetime com timezone"""
+    valor = str(valor).strip()
+    try:
+        data_hora = parse_datetime(valor)
+    except ValueError:
+        return None
+    if data_hora is None:
+        data = _data(valor) if len(valor) == 10 else None
+        if data is None:
+            return None
+        data_hora = datetime.combine(data, time.min)
+    if timezone.is_naive(data_hora):
+        data_hora = timezone.make_aware(data_hora)
+    return data_hora
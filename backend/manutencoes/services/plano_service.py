@@ -0,0 +1,226 @@
+import calendar
+import math
+from datetime import date, timedelta
+from typing import Any, Dict, Optional
+
+from django.db import transaction
+from django.db.models import F, Max, Q
+from django.utils import timezone
+from busca.indexacao import indexar_em_lote
+from motos.models import Moto
+from motos.services.uso_service import UsoRotasService
+from ..catalogo import obter_catalogo
+from ..models import Manutencao, ExecucaoPlanoManutencao
+
+
+TAMANHO_LOTE_MOTOS = 500
+
+# Plano em execução não é alterado pelo gerador
+STATUS_EM_ABERTO = ['planejada', 'comprada', 'em_andamento']
+
+# Abaixo disso o histórico de km é curto demais para estimar o uso diário
+DIAS_MINIMOS_USO = 30
+
+
+class PlanoManutencaoService:
+    """Service que gera manutenções planejadas a partir dos intervalos de cada tipo"""
+
+    @staticmethod
+    def gerar_planos(completo: bool = False) -> Dict[str, Any]:
+        """
+        Gera ou atualiza as manutenções planejadas da frota
+
+        Em modo incremental só processa motos cujo km, rotas ou histórico de
+        manutenções concluídas mudou desde a última execução (gravar uma
+        rota atualiza o atualizado_em da moto), com todos os tipos; e, para
+        os tipos criados ou com intervalo alterado desde então, todas as
+        motos ativas.
+
+        Args:
+            completo: Reprocessa todas as motos ativas
+
+        Returns:
+            Dict com o resumo da execução
+        """
+        agora = timezone.now()
+        hoje = timezone.localdate(agora)
+        ultima = ExecucaoPlanoManutencao.objects.first()
+
+        tipos = [
+            tipo for tipo in obter_catalogo().tipos_ativos()
+            if tipo['intervalo_km'] or tipo['intervalo_meses']
+        ]
+
+        if not tipos:
+            return {
+                'success': False,
+                'message': 'Nenhum tipo de manutenção ativo possui intervalo de km ou meses.'
+            }
+
+        # Intervalos usados nesta execução: a próxima compara com eles para
+        # achar os tipos novos ou alterados
+        intervalos = {str(tipo['id']): [tipo['intervalo_km'], tipo['intervalo_meses']] for tipo in tipos}
+
+        motos = Moto.ativos.order_by('pk')
+        if ultima and not completo:
+            alteradas = Manutencao.objects.filter(
+                status='concluida', atualizado_em__gt=ultima.executado_em
+            ).values('moto_id')
+            ids_motos = list(motos.filter(
+                Q(atualizado_em__gt=ultima.executado_em) | Q(pk__in=alteradas)
+            ).values_list('pk', flat=True))
+            passos = [(ids_motos, tipos)]
+
+            tipos_alterados = [tipo for tipo in tipos if ultima.intervalos.get(str(tipo['id'])) != intervalos[str(tipo['id'])]]
+            if tipos_alterados:
+                # Um tipo novo ou com outro intervalo muda o plano de todas as motos
+                ja_processadas = set(ids_motos)
+                passos.append((
+                    [pk for pk in motos.values_list('pk', flat=True) if pk not in ja_processadas],
+                    tipos_alterados,
+                ))
+        else:
+            passos = [(list(motos.values_list('pk', flat=True)), tipos)]
+
+        execucao = ExecucaoPlanoManutencao(
+            executado_em=agora, completo=completo or ultima is None, intervalos=intervalos
+        )
+
+        for ids_motos, tipos_passo in passos:
+            for inicio in range(0, len(ids_motos), TAMANHO_LOTE_MOTOS):
+                lote = ids_motos[inicio:inicio + TAMANHO_LOTE_MOTOS]
+                criados, atualizados = PlanoManutencaoService._gerar_lote(lote, tipos_passo, hoje)
+                execucao.motos_processadas += len(lote)
+                execucao.planos_criados += criados
+                execucao.planos_atualizados += atualizados
+        execucao.save()
+
+        return {
+            'success': True,
+            'motos_processadas': execucao.motos_processadas,
+            'planos_criados': execucao.planos_criados,
+            'planos_atualizados': execucao.planos_atualizados,
+            'completo': execucao.completo,
+        }
+
+    @staticmethod
+    def _gerar_lote(ids_motos, tipos, hoje: date):
+        """Calcula e grava os planos de um lote de motos com consultas agrupadas"""
+        ids_tipos = [tipo['id'] for tipo in tipos]
+
+        motos = Moto.objects.filter(pk__in=ids_motos).values(
+            'id', 'km_atual', 'km_compra', 'data_compra', 'criado_em', 'perfil__distancia_media_dia'
+        )
+
+        # Última manutenção concluída por (moto, tipo), com o km da próxima
+        # já somado ao intervalo do tipo no banco
+        ultimas = {
+            (linha['moto_id'], linha['tipo_id']): linha
+            for linha in Manutencao.objects.filter(
+                moto_id__in=ids_motos, tipo_id__in=ids_tipos, status='concluida'
+            ).values('moto_id', 'tipo_id').annotate(
+                km_proxima=Max('km_atual') + F('tipo__intervalo_km'),
+                ultima_data=Max('data_conclusao'),
+            ).order_by()
+        }
+
+        # Planos em aberto por (moto, tipo). Só os 'planejada' criados pelo
+        # gerador são atualizados; qualquer outro (do usuário ou já em
+        # execução) bloqueia o par
+        gerados, bloqueados = {}, set()
+        for plano in Manutencao.objects.filter(
+            moto_id__in=ids_motos, tipo_id__in=ids_tipos, status__in=STATUS_EM_ABERTO
+        ).only(
+            'id', 'moto_id', 'tipo_id', 'status', 'origem', 'km_atual', 'km_proxima', 'data_planejada'
+        ).order_by('-criado_em'):
+            chave = (plano.moto_id, plano.tipo_id)
+            if plano.status == 'planejada' and plano.origem == 'plano':
+                gerados.setdefault(chave, plano)
+            else:
+                bloqueados.add(chave)
+
+        # Km semanais declarados nas rotas (do cache, sem consulta por moto)
+        usos = UsoRotasService.perfis(ids_motos)
+
+        novos, alterados = [], []
+        agora = timezone.now()
+        for moto in motos:
+            uso_diario = _uso_diario(moto, hoje, usos[moto['id']])
+            for tipo in tipos:
+                chave = (moto['id'], tipo['id'])
+                if chave in bloqueados:
+                    continue
+                plano = gerados.get(chave)
+
+                km_proxima, data_planejada = _calcular_proxima(moto, tipo, ultimas.get(chave), uso_diario, hoje)
+
+                if plano is None:
+                    novos.append(Manutencao(
+                        moto_id=moto['id'],
+                        tipo_id=tipo['id'],
+                        status='planejada',
+                        origem='plano',
+                        titulo=tipo['nome'],
+                        descricao='Gerada automaticamente pelo plano de manutenção.',
+                        km_atual=moto['km_atual'],
+                        km_proxima=km_proxima,
+                        data_planejada=data_planejada,
+                    ))
+                elif (plano.km_atual, plano.km_proxima, plano.data_planejada) != (moto['km_atual'], km_proxima, data_planejada):
+                    plano.km_atual = moto['km_atual']
+                    plano.km_proxima = km_proxima
+                    plano.data_planejada = data_planejada
+                    plano.atualizado_em = agora
+                    alterados.append(plano)
+
+        with transaction.atomic():
+            Manutencao.objects.bulk_create(novos)
+            indexar_em_lote(novos)
+            Manutencao.objects.bulk_update(
+                alterados, ['km_atual', 'km_proxima', 'data_planejada', 'atualizado_em']
+            )
+
+        return len(novos), len(alterados)
+
+
+def _uso_diario(moto, hoje: date, uso_rotas: Dict[str, Any]) -> Optional[float]:
+    """Km rodados por dia desde a compra, os km das rotas ou a distância média do perfil"""
+    inicio = moto['data_compra'] or timezone.localdate(moto['criado_em'])
+    dias = (hoje - inicio).days
+    rodados = moto['km_atual'] - moto['km_compra']
+    if dias >= DIAS_MINIMOS_USO and rodados > 0:
+        return rodados / dias
+    if uso_rotas['km_dia']:
+        return uso_rotas['km_dia']
+    if moto['perfil__distancia_media_dia']:
+        return float(moto['perfil__distancia_media_dia'])
+    return None
+
+
+def _calcular_proxima(moto, tipo, ultima, uso_diario, hoje: date):
+    """Retorna (km_proxima, data_planejada) para um par (moto, tipo)"""
+    km_proxima = None
+    datas = []
+
+    if tipo['intervalo_km']:
+        # Sem manutenção concluída, a base é o km da compra
+        km_proxima = ultima['km_proxima'] if ultima else moto['km_compra'] + tipo['intervalo_km']
+        if uso_diario:
+            dias = max(0, math.ceil((km_proxima - moto['km_atual']) / uso_diario))
+            datas.append(hoje + timedelta(days=dias))
+
+    if tipo['intervalo_meses']:
+        if ultima and ultima['ultima_data']:
+            data_base = timezone.localdate(ultima['ultima_data'])
+        else:
+            data_base = moto['data_compra'] or timezone.localdate(moto['criado_em'])
+        datas.append(_somar_meses(data_base, tipo['intervalo_meses']))
+
+    return km_proxima, min(datas) if datas else None
+
+
+def _somar_meses(data: date, meses: int) -> date:
+    mes = data.month - 1 + meses
+    ano = data.year + mes // 12
+    mes = mes % 12 + 1
+    return date(ano, mes, min(data.day, calendar.monthrange(ano, mes)[1]))
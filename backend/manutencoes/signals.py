@@ -0,0 +1,40 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from arquivos.signals import arquivo_anexado
+from .catalogo import invalidar_catalogo, invalidar_precos
+from .models import TipoManutencao, ItemManutencao, ItemManutencaoRealizada, HistoricoManutencao
+from .services.fotos_service import CAMPOS_FOTO, FotosHistoricoService
+
+
+@receiver(post_save, sender=TipoManutencao)
+@receiver(post_delete, sender=TipoManutencao)
+@receiver(post_save, sender=ItemManutencao)
+@receiver(post_delete, sender=ItemManutencao)
+def catalogo_alterado(sender, **kwargs):
+    """Invalida o catálogo em memória de todos os processos"""
+    invalidar_catalogo()
+
+
+@receiver(post_save, sender=ItemManutencaoRealizada)
+@receiver(post_delete, sender=ItemManutencaoRealizada)
+def precos_alterados(sender, **kwargs):
+    """Invalida o histórico de preços em memória"""
+    invalidar_precos()
+
+
+@receiver(post_save, sender=HistoricoManutencao)
+def fotos_historico_salvas(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Agenda o processamento das fotos de antes/depois"""
+    if raw or not any(getattr(instance, campo) for campo in CAMPOS_FOTO):
+        return
+    if update_fields is None or set(CAMPOS_FOTO) & set(update_fields):
+        # Depois do commit, para a thread do pool enxergar a gravação
+        transaction.on_commit(lambda: FotosHistoricoService.agendar(instance.pk))
+
+
+@receiver(arquivo_anexado, sender=HistoricoManutencao)
+def fotos_historico_anexadas(sender, instance, campo, **kwargs):
+    """Fotos recebidas pelo upload em partes"""
+    if campo in CAMPOS_FOTO:
+        transaction.on_commit(lambda: FotosHistoricoService.agendar(instance.pk))
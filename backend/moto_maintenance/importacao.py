@@ -0,0 +1,44 @@
+"""
+Incremental readers for the bulk import endpoints and commands.
+"""
+import csv
+import io
+import json
+from typing import Any, Dict, Iterator, Tuple
+
+FORMATOS = ('csv', 'json', 'jsonl')
+
+
+def ler_registros(arquivo, formato: str) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """
+    Yield (line number, record) pairs from a CSV, JSON or JSON Lines file.
+
+    CSV and JSON Lines are read row by row; a JSON document is a list of
+    objects or an object with a `registros` list. Undecodable JSON Lines
+    rows are yielded as {'__erro__': message} so they show up in the report.
+    """
+    if isinstance(arquivo, (io.TextIOBase, io.StringIO)):
+        texto = arquivo
+    else:
+        texto = io.TextIOWrapper(arquivo, encoding='utf-8-sig', newline='')
+
+    if formato == 'csv':
+        # A linha 1 é o cabeçalho
+        for numero, registro in enumerate(csv.DictReader(texto), start=2):
+            yield numero, registro
+    elif formato == 'jsonl':
+        for numero, linha in enumerate(texto, start=1):
+            if not linha.strip():
+                continue
+            try:
+                yield numero, json.loads(linha)
+            except json.JSONDecodeError:
+                yield numero, {'__erro__': 'JSON inválido nesta linha.'}
+    elif formato == 'json':
+        dados = json.load(texto)
+        if isinstance(dados, dict):
+            dados = dados.get('registros', [])
+        for numero, registro in enumerate(dados, start=1):
+            yield numero, registro
+    else:
+        raise ValueError(f'Formato não suportado: {formato}')
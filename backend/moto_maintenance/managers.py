@@ -0,0 +1,28 @@
+"""
+Soft delete shared by the models with an `ativo` flag.
+
+Rows are never deleted by the API, only marked inactive. `objects` keeps
+returning every row (admin, relations, uniqueness checks); `ativos` is the
+manager for everything the user sees, and its filter is the same condition
+the partial indexes are built with, so those queries use them.
+"""
+from django.db import models
+
+
+class AtivoQuerySet(models.QuerySet):
+    def ativos(self):
+        return self.filter(ativo=True)
+
+    def inativos(self):
+        return self.filter(ativo=False)
+
+    def desativar(self) -> int:
+        """Soft delete in a single UPDATE (no save() or signals, like update())."""
+        return self.update(ativo=False)
+
+
+class AtivoManager(models.Manager.from_queryset(AtivoQuerySet)):
+    """Only active rows."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(ativo=True)
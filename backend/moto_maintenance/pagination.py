@@ -0,0 +1,39 @@
+"""
+Pagination classes shared by the API ViewSets.
+"""
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+class _CursorPagination(CursorPagination):
+    """Cursor pagination that accepts an empty `?cursor=` as the first page."""
+
+    def decode_cursor(self, request):
+        if not request.query_params.get(self.cursor_query_param):
+            return None
+        return super().decode_cursor(request)
+
+
+class OptionalCursorPagination(PageNumberPagination):
+    """
+    Page-number pagination with an opt-in keyset (cursor) mode.
+
+    Sending `?cursor=` switches to cursor pagination, which skips the
+    `COUNT(*)` and the `OFFSET` scan, so every page costs the same. The
+    keyset ordering comes from the view's `cursor_ordering` attribute and
+    should match one of the model's composite indexes.
+    """
+    cursor_query_param = 'cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_paginator = None
+        if self.cursor_query_param in request.query_params:
+            self.cursor_paginator = _CursorPagination()
+            self.cursor_paginator.page_size = self.page_size
+            self.cursor_paginator.ordering = getattr(view, 'cursor_ordering', ('-pk',))
+            return self.cursor_paginator.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
@@ -0,0 +1,155 @@
+"""
+Analytics reads on a separate database alias.
+
+When DATABASES has a 'replica' alias (a PostgreSQL replica, or a SQLite
+snapshot refreshed by `atualizar_snapshot`), GET requests of the analytics
+views read from it, so their grouped aggregates never compete with CRUD on
+the primary. Everything else stays on 'default':
+
+- writes, and reads inside a transaction (read-after-write);
+- auth, sessions and tokens, which are loaded before the view runs;
+- values cached under a version counter (CacheVersionado, statistics),
+  built inside `fixar_primario()`, since a lagging copy would keep stale
+  data cached until the next write.
+"""
+import os
+import sqlite3
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.http import StreamingHttpResponse
+
+
+REPLICA = 'replica'
+
+# Apps never read from the copy (identity of the request)
+APPS_NO_PRIMARIO = {'auth', 'sessions', 'contenttypes', 'authtoken', 'admin'}
+
+# Pages copied per step of the SQLite backup; the source is unlocked between steps
+PAGINAS_POR_PASSO = 4096
+
+_leitura_analitica: ContextVar[bool] = ContextVar('leitura_analitica', default=False)
+
+
+def replica_configurada() -> bool:
+    return REPLICA in settings.DATABASES
+
+
+@contextmanager
+def leitura_analitica():
+    """Reads in this block go to the replica, when there is one."""
+    token = _leitura_analitica.set(True)
+    try:
+        yield
+    finally:
+        _leitura_analitica.reset(token)
+
+
+@contextmanager
+def fixar_primario():
+    """Reads in this block stay on the primary even inside an analytics view."""
+    token = _leitura_analitica.set(False)
+    try:
+        yield
+    finally:
+        _leitura_analitica.reset(token)
+
+
+class RoteadorAnalitico:
+    """DATABASE_ROUTERS entry: analytics reads to REPLICA, the rest to 'default'."""
+
+    def db_for_read(self, model, **hints):
+        instancia = hints.get('instance')
+        if instancia is not None and instancia._state.db:
+            # Related objects come from the same database as the instance
+            return instancia._state.db
+        if (
+            _leitura_analitica.get()
+            and replica_configurada()
+            and model._meta.app_label not in APPS_NO_PRIMARIO
+            and not connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return REPLICA
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Same data on both aliases
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica/snapshot receives the schema from the primary
+        return db != REPLICA
+
+
+class LeituraAnaliticaMixin:
+    """
+    DRF views whose GETs read from the replica.
+
+    `acoes_analiticas` limits it to some viewset actions (None = every GET).
+    """
+    acoes_analiticas = None
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self._token_analitico = None
+        if request.method in ('GET', 'HEAD') and (
+            self.acoes_analiticas is None or getattr(self, 'action', None) in self.acoes_analiticas
+        ):
+            # User and session loaded from the primary before switching
+            request.user
+            self._token_analitico = _leitura_analitica.set(True)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if getattr(self, '_token_analitico', None) is not None:
+            _leitura_analitica.reset(self._token_analitico)
+            self._token_analitico = None
+            if isinstance(response, StreamingHttpResponse):
+                response.streaming_content = _iterar_na_replica(response.streaming_content)
+        return response
+
+
+def _iterar_na_replica(partes):
+    """Streams query while the server iterates, after the view returned."""
+    partes = iter(partes)
+    while True:
+        with leitura_analitica():
+            try:
+                parte = next(partes)
+            except StopIteration:
+                return
+        yield parte
+
+
+def atualizar_snapshot_sqlite() -> Path:
+    """
+    Copy the primary SQLite database into the REPLICA file.
+
+    Uses the online backup API in steps, so writers are only blocked for one
+    step at a time, into a temporary file that then atomically replaces the
+    snapshot: open connections keep reading the previous copy until they
+    reconnect.
+    """
+    if connections[DEFAULT_DB_ALIAS].vendor != 'sqlite' or not replica_configurada():
+        raise ValueError('Snapshot requires SQLite with a replica alias (SQLITE_SNAPSHOT).')
+
+    destino = Path(settings.DATABASES[REPLICA]['NAME'])
+    temporario = destino.with_name(f'{destino.name}.tmp')
+    origem = connections[DEFAULT_DB_ALIAS]
+    origem.ensure_connection()
+
+    copia = sqlite3.connect(temporario)
+    try:
+        origem.connection.backup(copia, pages=PAGINAS_POR_PASSO)
+        # A copy in WAL mode would depend on -wal/-shm files of the old file
+        copia.execute('PRAGMA journal_mode=DELETE')
+    finally:
+        copia.close()
+    os.replace(temporario, destino)
+    return destino
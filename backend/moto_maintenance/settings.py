@@ -37,6 +37,8 @@ INSTALLED_APPS = [
     'manutencoes',
     'analises',
     'dashboard',
+    'busca',
+    'arquivos',
 ]
 
 MIDDLEWARE = [
@@ -70,11 +72,78 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'moto_maintenance.wsgi.application'
 
-# Database
-DATABASES = {
+# Database: SQLite by default; DB_ENGINE=django.db.backends.postgresql selects
+# the PostgreSQL profile for multi-worker deployments (requires psycopg 3)
+DB_ENGINE = config('DB_ENGINE', default='django.db.backends.sqlite3')
+
+# SQLite production mode: WAL, mmap, busy timeout and BEGIN IMMEDIATE
+# (PRAGMAs applied by moto_maintenance.sqlite on every new connection)
+SQLITE_OTIMIZADO = config('SQLITE_OTIMIZADO', default=False, cast=bool)
+SQLITE_MMAP_SIZE = config('SQLITE_MMAP_SIZE', default=256 * 1024 * 1024, cast=int)  # bytes
+SQLITE_CACHE_SIZE = config('SQLITE_CACHE_SIZE', default=-64000, cast=int)  # negative = KiB
+SQLITE_BUSY_TIMEOUT = config('SQLITE_BUSY_TIMEOUT', default=5000, cast=int)  # ms
+
+if DB_ENGINE == 'django.db.backends.postgresql':
+    # Django 5.1+ native psycopg pool; incompatible with CONN_MAX_AGE, so
+    # persistent connections are only used without it
+    DB_POOL = config('DB_POOL', default=False, cast=bool)
+    DATABASES = {
+        'default': {
+            'ENGINE': DB_ENGINE,
+            'NAME': config('DB_NAME', default='motocare_db'),
+            'USER': config('DB_USER', default='motocare_user'),
+            'PASSWORD': config('DB_PASSWORD', default=''),
+            'HOST': config('DB_HOST', default='localhost'),
+            'PORT': config('DB_PORT', default='5432'),
+            'CONN_MAX_AGE': 0 if DB_POOL else config('DB_CONN_MAX_AGE', default=60, cast=int),
+            'CONN_HEALTH_CHECKS': config('DB_CONN_HEALTH_CHECKS', default=True, cast=bool),
+            'OPTIONS': {
+                'pool': {
+                    'min_size': config('DB_POOL_MIN_SIZE', default=2, cast=int),
+                    'max_size': config('DB_POOL_MAX_SIZE', default=10, cast=int),
+                    'timeout': config('DB_POOL_TIMEOUT', default=10, cast=int),  # seconds waiting for a connection
+                },
+            } if DB_POOL else {},
+        }
+    }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': DB_ENGINE,
+            'NAME': config('DB_NAME', default=str(BASE_DIR / 'db.sqlite3')),
+            'OPTIONS': {'transaction_mode': 'IMMEDIATE'} if SQLITE_OTIMIZADO else {},
+        }
+    }
+
+# Analytics reads (moto_maintenance/roteamento.py): a PostgreSQL replica at
+# DB_REPLICA_HOST, or a SQLite snapshot refreshed by `manage.py atualizar_snapshot`
+if DB_ENGINE == 'django.db.backends.postgresql':
+    DB_REPLICA_HOST = config('DB_REPLICA_HOST', default='')
+    if DB_REPLICA_HOST:
+        DATABASES['replica'] = {
+            **DATABASES['default'],
+            'HOST': DB_REPLICA_HOST,
+            'PORT': config('DB_REPLICA_PORT', default=DATABASES['default']['PORT']),
+            'TEST': {'MIRROR': 'default'},
+        }
+else:
+    SQLITE_SNAPSHOT = config('SQLITE_SNAPSHOT', default='')
+    if SQLITE_SNAPSHOT:
+        DATABASES['replica'] = {
+            'ENGINE': DB_ENGINE,
+            'NAME': SQLITE_SNAPSHOT,
+            'TEST': {'MIRROR': 'default'},
+        }
+SQLITE_SNAPSHOT_INTERVALO = config('SQLITE_SNAPSHOT_INTERVALO', default=300, cast=int)  # seconds
+
+DATABASE_ROUTERS = ['moto_maintenance.roteamento.RoteadorAnalitico']
+
+# Cache (use a shared backend, e.g. file/database/redis, when running multiple workers;
+# version counters that invalidate the in-process caches live here)
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='motocare'),
     }
 }
 
@@ -108,6 +177,23 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Uploads em partes (app arquivos)
+ARQUIVOS_TAMANHO_MAXIMO = config('ARQUIVOS_TAMANHO_MAXIMO', default=25 * 1024 * 1024, cast=int)
+ARQUIVOS_TAMANHO_PARTE = config('ARQUIVOS_TAMANHO_PARTE', default=5 * 1024 * 1024, cast=int)
+ARQUIVOS_MAXIMO_PIXELS = config('ARQUIVOS_MAXIMO_PIXELS', default=40_000_000, cast=int)
+# Fora do MEDIA_ROOT para que arquivos incompletos nunca sejam servidos
+ARQUIVOS_DIRETORIO_PARCIAL = config('ARQUIVOS_DIRETORIO_PARCIAL', default=str(BASE_DIR / 'uploads_parciais'))
+
+# Renditions (miniaturas) das imagens, geradas sob demanda
+IMAGENS_DIRETORIO_CACHE = config('IMAGENS_DIRETORIO_CACHE', default=str(BASE_DIR / 'cache_imagens'))
+IMAGENS_WORKERS = config('IMAGENS_WORKERS', default=2, cast=int)
+
+# Telemetria: buffer de escrita adiada das leituras de hodômetro
+TELEMETRIA_INTERVALO_FLUSH = config('TELEMETRIA_INTERVALO_FLUSH', default=5.0, cast=float)  # segundos
+TELEMETRIA_AMOSTRAGEM = config('TELEMETRIA_AMOSTRAGEM', default=300, cast=int)  # segundos entre amostras guardadas
+TELEMETRIA_LIMITE_BUFFER = config('TELEMETRIA_LIMITE_BUFFER', default=50000, cast=int)  # força flush antecipado
+TELEMETRIA_MAXIMO_POR_REQUISICAO = config('TELEMETRIA_MAXIMO_POR_REQUISICAO', default=10000, cast=int)
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # Django REST Framework Configuration
@@ -147,6 +233,7 @@ CORS_ALLOW_HEADERS = [
     'accept',
     'accept-encoding',
     'authorization',
+    'content-range',
     'content-type',
     'dnt',
     'origin',
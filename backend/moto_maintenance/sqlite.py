@@ -0,0 +1,38 @@
+"""
+SQLite production mode.
+
+With SQLITE_OTIMIZADO every new SQLite connection switches to WAL (readers
+no longer block the writer), relaxes fsync to once per checkpoint, maps the
+file in memory and waits for the lock instead of failing with "database is
+locked". Settings also set transaction_mode=IMMEDIATE, so atomic() blocks
+take the write lock up front instead of failing when a read upgrades.
+"""
+from typing import List
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+
+def pragmas(mmap_size: int, cache_size: int, busy_timeout: int) -> List[str]:
+    """PRAGMAs of the production mode (also used by benchmark_sqlite)."""
+    return [
+        'PRAGMA journal_mode=WAL',
+        'PRAGMA synchronous=NORMAL',
+        f'PRAGMA mmap_size={int(mmap_size)}',
+        f'PRAGMA cache_size={int(cache_size)}',
+        'PRAGMA temp_store=MEMORY',
+        f'PRAGMA busy_timeout={int(busy_timeout)}',
+    ]
+
+
+def ajustar_conexao(sender, connection, **kwargs):
+    """connection_created receiver, registered in MotosConfig.ready()."""
+    if connection.vendor != 'sqlite' or not settings.SQLITE_OTIMIZADO:
+        return
+    if connection.alias != DEFAULT_DB_ALIAS:
+        # The snapshot (replica) is replaced as a whole file and must stay
+        # in rollback-journal mode, without -wal/-shm files of its own
+        return
+    with connection.cursor() as cursor:
+        for pragma in pragmas(settings.SQLITE_MMAP_SIZE, settings.SQLITE_CACHE_SIZE, settings.SQLITE_BUSY_TIMEOUT):
+            cursor.execute(pragma)
@@ -9,16 +9,22 @@ from django.conf.urls.static import static
 from rest_framework.routers import DefaultRouter
 
 # Import API ViewSets
-from motos.api_views import MotoViewSet
+from motos.api_views import (
+    MotoViewSet, RotaViewSet, TelemetriaAPIView, MetaAPIView, ModelosReferenciaAPIView
+)
 from manutencoes.api_views import ManutencaoViewSet
 from dashboard.api_views import DashboardAPIView
 from analises.api_views import AnaliseViewSet
+from busca.api_views import BuscaAPIView
+from arquivos.api_views import ImagemAPIView, SessaoUploadViewSet
 
 # API Router for ViewSets
 router = DefaultRouter()
 router.register(r'motos', MotoViewSet, basename='moto')
+router.register(r'rotas', RotaViewSet, basename='rota')
 router.register(r'manutencoes', ManutencaoViewSet, basename='manutencao')
 router.register(r'analises', AnaliseViewSet, basename='analise')
+router.register(r'uploads', SessaoUploadViewSet, basename='upload')
 
 urlpatterns = [
     # Django Admin (keep for backend management)
@@ -29,7 +35,20 @@ urlpatterns = [
     
     # API Dashboard
     path('api/dashboard/', DashboardAPIView.as_view(), name='api_dashboard'),
+
+    # API Busca textual
+    path('api/busca/', BuscaAPIView.as_view(), name='api_busca'),
     
+    # API Telemetria (leituras de hodômetro em lote)
+    path('api/telemetria/', TelemetriaAPIView.as_view(), name='api_telemetria'),
+
+    # API Escolhas dos formulários e catálogo de modelos
+    path('api/meta/', MetaAPIView.as_view(), name='api_meta'),
+    path('api/meta/modelos/', ModelosReferenciaAPIView.as_view(), name='api_meta_modelos'),
+
+    # API Renditions de imagens
+    path('api/imagens/<str:tamanho>/<str:formato>/<path:nome>', ImagemAPIView.as_view(), name='api_imagem'),
+
     # API Routes from router
     path('api/', include(router.urls)),
     
@@ -0,0 +1,71 @@
+"""
+Version counters stored in the shared cache.
+
+In-process caches remember the version they were built from and rebuild
+when it changes; writers just bump the counter, after their transaction
+commits (`invalidar_versao`).
+"""
+import threading
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+from .roteamento import fixar_primario
+
+
+def _chave(nome: str) -> str:
+    return f'versao:{nome}'
+
+
+def obter_versao(nome: str) -> int:
+    """Return the current version of `nome` (starts at 1)."""
+    versao = cache.get(_chave(nome))
+    if versao is None:
+        cache.add(_chave(nome), 1, timeout=None)
+        versao = cache.get(_chave(nome), 1)
+    return versao
+
+
+def incrementar_versao(nome: str) -> int:
+    """Bump the version of `nome`, invalidating every cache built from it."""
+    try:
+        return cache.incr(_chave(nome))
+    except ValueError:
+        # Counter missing (first write or evicted): restart from a value no
+        # process can have cached yet
+        versao = int(time.time() * 1000)
+        cache.add(_chave(nome), versao, timeout=None)
+        return cache.get(_chave(nome), versao)
+
+
+def invalidar_versao(nome: str) -> None:
+    """
+    Bump `nome` once the current transaction commits (right away in autocommit).
+
+    Bumping inside the transaction would let another process rebuild from
+    the pre-commit data and keep it cached under the new version.
+    """
+    transaction.on_commit(lambda: incrementar_versao(nome))
+
+
+class CacheVersionado:
+    """Keep the last value built by `construir` and rebuild it when the version changes."""
+
+    def __init__(self, nome_versao: str, construir):
+        self.nome_versao = nome_versao
+        self.construir = construir
+        self._lock = threading.Lock()
+        self._versao = None
+        self._valor = None
+
+    def obter(self):
+        versao = obter_versao(self.nome_versao)
+        if versao != self._versao:
+            with self._lock:
+                if versao != self._versao:
+                    # Built from the primary: a lagging replica would stay
+                    # cached under the new version
+                    with fixar_primario():
+                        self._valor = self.construir()
+                    self._versao = versao
+        return self._valor
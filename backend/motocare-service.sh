@@ -47,6 +47,15 @@ fi
 # Configurar Django settings
 export DJANGO_SETTINGS_MODULE="moto_maintenance.settings"
 
+# Variáveis de banco de motocare.conf (DB_* e SQLITE_*), lidas pelo settings.
+# O arquivo é lido em um subshell para não sobrescrever LOG_FILE e as demais
+# variáveis deste script
+if [ -f "$PROJECT_DIR/motocare.conf" ]; then
+    while IFS= read -r variavel; do
+        export "$variavel"
+    done < <(set -a; source "$PROJECT_DIR/motocare.conf"; env | grep -E '^(DB|SQLITE)_')
+fi
+
 # Executar migrações se necessário
 log "Verificando migrações..."
 python manage.py migrate --check > /dev/null 2>&1
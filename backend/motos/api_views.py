@@ -1,10 +1,44 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated, AllowAny
+from django.db.models import BigIntegerField, Count, Prefetch, Q
+from django.conf import settings
 from django.shortcuts import get_object_or_404
-from .models import Moto, PerfilMoto, Rota
-from .serializers import MotoSerializer, MotoDetailSerializer, PerfilMotoSerializer, RotaSerializer
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from moto_maintenance.importacao import FORMATOS, ler_registros
+from moto_maintenance.pagination import OptionalCursorPagination
+from .modelos_referencia import obter_catalogo_modelos, obter_escolhas
+from .models import KM_MAXIMO, Moto, PerfilMoto, Rota
+from .serializers import (
+    MotoSerializer, MotoDetailSerializer, PerfilMotoSerializer, RotaSerializer,
+    ROTAS_LIMITE_PADRAO, ROTAS_LIMITE_MAXIMO
+)
+from .services.busca_service import IDENTIFICADORES, BuscaMotoService
+from .services.calibragem_service import CRITERIOS, CalibragemService
+from .services.estatisticas_service import DIMENSOES, EstatisticasMotoService
+from .services.importacao_service import ImportacaoMotoService
+from .services.quilometragem_service import QuilometragemService
+from .services.uso_service import UsoRotasService
+from .telemetria import obter_buffer
+
+
+AUTOCOMPLETAR_LIMITE_PADRAO = 10
+AUTOCOMPLETAR_LIMITE_MAXIMO = 50
+
+# Total de placas, chassis e renavams aceitos por chamada de resolver
+RESOLVER_MAXIMO = 5000
+
+MODELOS_LIMITE_PADRAO = 10
+MODELOS_LIMITE_MAXIMO = 50
+
+# Escolhas e modelos de referência só mudam com um deploy; depois de um dia o
+# navegador revalida pelo ETag e recebe 304
+CACHE_META = 24 * 60 * 60
 
 
 class MotoViewSet(viewsets.ModelViewSet):
@@ -12,10 +46,43 @@ class MotoViewSet(viewsets.ModelViewSet):
     
     serializer_class = MotoSerializer
     permission_classes = [AllowAny]  # Temporário para desenvolvimento
+    pagination_class = OptionalCursorPagination
+    cursor_ordering = ('-criado_em', '-id')  # índice parcial moto_ativa_criado_idx
     
     def get_queryset(self):
         """Retorna motos ativas"""
-        return Moto.objects.filter(ativo=True).order_by('-criado_em')
+        queryset = Moto.ativos.order_by('-criado_em', '-id')
+        if self.action == 'retrieve':
+            # Moto + perfil + total de rotas em uma consulta, página de rotas na segunda
+            limite, deslocamento = self._paginacao_rotas()
+            queryset = queryset.select_related('perfil').annotate(
+                total_rotas_ativas=Count('rotas', filter=Q(rotas__ativo=True))
+            ).prefetch_related(Prefetch(
+                'rotas',
+                queryset=Rota.ativos.order_by('-data_registro', '-id')[deslocamento:deslocamento + limite],
+                to_attr='rotas_ativas',
+            ))
+        return queryset
+
+    def get_serializer_context(self):
+        """Repassa a paginação das rotas aninhadas ao serializer"""
+        context = super().get_serializer_context()
+        if self.action == 'retrieve':
+            context['rotas_limit'], context['rotas_offset'] = self._paginacao_rotas()
+        return context
+
+    def _paginacao_rotas(self):
+        """Lê ?rotas_limit= e ?rotas_offset= (valores inválidos usam o padrão)"""
+        params = self.request.query_params
+        try:
+            limite = min(max(int(params.get('rotas_limit', ROTAS_LIMITE_PADRAO)), 1), ROTAS_LIMITE_MAXIMO)
+        except ValueError:
+            limite = ROTAS_LIMITE_PADRAO
+        try:
+            deslocamento = max(int(params.get('rotas_offset', 0)), 0)
+        except ValueError:
+            deslocamento = 0
+        return limite, deslocamento
     
     def get_serializer_class(self):
         """Usa serializer detalhado para retrieve"""
@@ -26,6 +93,11 @@ class MotoViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         """Define o usuário criador ao salvar"""
         serializer.save(criado_por=self.request.user)
+
+    def perform_destroy(self, instance):
+        """Desativa a moto em vez de excluí-la (arquivada depois por arquivar_motos)"""
+        instance.ativo = False
+        instance.save(update_fields=['ativo', 'atualizado_em'])
     
     @action(detail=True, methods=['post'])
     def criar_perfil(self, request, pk=None):
@@ -108,7 +180,7 @@ class MotoViewSet(viewsets.ModelViewSet):
     def rotas(self, request, pk=None):
         """Lista todas as rotas da moto"""
         moto = self.get_object()
-        rotas = moto.rotas.filter(ativo=True)
+        rotas = Rota.ativos.filter(moto=moto)
         serializer = RotaSerializer(rotas, many=True)
         
         return Response({
@@ -118,8 +190,12 @@ class MotoViewSet(viewsets.ModelViewSet):
     
     @action(detail=True, methods=['post'])
     def atualizar_km(self, request, pk=None):
-        """Atualiza a quilometragem da moto"""
-        moto = self.get_object()
+        """
+        Atualiza a quilometragem da moto
+
+        A leitura é registrada em LeituraKm e o km só avança (UPDATE
+        condicional); a resposta traz sempre o km efetivo.
+        """
         novo_km = request.data.get('km_atual')
         
         if not novo_km:
@@ -130,54 +206,214 @@ class MotoViewSet(viewsets.ModelViewSet):
         
         try:
             novo_km = int(novo_km)
-            if novo_km < moto.km_atual:
-                return Response({
-                    'success': False,
-                    'message': 'A nova quilometragem não pode ser menor que a atual'
-                }, status=status.HTTP_400_BAD_REQUEST)
-            
-            moto.km_atual = novo_km
-            moto.save()
-            
-            return Response({
-                'success': True,
-                'message': 'Quilometragem atualizada com sucesso',
-                'data': {
-                    'km_atual': moto.km_atual,
-                    'km_total_percorridos': moto.km_total_percorridos
-                }
-            })
-            
+            if novo_km < 0:
+                raise ValueError
         except (ValueError, TypeError):
             return Response({
                 'success': False,
                 'message': 'Quilometragem deve ser um número válido'
             }, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            resultado = QuilometragemService.registrar_leitura(
+                pk, novo_km, origem='api',
+                usuario=request.user if request.user.is_authenticated else None
+            )
+        except Moto.DoesNotExist:
+            return Response({
+                'success': False,
+                'message': 'Moto não encontrada'
+            }, status=status.HTTP_404_NOT_FOUND)
+
+        if resultado['km_atual'] > novo_km:
+            return Response({
+                'success': False,
+                'message': 'A nova quilometragem não pode ser menor que a atual',
+                'data': resultado
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            'success': True,
+            'message': 'Quilometragem atualizada com sucesso',
+            'data': resultado
+        })
     
+    @action(detail=True, methods=['get'])
+    def uso(self, request, pk=None):
+        """
+        Perfil de uso semanal da moto calculado a partir das rotas ativas
+
+        Km por semana e por dia e a fração dos km por tipo de via, condição
+        da via e clima.
+        """
+        moto = self.get_object()
+        return Response({
+            'success': True,
+            'data': {'moto_id': moto.id, **UsoRotasService.perfil(moto.id)}
+        })
+
+    @action(detail=False, methods=['get'])
+    def uso_frota(self, request):
+        """Km semanais da frota e a divisão por tipo de via, condição da via e clima"""
+        return Response({
+            'success': True,
+            'data': UsoRotasService.frota()
+        })
+
+    @action(detail=False, methods=['get'])
+    def calibragem_pendente(self, request):
+        """
+        Motos com pneus fora da calibragem recomendada ou com calibragem vencida
+
+        Tolerância por tipo de pneu e prazo por estilo de uso, calculados no
+        banco; `?criterio=pressao` ou `?criterio=vencida` restringe a verificação.
+        Usuários autenticados veem só as suas motos.
+        """
+        criterio = request.query_params.get('criterio')
+        if criterio and criterio not in CRITERIOS:
+            return Response({
+                'success': False,
+                'message': f"criterio inválido (use {', '.join(CRITERIOS)})"
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        usuario = request.user if request.user.is_authenticated else None
+        hoje = timezone.localdate()
+        perfis = CalibragemService.pendentes([criterio] if criterio else CRITERIOS, usuario=usuario, hoje=hoje)
+
+        pagina = self.paginate_queryset(perfis)
+        if pagina is not None:
+            return self.get_paginated_response([CalibragemService.descrever(perfil, hoje) for perfil in pagina])
+        return Response({
+            'success': True,
+            'data': [CalibragemService.descrever(perfil, hoje) for perfil in perfis]
+        })
+
     @action(detail=False, methods=['get'])
     def estatisticas(self, request):
-        """Retorna estatísticas gerais das motos"""
-        motos = self.get_queryset()
-        
-        total_motos = motos.count()
-        km_total = sum(moto.km_total_percorridos for moto in motos)
-        
-        # Estatísticas por marca
-        marcas = {}
-        for moto in motos:
-            marca = moto.marca
-            if marca not in marcas:
-                marcas[marca] = {'quantidade': 0, 'km_total': 0}
-            marcas[marca]['quantidade'] += 1
-            marcas[marca]['km_total'] += moto.km_total_percorridos
-        
+        """
+        Retorna estatísticas gerais das motos
+
+        Agrupa por marca, cilindrada e tipo_combustivel; `?group_by=marca,cilindrada`
+        limita os agrupamentos calculados.
+        """
+        group_by = request.query_params.get('group_by')
+        dimensoes = [d.strip() for d in group_by.split(',') if d.strip()] if group_by else DIMENSOES
+        invalidas = [d for d in dimensoes if d not in DIMENSOES]
+        if invalidas:
+            return Response({
+                'success': False,
+                'message': f"group_by inválido: {', '.join(invalidas)} (use {', '.join(DIMENSOES)})"
+            }, status=status.HTTP_400_BAD_REQUEST)
+
         return Response({
             'success': True,
-            'data': {
-                'total_motos': total_motos,
-                'km_total_percorridos': km_total,
-                'estatisticas_por_marca': marcas
-            }
+            'data': EstatisticasMotoService.calcular(dimensoes)
+        })
+
+    @action(detail=False, methods=['get'])
+    def autocompletar(self, request):
+        """
+        Sugestões de motos para a busca (`?q=` e `?limit=`, padrão 10)
+
+        Tolera erros de digitação e formatação da placa; uma placa completa
+        é resolvida pela busca exata. Usuários autenticados veem só as suas motos.
+        """
+        termo = (request.query_params.get('q') or '').strip()
+        if not termo:
+            return Response({
+                'success': False,
+                'message': 'Parâmetro q é obrigatório'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limite = min(max(int(request.query_params.get('limit', AUTOCOMPLETAR_LIMITE_PADRAO)), 1), AUTOCOMPLETAR_LIMITE_MAXIMO)
+        except ValueError:
+            limite = AUTOCOMPLETAR_LIMITE_PADRAO
+
+        usuario = request.user if request.user.is_authenticated else None
+        return Response({
+            'success': True,
+            'data': BuscaMotoService.autocompletar(termo, usuario=usuario, limite=limite)
+        })
+
+    @action(detail=False, methods=['post'])
+    def resolver(self, request):
+        """
+        Resolve placas, chassis e renavams para ids de motos ativas
+
+        Corpo: {"placas": [...], "chassis": [...], "renavams": [...]}. Os
+        valores são comparados normalizados (sem separadores, sem diferenciar
+        maiúsculas); os não encontrados voltam com null.
+        """
+        identificadores = {}
+        for tipo in IDENTIFICADORES:
+            valores = request.data.get(tipo) or []
+            if not isinstance(valores, list) or not all(isinstance(valor, str) for valor in valores):
+                return Response({
+                    'success': False,
+                    'message': f'{tipo} deve ser uma lista de textos'
+                }, status=status.HTTP_400_BAD_REQUEST)
+            identificadores[tipo] = valores
+
+        total = sum(len(valores) for valores in identificadores.values())
+        if not total:
+            return Response({
+                'success': False,
+                'message': f"Informe ao menos um de: {', '.join(IDENTIFICADORES)}"
+            }, status=status.HTTP_400_BAD_REQUEST)
+        if total > RESOLVER_MAXIMO:
+            return Response({
+                'success': False,
+                'message': f'No máximo {RESOLVER_MAXIMO} identificadores por requisição'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        usuario = request.user if request.user.is_authenticated else None
+        resolvidos = BuscaMotoService.resolver(identificadores, usuario=usuario)
+        return Response({
+            'success': True,
+            'data': resolvidos,
+            'nao_encontrados': sum(
+                1 for valores in resolvidos.values() for moto_id in valores.values() if moto_id is None
+            )
+        })
+
+    @action(detail=False, methods=['post'])
+    def importar(self, request):
+        """
+        Importa motos em lote (cadastro de frota)
+
+        Aceita um arquivo CSV/JSON/JSON Lines em `arquivo` ou um corpo JSON
+        com a lista `registros`; `?dry_run=1` só valida. Retorna os erros por linha.
+        """
+        dry_run = str(request.query_params.get('dry_run', '')).lower() in ('1', 'true')
+        arquivo = request.FILES.get('arquivo')
+
+        if arquivo is not None:
+            formato = request.data.get('formato') or arquivo.name.rsplit('.', 1)[-1].lower()
+            if formato not in FORMATOS:
+                return Response({
+                    'success': False,
+                    'message': 'Formato não suportado (use csv, json ou jsonl)'
+                }, status=status.HTTP_400_BAD_REQUEST)
+            registros = ler_registros(arquivo.file, formato)
+        elif isinstance(request.data.get('registros'), list):
+            registros = enumerate(request.data['registros'], start=1)
+        else:
+            return Response({
+                'success': False,
+                'message': 'Informe arquivo ou registros'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            resultado = ImportacaoMotoService.importar(registros, usuario=request.user, dry_run=dry_run)
+        except (ValueError, UnicodeDecodeError) as e:
+            return Response({
+                'success': False,
+                'message': f'Não foi possível ler o arquivo: {str(e)}'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            'success': resultado['success'],
+            'data': resultado
         })
 
 
@@ -186,10 +422,17 @@ class RotaViewSet(viewsets.ModelViewSet):
     
     serializer_class = RotaSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = OptionalCursorPagination
+    cursor_ordering = ('-data_registro', '-id')  # índice parcial rota_ativa_registro_idx
     
     def get_queryset(self):
         """Retorna apenas rotas ativas"""
-        return Rota.objects.filter(ativo=True).order_by('-data_registro')
+        return Rota.ativos.order_by('-data_registro', '-id')
+
+    def perform_destroy(self, instance):
+        """Desativa a rota em vez de excluí-la"""
+        instance.ativo = False
+        instance.save(update_fields=['ativo'])
     
     @action(detail=True, methods=['post'])
     def desativar(self, request, pk=None):
@@ -213,3 +456,128 @@ class PerfilMotoViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         """Retorna todos os perfis"""
         return PerfilMoto.objects.all().order_by('-atualizado_em')
+
+
+class TelemetriaAPIView(APIView):
+    """
+    Ingestão em lote de leituras de hodômetro dos rastreadores.
+
+    Aceita uma lista (ou `{"leituras": [...]}`) de objetos
+    `{"moto_id", "timestamp", "km"}` ou de trios `[moto_id, timestamp, km]`;
+    `timestamp` pode ser ISO 8601 ou epoch em segundos. As leituras válidas
+    vão para o buffer de escrita adiada e são gravadas em lote.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        leituras = request.data.get('leituras') if isinstance(request.data, dict) else request.data
+        if not isinstance(leituras, list):
+            return Response({
+                'success': False,
+                'message': 'Envie uma lista de leituras'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        if len(leituras) > settings.TELEMETRIA_MAXIMO_POR_REQUISICAO:
+            return Response({
+                'success': False,
+                'message': f'Máximo de {settings.TELEMETRIA_MAXIMO_POR_REQUISICAO} leituras por requisição'
+            }, status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+
+        limite_futuro = timezone.now() + timedelta(minutes=5)
+        validas, erros = [], []
+        for indice, leitura in enumerate(leituras):
+            try:
+                if isinstance(leitura, dict):
+                    moto_id, momento, km = leitura['moto_id'], leitura['timestamp'], leitura['km']
+                else:
+                    moto_id, momento, km = leitura
+                moto_id, km = int(moto_id), int(km)
+                lida_em = _ler_momento(momento)
+                # Fora das faixas das colunas o flush inteiro falharia no banco
+                if not 0 < moto_id <= BigIntegerField.MAX_BIGINT or not 0 <= km <= KM_MAXIMO:
+                    raise ValueError
+                if lida_em > limite_futuro:
+                    raise ValueError
+            except (KeyError, TypeError, ValueError, OverflowError):
+                if len(erros) < 100:
+                    erros.append({'indice': indice, 'erro': 'Leitura inválida'})
+                continue
+            validas.append((moto_id, lida_em, km))
+
+        obter_buffer().adicionar(validas)
+
+        return Response({
+            'success': True,
+            'data': {
+                'aceitas': len(validas),
+                'rejeitadas': len(leituras) - len(validas),
+                'erros': erros
+            }
+        }, status=status.HTTP_202_ACCEPTED)
+
+
+class MetaAPIView(APIView):
+    """
+    Escolhas dos formulários (motos, perfis e rotas) e marcas do catálogo
+    de modelos, montadas uma vez por processo e servidas com ETag.
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        escolhas = obter_escolhas()
+        return _resposta_versionada(request, escolhas['versao'], lambda: {
+            'success': True,
+            'data': escolhas['dados']
+        })
+
+
+class ModelosReferenciaAPIView(APIView):
+    """
+    Autocompletar de modelos do catálogo de referência (`?q=`, `?marca=`,
+    `?ano=`, `?limit=`), respondido pela trie em memória, sem consultas.
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        try:
+            limite = int(request.query_params.get('limit', MODELOS_LIMITE_PADRAO))
+            ano = request.query_params.get('ano')
+            ano = int(ano) if ano else None
+        except ValueError:
+            return Response({
+                'success': False,
+                'message': 'limit e ano devem ser números inteiros'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        limite = max(1, min(limite, MODELOS_LIMITE_MAXIMO))
+
+        catalogo = obter_catalogo_modelos()
+        return _resposta_versionada(request, catalogo.versao, lambda: {
+            'success': True,
+            'data': catalogo.sugerir(
+                request.query_params.get('q', ''), limite=limite,
+                marca=request.query_params.get('marca'), ano=ano
+            )
+        })
+
+
+def _resposta_versionada(request, versao, montar):
+    """304 se o cliente já tem a versão; senão monta a resposta com ETag"""
+    etag = f'"{versao}"'
+    if etag in request.headers.get('If-None-Match', ''):
+        resposta = Response(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        resposta = Response(montar())
+    resposta['ETag'] = etag
+    resposta['Cache-Control'] = f'public, max-age={CACHE_META}'
+    return resposta
+
+
+def _ler_momento(valor):
+    """Converte ISO 8601 ou epoch (segundos) em datetime com fuso"""
+    if isinstance(valor, (int, float)):
+        return datetime.fromtimestamp(valor, tz=dt_timezone.utc)
+    momento = parse_datetime(valor)
+    if momento is None:
+        raise ValueError
+    if timezone.is_naive(momento):
+        momento = timezone.make_aware(momento)
+    return momento
@@ -4,3 +4,12 @@ from django.apps import AppConfig
 class MotosConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'motos'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+        from moto_maintenance.sqlite import ajustar_conexao
+        from . import signals  # noqa: F401
+        from .modelos_referencia import carregar_catalogo_modelos
+
+        carregar_catalogo_modelos()
+        connection_created.connect(ajustar_conexao, dispatch_uid='motocare_sqlite_pragmas')
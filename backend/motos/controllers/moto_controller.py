@@ -180,7 +180,7 @@ class MotoController:
 
         if resultado['success']:
             motos_data = list(resultado['motos'].values(
-                'id', 'modelo', 'marca', 'ano', 'km_atual', 'placa'
+                'id', 'modelo', 'marca', 'ano_inicio', 'ano_fim', 'km_atual', 'placa'
             ))
             return JsonResponse({'motos': motos_data})
         else:
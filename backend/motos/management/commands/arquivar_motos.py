@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+from motos.services.arquivamento_service import (
+    ArquivamentoMotoService, DIAS_INATIVA_PADRAO, TAMANHO_LOTE_PADRAO
+)
+
+
+class Command(BaseCommand):
+    help = 'Arquiva motos inativas há muito tempo (com manutenções, rotas e análises) ou restaura motos arquivadas'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dias', type=int, default=DIAS_INATIVA_PADRAO,
+                            help='Dias desde a última alteração da moto inativa (padrão: %(default)s)')
+        parser.add_argument('--lote', type=int, default=TAMANHO_LOTE_PADRAO,
+                            help='Motos por transação (padrão: %(default)s)')
+        parser.add_argument('--dry-run', action='store_true', help='Apenas conta as candidatas')
+        parser.add_argument('--restaurar', type=int, nargs='+', metavar='MOTO_ID',
+                            help='Restaura as motos arquivadas com estes ids')
+
+    def handle(self, *args, **options):
+        if options['lote'] < 1:
+            raise CommandError('--lote deve ser maior que zero.')
+
+        if options['restaurar']:
+            resultado = ArquivamentoMotoService.restaurar(options['restaurar'], tamanho_lote=options['lote'])
+            if resultado['nao_encontradas']:
+                ids = ', '.join(str(moto_id) for moto_id in resultado['nao_encontradas'])
+                self.stdout.write(self.style.WARNING(f'Não arquivadas: {ids}'))
+            self.stdout.write(self.style.SUCCESS(f'{len(resultado["restauradas"])} moto(s) restaurada(s).'))
+            return
+
+        resultado = ArquivamentoMotoService.arquivar(
+            dias=options['dias'], tamanho_lote=options['lote'], dry_run=options['dry_run']
+        )
+        if resultado['dry_run']:
+            self.stdout.write(self.style.SUCCESS(f'{resultado["candidatas"]} moto(s) seriam arquivada(s).'))
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f'{resultado["arquivadas"]} moto(s) arquivada(s) com {resultado["registros"]} registro(s).'
+            ))
@@ -0,0 +1,27 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from moto_maintenance.roteamento import atualizar_snapshot_sqlite
+
+
+class Command(BaseCommand):
+    help = 'Copia o banco SQLite para o snapshot (SQLITE_SNAPSHOT) lido pelas análises, pela API de backup online'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--continuo', action='store_true',
+                            help='Repete a cópia a cada SQLITE_SNAPSHOT_INTERVALO segundos')
+
+    def handle(self, *args, **options):
+        while True:
+            inicio = time.monotonic()
+            try:
+                destino = atualizar_snapshot_sqlite()
+            except ValueError as e:
+                raise CommandError(str(e))
+            self.stdout.write(self.style.SUCCESS(
+                f'Snapshot atualizado em {destino} ({time.monotonic() - inicio:.2f} s).'
+            ))
+            if not options['continuo']:
+                return
+            time.sleep(settings.SQLITE_SNAPSHOT_INTERVALO)
@@ -0,0 +1,115 @@
+import multiprocessing
+import random
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from moto_maintenance.sqlite import pragmas
+
+
+MOTOS = 200
+LEITURAS_INICIAIS = 20000
+
+
+def _preparar(caminho: Path) -> None:
+    """Banco descartável com uma tabela no formato das leituras de km"""
+    conexao = sqlite3.connect(caminho)
+    conexao.executescript("""
+        CREATE TABLE leitura (id INTEGER PRIMARY KEY, moto_id INTEGER NOT NULL, km INTEGER NOT NULL, lida_em REAL NOT NULL);
+        CREATE INDEX leitura_moto_idx ON leitura (moto_id, km);
+    """)
+    conexao.executemany(
+        'INSERT INTO leitura (moto_id, km, lida_em) VALUES (?, ?, ?)',
+        ((indice % MOTOS, indice, time.time()) for indice in range(LEITURAS_INICIAIS)),
+    )
+    conexao.commit()
+    conexao.close()
+
+
+def _worker(caminho, ajustes, segundos, proporcao_escrita, semente, fila):
+    # Como o Django: autocommit e BEGIN explícito nas transações
+    conexao = sqlite3.connect(caminho, timeout=5, isolation_level=None)
+    for pragma in ajustes:
+        conexao.execute(pragma)
+    inicio_transacao = 'BEGIN IMMEDIATE' if ajustes else 'BEGIN'
+    aleatorio = random.Random(semente)
+    leituras = escritas = erros = 0
+
+    fim = time.perf_counter() + segundos
+    while time.perf_counter() < fim:
+        moto_id = aleatorio.randrange(MOTOS)
+        try:
+            if aleatorio.random() < proporcao_escrita:
+                # Lê o último km e grava a leitura nova na mesma transação
+                conexao.execute(inicio_transacao)
+                km = conexao.execute('SELECT COALESCE(MAX(km), 0) FROM leitura WHERE moto_id = ?', (moto_id,)).fetchone()[0]
+                conexao.execute(
+                    'INSERT INTO leitura (moto_id, km, lida_em) VALUES (?, ?, ?)',
+                    (moto_id, km + aleatorio.randrange(1, 50), time.time()),
+                )
+                conexao.execute('COMMIT')
+                escritas += 1
+            else:
+                conexao.execute('SELECT COUNT(*), MAX(km), AVG(km) FROM leitura WHERE moto_id = ?', (moto_id,)).fetchone()
+                leituras += 1
+        except sqlite3.OperationalError:
+            # "database is locked"
+            if conexao.in_transaction:
+                conexao.execute('ROLLBACK')
+            erros += 1
+
+    conexao.close()
+    fila.put((leituras, escritas, erros))
+
+
+class Command(BaseCommand):
+    help = 'Mede leituras e escritas por segundo no SQLite com N processos concorrentes, sem e com o modo de produção'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=8, help='Processos concorrentes (padrão: %(default)s)')
+        parser.add_argument('--segundos', type=float, default=5.0, help='Duração de cada rodada (padrão: %(default)s)')
+        parser.add_argument('--escrita', type=float, default=0.2,
+                            help='Fração das operações que são escritas (padrão: %(default)s)')
+
+    def handle(self, *args, **options):
+        if options['workers'] < 1 or options['segundos'] <= 0 or not 0 <= options['escrita'] <= 1:
+            raise CommandError('Use --workers >= 1, --segundos > 0 e --escrita entre 0 e 1.')
+
+        modos = [
+            ('padrão', []),
+            ('otimizado', pragmas(settings.SQLITE_MMAP_SIZE, settings.SQLITE_CACHE_SIZE, settings.SQLITE_BUSY_TIMEOUT)),
+        ]
+        self.stdout.write(
+            f'{options["workers"]} worker(s), {options["segundos"]:g} s por rodada, '
+            f'{options["escrita"]:.0%} de escritas'
+        )
+        self.stdout.write(f'{"modo":<10} {"leituras/s":>12} {"escritas/s":>12} {"bloqueios":>10}')
+
+        with tempfile.TemporaryDirectory() as diretorio:
+            for nome, ajustes in modos:
+                caminho = Path(diretorio) / f'{nome}.sqlite3'
+                _preparar(caminho)
+                leituras, escritas, erros = self._rodar(caminho, ajustes, options)
+                segundos = options['segundos']
+                self.stdout.write(f'{nome:<10} {leituras / segundos:>12.0f} {escritas / segundos:>12.0f} {erros:>10}')
+
+        self.stdout.write(self.style.SUCCESS('Benchmark concluído.'))
+
+    def _rodar(self, caminho, ajustes, options):
+        fila = multiprocessing.Queue()
+        processos = [
+            multiprocessing.Process(
+                target=_worker,
+                args=(str(caminho), ajustes, options['segundos'], options['escrita'], semente, fila),
+            )
+            for semente in range(options['workers'])
+        ]
+        for processo in processos:
+            processo.start()
+        resultados = [fila.get() for _ in processos]
+        for processo in processos:
+            processo.join()
+        return tuple(sum(coluna) for coluna in zip(*resultados))
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from motos.services.busca_service import BuscaMotoService
+
+
+class Command(BaseCommand):
+    help = 'Reconstrói o índice de trigramas da busca de motos'
+
+    def handle(self, *args, **options):
+        total = BuscaMotoService.reindexar_tudo()
+        self.stdout.write(self.style.SUCCESS(f'{total} motos indexadas.'))
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.6 on 2026-10-19 13:55
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('motos', '0004_remove_moto_ano_moto_ano_fim_moto_ano_inicio_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='moto',
+            index=models.Index(fields=['-criado_em', '-id'], name='moto_criado_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='moto',
+            index=models.Index(fields=['criado_por', '-criado_em'], name='moto_usuario_criado_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='rota',
+            index=models.Index(fields=['-data_registro', '-id'], name='rota_registro_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='rota',
+            index=models.Index(fields=['moto', '-data_registro'], name='rota_moto_registro_idx'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.6 on 2026-10-19 14:08
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('motos', '0005_indices_listagem'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeituraKm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('km', models.PositiveIntegerField(verbose_name='Km Lido')),
+                ('aceita', models.BooleanField(default=True, verbose_name='Aceita')),
+                ('origem', models.CharField(choices=[('manual', 'Manual'), ('api', 'API'), ('telemetria', 'Telemetria'), ('importacao', 'Importação')], default='manual', max_length=20, verbose_name='Origem')),
+                ('lida_em', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Lida em')),
+                ('registrado_em', models.DateTimeField(auto_now_add=True, verbose_name='Registrado em')),
+                ('moto', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leituras_km', to='motos.moto')),
+                ('usuario', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='leituras_km', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Leitura de Km',
+                'verbose_name_plural': 'Leituras de Km',
+                'ordering': ['-lida_em'],
+                'indexes': [models.Index(fields=['moto', 'lida_em'], name='leitura_km_moto_lida_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 5.2.6 on 2026-10-19 14:14
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from motos.normalizacao import normalizar_placa, texto_indexado, trigramas
+
+
+def indexar_motos(apps, schema_editor):
+    """Preenche a placa normalizada e os trigramas das motos existentes"""
+    Moto = apps.get_model('motos', 'Moto')
+    TrigramaMoto = apps.get_model('motos', 'TrigramaMoto')
+    motos = list(Moto.objects.only('id', 'criado_por_id', 'marca', 'modelo', 'placa', 'chassi'))
+    for moto in motos:
+        moto.placa_normalizada = normalizar_placa(moto.placa)
+    Moto.objects.bulk_update(motos, ['placa_normalizada'], batch_size=1000)
+    TrigramaMoto.objects.bulk_create([
+        TrigramaMoto(moto_id=moto.pk, criado_por_id=moto.criado_por_id, trigrama=trigrama)
+        for moto in motos
+        for trigrama in trigramas(texto_indexado([moto.marca, moto.modelo, moto.placa, moto.chassi]))
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('motos', '0006_leituras_km'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrigramaMoto',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('trigrama', models.CharField(max_length=3, verbose_name='Trigrama')),
+            ],
+            options={
+                'verbose_name': 'Trigrama de Moto',
+                'verbose_name_plural': 'Trigramas de Motos',
+            },
+        ),
+        migrations.AddField(
+            model_name='moto',
+            name='placa_normalizada',
+            field=models.CharField(blank=True, editable=False, max_length=10, null=True, verbose_name='Placa Normalizada'),
+        ),
+        migrations.AddIndex(
+            model_name='moto',
+            index=models.Index(fields=['placa_normalizada'], name='moto_placa_normalizada_idx'),
+        ),
+        migrations.AddField(
+            model_name='trigramamoto',
+            name='criado_por',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='trigramamoto',
+            name='moto',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='trigramas', to='motos.moto'),
+        ),
+        migrations.AddIndex(
+            model_name='trigramamoto',
+            index=models.Index(fields=['criado_por', 'trigrama'], name='trigrama_moto_usuario_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='trigramamoto',
+            index=models.Index(fields=['trigrama'], name='trigrama_moto_idx'),
+        ),
+        migrations.RunPython(indexar_motos, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,77 @@
+# Generated by Django 5.2.6 on 2026-10-19 14:15
+
+from django.conf import settings
+from django.db import migrations, models
+from motos.normalizacao import normalizar_chassi, normalizar_placa, normalizar_renavam
+
+
+def preencher_documentos(apps, schema_editor):
+    """
+    Preenche as colunas normalizadas das motos existentes
+
+    Se um usuário tiver duas motos ativas com o mesmo documento a migração
+    falha listando os conflitos: não há como escolher qual moto fica com o
+    valor, e uma coluna em branco faria o próximo save() violar o índice.
+    Desative ou corrija as motos indicadas e rode a migração de novo.
+    """
+    Moto = apps.get_model('motos', 'Moto')
+    vistos = {'placa_normalizada': {}, 'chassi_normalizado': {}, 'renavam_normalizado': {}}
+    conflitos = []
+    motos = list(
+        Moto.objects.only('id', 'ativo', 'criado_por', 'placa', 'chassi', 'renavam').order_by('criado_em', 'id')
+    )
+    for moto in motos:
+        valores = {
+            'placa_normalizada': normalizar_placa(moto.placa),
+            'chassi_normalizado': normalizar_chassi(moto.chassi),
+            'renavam_normalizado': normalizar_renavam(moto.renavam),
+        }
+        for campo, valor in valores.items():
+            # Motos sem dono não entram no índice único (NULL não se repete)
+            if valor and moto.ativo and moto.criado_por_id is not None:
+                chave = (moto.criado_por_id, valor)
+                if chave in vistos[campo]:
+                    conflitos.append(f'{campo}={valor}: motos {vistos[campo][chave]} e {moto.id}')
+                else:
+                    vistos[campo][chave] = moto.id
+            setattr(moto, campo, valor)
+    if conflitos:
+        raise RuntimeError(
+            'Motos ativas do mesmo usuário com documento repetido; desative ou corrija antes de migrar:\n'
+            + '\n'.join(conflitos)
+        )
+    Moto.objects.bulk_update(motos, list(vistos), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('motos', '0007_busca_trigramas'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='moto',
+            name='chassi_normalizado',
+            field=models.CharField(blank=True, editable=False, max_length=50, null=True, verbose_name='Chassi Normalizado'),
+        ),
+        migrations.AddField(
+            model_name='moto',
+            name='renavam_normalizado',
+            field=models.CharField(blank=True, editable=False, max_length=20, null=True, verbose_name='Renavam Normalizado'),
+        ),
+        migrations.RunPython(preencher_documentos, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='moto',
+            constraint=models.UniqueConstraint(condition=models.Q(('ativo', True)), fields=('placa_normalizada', 'criado_por'), name='moto_placa_unica_ativa'),
+        ),
+        migrations.AddConstraint(
+            model_name='moto',
+            constraint=models.UniqueConstraint(condition=models.Q(('ativo', True)), fields=('chassi_normalizado', 'criado_por'), name='moto_chassi_unico_ativo'),
+        ),
+        migrations.AddConstraint(
+            model_name='moto',
+            constraint=models.UniqueConstraint(condition=models.Q(('ativo', True)), fields=('renavam_normalizado', 'criado_por'), name='moto_renavam_unico_ativo'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.6 on 2026-10-19 14:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('motos', '0008_documentos_normalizados'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='perfilmoto',
+            index=models.Index(fields=['estilo_uso', 'ultima_calibragem'], name='perfil_calibragem_idx'),
+        ),
+    ]
@@ -0,0 +1,76 @@
+# Generated by Django 5.2.6 on 2026-10-19 14:27
+
+import django.core.serializers.json
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('motos', '0009_indice_calibragem'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MotoArquivada',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('moto_id', models.PositiveBigIntegerField(unique=True, verbose_name='Id da Moto')),
+                ('descricao', models.CharField(max_length=200, verbose_name='Descrição')),
+                ('placa', models.CharField(blank=True, max_length=10, null=True, verbose_name='Placa')),
+                ('registros', models.PositiveIntegerField(verbose_name='Registros')),
+                ('dados', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder, verbose_name='Dados')),
+                ('desativada_em', models.DateTimeField(verbose_name='Desativada em')),
+                ('arquivada_em', models.DateTimeField(auto_now_add=True, verbose_name='Arquivada em')),
+            ],
+            options={
+                'verbose_name': 'Moto Arquivada',
+                'verbose_name_plural': 'Motos Arquivadas',
+                'ordering': ['-arquivada_em'],
+            },
+        ),
+        migrations.RemoveIndex(
+            model_name='moto',
+            name='moto_criado_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='moto',
+            name='moto_usuario_criado_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='rota',
+            name='rota_registro_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='rota',
+            name='rota_moto_registro_idx',
+        ),
+        migrations.AddIndex(
+            model_name='moto',
+            index=models.Index(condition=models.Q(('ativo', True)), fields=['-criado_em', '-id'], name='moto_ativa_criado_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='moto',
+            index=models.Index(condition=models.Q(('ativo', True)), fields=['criado_por', '-criado_em'], name='moto_ativa_usuario_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='moto',
+            index=models.Index(condition=models.Q(('ativo', False)), fields=['atualizado_em'], name='moto_inativa_atualizada_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='rota',
+            index=models.Index(condition=models.Q(('ativo', True)), fields=['-data_registro', '-id'], name='rota_ativa_registro_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='rota',
+            index=models.Index(condition=models.Q(('ativo', True)), fields=['moto', '-data_registro'], name='rota_ativa_moto_registro_idx'),
+        ),
+        migrations.AddField(
+            model_name='motoarquivada',
+            name='criado_por',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+    ]
@@ -0,0 +1,159 @@
+"""
+Catálogo de referência de modelos de motos (marca, modelo, anos e ficha técnica).
+
+Os modelos vêm de dados/modelos_referencia.json, que só muda com um deploy:
+cada processo carrega o arquivo uma vez na inicialização e monta uma trie
+com os prefixos das palavras de "marca modelo", então o autocompletar do
+formulário não vai ao banco. O hash do conteúdo serve de ETag, junto com as
+escolhas dos campos das motos, perfis e rotas servidas em /api/meta/.
+"""
+import hashlib
+import json
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+
+from .normalizacao import normalizar_texto
+
+
+ARQUIVO_MODELOS = Path(__file__).resolve().parent / 'dados' / 'modelos_referencia.json'
+
+# Campos de cada modelo, na ordem usada para preencher o formulário
+CAMPOS_MODELO = (
+    'marca', 'modelo', 'ano_inicio', 'ano_fim', 'cilindrada',
+    'tipo_motor', 'tipo_transmissao', 'tipo_combustivel',
+)
+
+
+class NoTrie:
+    __slots__ = ('filhos', 'modelos')
+
+    def __init__(self):
+        self.filhos: Dict[str, 'NoTrie'] = {}
+        # Índices dos modelos com alguma palavra que passa por este nó
+        self.modelos: Set[int] = set()
+
+
+class CatalogoModelos:
+    """Fotografia imutável dos modelos de referência e da trie de prefixos"""
+
+    def __init__(self, modelos: List[Dict[str, Any]], versao: str):
+        # Ordem fixa (marca, modelo): a posição é o desempate das sugestões
+        self.modelos = sorted(modelos, key=lambda modelo: (modelo['marca'].casefold(), modelo['modelo'].casefold()))
+        self.versao = versao
+        self.marcas = sorted({modelo['marca'] for modelo in self.modelos}, key=str.casefold)
+        self.raiz = NoTrie()
+        for indice, modelo in enumerate(self.modelos):
+            for palavra in normalizar_texto(f"{modelo['marca']} {modelo['modelo']}").split():
+                self._inserir(palavra, indice)
+
+    def _inserir(self, palavra: str, indice: int) -> None:
+        no = self.raiz
+        for caractere in palavra:
+            no = no.filhos.setdefault(caractere, NoTrie())
+            no.modelos.add(indice)
+
+    def _com_prefixo(self, prefixo: str) -> Set[int]:
+        no = self.raiz
+        for caractere in prefixo:
+            no = no.filhos.get(caractere)
+            if no is None:
+                return set()
+        return no.modelos
+
+    def sugerir(self, termo: str, limite: int = 10, marca: Optional[str] = None,
+                ano: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Modelos em que cada palavra do termo é prefixo de alguma palavra
+
+        "hon cg 16" encontra "Honda CG 160 Fan"; `marca` e `ano` restringem
+        a marca (sem diferenciar maiúsculas) e os anos de fabricação.
+        """
+        palavras = normalizar_texto(termo).split()
+        if not palavras:
+            return []
+
+        encontrados = None
+        # Começa pelo prefixo mais seletivo (o mais longo)
+        for palavra in sorted(palavras, key=len, reverse=True):
+            indices = self._com_prefixo(palavra)
+            encontrados = set(indices) if encontrados is None else encontrados & indices
+            if not encontrados:
+                return []
+
+        sugestoes = []
+        for indice in sorted(encontrados):
+            modelo = self.modelos[indice]
+            if marca and modelo['marca'].casefold() != marca.casefold():
+                continue
+            if ano is not None and not (modelo['ano_inicio'] <= ano <= (modelo['ano_fim'] or ano)):
+                continue
+            sugestoes.append(modelo)
+            if len(sugestoes) >= limite:
+                break
+        return sugestoes
+
+
+def _carregar() -> CatalogoModelos:
+    conteudo = ARQUIVO_MODELOS.read_bytes()
+    modelos = [
+        {campo: modelo.get(campo) for campo in CAMPOS_MODELO}
+        for modelo in json.loads(conteudo)
+    ]
+    return CatalogoModelos(modelos, hashlib.sha256(conteudo).hexdigest()[:16])
+
+
+_lock = threading.Lock()
+_catalogo: Optional[CatalogoModelos] = None
+_escolhas: Optional[Dict[str, Any]] = None
+
+
+def carregar_catalogo_modelos() -> CatalogoModelos:
+    """Lê o arquivo e monta a trie (chamado no ready() do app)"""
+    global _catalogo, _escolhas
+    with _lock:
+        _catalogo = _carregar()
+        _escolhas = None
+    return _catalogo
+
+
+def obter_catalogo_modelos() -> CatalogoModelos:
+    return _catalogo or carregar_catalogo_modelos()
+
+
+def _opcoes(modelo, campo: str) -> List[Dict[str, Any]]:
+    return [{'value': valor, 'label': str(rotulo)} for valor, rotulo in modelo._meta.get_field(campo).choices]
+
+
+def obter_escolhas() -> Dict[str, Any]:
+    """
+    Escolhas dos formulários de moto, perfil e rota e a versão (ETag)
+
+    Montadas uma vez por processo: as listas estão no código e no arquivo
+    de referência, que só mudam com um deploy.
+    """
+    global _escolhas
+    if _escolhas is None:
+        from .models import Moto, PerfilMoto, Rota
+
+        dados = {
+            'moto': {
+                campo: _opcoes(Moto, campo)
+                for campo in ('marca', 'cor', 'cilindrada', 'tipo_motor', 'tipo_transmissao', 'tipo_combustivel')
+            },
+            'perfil': {
+                campo: _opcoes(PerfilMoto, campo)
+                for campo in ('tipo_pneu', 'estilo_uso', 'frequencia_uso', 'tipo_via_predominante',
+                              'condicoes_via', 'clima_predominante')
+            },
+            'rota': {
+                campo: _opcoes(Rota, campo) for campo in ('tipo_via', 'condicoes_via', 'clima')
+            },
+            'modelos': {
+                'marcas': obter_catalogo_modelos().marcas,
+                'total': len(obter_catalogo_modelos().modelos),
+            },
+        }
+        serializado = json.dumps(dados, sort_keys=True, ensure_ascii=False).encode()
+        _escolhas = {'dados': dados, 'versao': hashlib.sha256(serializado).hexdigest()[:16]}
+    return _escolhas
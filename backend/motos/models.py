@@ -1,6 +1,15 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.core.serializers.json import DjangoJSONEncoder
 from django.core.validators import MinValueValidator, MaxValueValidator
+from django.utils import timezone
+from moto_maintenance.managers import AtivoManager, AtivoQuerySet
+from .normalizacao import normalizar_chassi, normalizar_placa, normalizar_renavam
+
+
+# Maior km aceito: limite de PositiveIntegerField no PostgreSQL (integer);
+# o SQLite aceitaria 64 bits, então o limite do banco não serve de validação
+KM_MAXIMO = 2147483647
 
 
 class Moto(models.Model):
@@ -112,6 +121,11 @@ class Moto(models.Model):
     placa = models.CharField('Placa', max_length=10, blank=True, null=True)
     chassi = models.CharField('Chassi', max_length=50, blank=True, null=True)
     renavam = models.CharField('Renavam', max_length=20, blank=True, null=True)
+    # Documentos sem separadores e em minúsculas, para busca exata e unicidade
+    # (mantidos no save; gravações em lote chamam preencher_normalizados())
+    placa_normalizada = models.CharField('Placa Normalizada', max_length=10, blank=True, null=True, editable=False)
+    chassi_normalizado = models.CharField('Chassi Normalizado', max_length=50, blank=True, null=True, editable=False)
+    renavam_normalizado = models.CharField('Renavam Normalizado', max_length=20, blank=True, null=True, editable=False)
 
     # Datas importantes
     data_compra = models.DateField('Data da Compra', blank=True, null=True)
@@ -130,16 +144,62 @@ class Moto(models.Model):
     atualizado_em = models.DateTimeField('Atualizado em', auto_now=True)
     criado_por = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='motos_criadas')
 
+    objects = AtivoQuerySet.as_manager()
+    ativos = AtivoManager()
+
     class Meta:
         verbose_name = 'Moto'
         verbose_name_plural = 'Motos'
         ordering = ['-criado_em']
+        # Listagens só leem motos ativas: índices parciais ficam menores e
+        # não mudam quando motos inativas são arquivadas
+        indexes = [
+            models.Index(fields=['-criado_em', '-id'], condition=models.Q(ativo=True), name='moto_ativa_criado_idx'),
+            models.Index(fields=['criado_por', '-criado_em'], condition=models.Q(ativo=True),
+                         name='moto_ativa_usuario_idx'),
+            models.Index(fields=['placa_normalizada'], name='moto_placa_normalizada_idx'),
+            # Candidatas ao arquivamento (arquivar_motos)
+            models.Index(fields=['atualizado_em'], condition=models.Q(ativo=False), name='moto_inativa_atualizada_idx'),
+        ]
+        # Únicos entre as motos ativas de cada usuário: motos desativadas
+        # (vendidas) podem repetir, e a mesma moto pode estar em outra conta
+        constraints = [
+            models.UniqueConstraint(fields=['placa_normalizada', 'criado_por'], condition=models.Q(ativo=True),
+                                    name='moto_placa_unica_ativa'),
+            models.UniqueConstraint(fields=['chassi_normalizado', 'criado_por'], condition=models.Q(ativo=True),
+                                    name='moto_chassi_unico_ativo'),
+            models.UniqueConstraint(fields=['renavam_normalizado', 'criado_por'], condition=models.Q(ativo=True),
+                                    name='moto_renavam_unico_ativo'),
+        ]
 
     def __str__(self):
         if self.ano_fim:
             return f"{self.marca} {self.modelo} ({self.ano_inicio}/{self.ano_fim})"
         return f"{self.marca} {self.modelo} ({self.ano_inicio})"
 
+    # Campo de documento -> coluna normalizada
+    CAMPOS_NORMALIZADOS = {
+        'placa': 'placa_normalizada',
+        'chassi': 'chassi_normalizado',
+        'renavam': 'renavam_normalizado',
+    }
+
+    def preencher_normalizados(self):
+        """Atualiza as colunas normalizadas a partir de placa, chassi e renavam"""
+        self.placa_normalizada = normalizar_placa(self.placa)
+        self.chassi_normalizado = normalizar_chassi(self.chassi)
+        self.renavam_normalizado = normalizar_renavam(self.renavam)
+
+    def save(self, *args, **kwargs):
+        self.preencher_normalizados()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {
+                *update_fields,
+                *(self.CAMPOS_NORMALIZADOS[campo] for campo in update_fields if campo in self.CAMPOS_NORMALIZADOS),
+            }
+        super().save(*args, **kwargs)
+
     @property
     def km_total_percorridos(self):
         """Retorna o total de km percorridos desde a compra"""
@@ -222,6 +282,10 @@ class PerfilMoto(models.Model):
         verbose_name = 'Perfil da Moto'
         verbose_name_plural = 'Perfis das Motos'
         ordering = ['-atualizado_em']
+        indexes = [
+            # Calibragens vencidas: uma faixa de datas por estilo de uso
+            models.Index(fields=['estilo_uso', 'ultima_calibragem'], name='perfil_calibragem_idx'),
+        ]
 
     def __str__(self):
         return f"Perfil de {self.moto}"
@@ -272,11 +336,100 @@ class Rota(models.Model):
     data_registro = models.DateTimeField('Data de Registro', auto_now_add=True)
     ativo = models.BooleanField('Ativo', default=True)
 
+    objects = AtivoQuerySet.as_manager()
+    ativos = AtivoManager()
+
     class Meta:
         verbose_name = 'Rota'
         verbose_name_plural = 'Rotas'
         ordering = ['-data_registro']
         unique_together = ['moto', 'nome_rota']
+        indexes = [
+            models.Index(fields=['-data_registro', '-id'], condition=models.Q(ativo=True), name='rota_ativa_registro_idx'),
+            models.Index(fields=['moto', '-data_registro'], condition=models.Q(ativo=True),
+                         name='rota_ativa_moto_registro_idx'),
+        ]
 
     def __str__(self):
         return f"{self.nome_rota} - {self.moto}"
+
+
+class LeituraKm(models.Model):
+    """Leituras do hodômetro (manuais, via API ou telemetria)"""
+
+    ORIGEM_CHOICES = [
+        ('manual', 'Manual'),
+        ('api', 'API'),
+        ('telemetria', 'Telemetria'),
+        ('importacao', 'Importação'),
+    ]
+
+    moto = models.ForeignKey(Moto, on_delete=models.CASCADE, related_name='leituras_km')
+    km = models.PositiveIntegerField('Km Lido')
+    # False quando a leitura era menor que o km já registrado e não o alterou
+    aceita = models.BooleanField('Aceita', default=True)
+    origem = models.CharField('Origem', max_length=20, choices=ORIGEM_CHOICES, default='manual')
+
+    # Metadados
+    lida_em = models.DateTimeField('Lida em', default=timezone.now)
+    registrado_em = models.DateTimeField('Registrado em', auto_now_add=True)
+    usuario = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='leituras_km')
+
+    class Meta:
+        verbose_name = 'Leitura de Km'
+        verbose_name_plural = 'Leituras de Km'
+        ordering = ['-lida_em']
+        indexes = [
+            models.Index(fields=['moto', 'lida_em'], name='leitura_km_moto_lida_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.moto} - {self.km} km ({self.lida_em:%d/%m/%Y %H:%M})"
+
+
+class TrigramaMoto(models.Model):
+    """Índice de trigramas de marca, modelo, placa e chassi para a busca de motos"""
+
+    moto = models.ForeignKey(Moto, on_delete=models.CASCADE, related_name='trigramas')
+    # Copiado da moto para que a busca de uma conta use só o índice
+    criado_por = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+',
+                                   db_index=False)
+    trigrama = models.CharField('Trigrama', max_length=3)
+
+    class Meta:
+        verbose_name = 'Trigrama de Moto'
+        verbose_name_plural = 'Trigramas de Motos'
+        indexes = [
+            models.Index(fields=['criado_por', 'trigrama'], name='trigrama_moto_usuario_idx'),
+            models.Index(fields=['trigrama'], name='trigrama_moto_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.trigrama!r} - {self.moto_id}"
+
+
+class MotoArquivada(models.Model):
+    """
+    Moto inativa tirada das tabelas em uso, com todos os registros dependentes
+
+    `dados` guarda a moto e o que seria apagado junto com ela (perfil, rotas,
+    leituras, manutenções, análises, alertas...) no formato dos serializers do
+    Django, para que a restauração devolva as linhas com os mesmos ids.
+    """
+
+    moto_id = models.PositiveBigIntegerField('Id da Moto', unique=True)
+    criado_por = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    descricao = models.CharField('Descrição', max_length=200)
+    placa = models.CharField('Placa', max_length=10, blank=True, null=True)
+    registros = models.PositiveIntegerField('Registros')
+    dados = models.JSONField('Dados', encoder=DjangoJSONEncoder)
+    desativada_em = models.DateTimeField('Desativada em')
+    arquivada_em = models.DateTimeField('Arquivada em', auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Moto Arquivada'
+        verbose_name_plural = 'Motos Arquivadas'
+        ordering = ['-arquivada_em']
+
+    def __str__(self):
+        return f"{self.descricao} (#{self.moto_id})"
@@ -0,0 +1,66 @@
+"""
+Normalização de texto e trigramas para a busca de motos.
+
+O texto indexado (marca, modelo, placa e chassi) é reduzido a minúsculas sem
+acentos; hífens, pontos e barras são removidos para que "ABC-1234" e
+"abc1234" sejam o mesmo termo. Cada palavra gera trigramas no estilo do
+pg_trgm (com dois espaços no início e um no fim), de modo que erros de
+digitação ainda compartilham a maior parte dos trigramas com o termo certo.
+"""
+import re
+import unicodedata
+from typing import Iterable, Optional, Set
+
+_SEPARADORES = re.compile(r'[-./]')
+_NAO_ALFANUMERICO = re.compile(r'[^a-z0-9]+')
+
+# Placa antiga (ABC1234) ou Mercosul (ABC1D23), já normalizada
+PLACA = re.compile(r'^[a-z]{3}[0-9][a-z0-9][0-9]{2}$')
+
+
+def normalizar_texto(texto: Optional[str]) -> str:
+    """Minúsculas, sem acentos, só letras, números e espaços simples"""
+    if not texto:
+        return ''
+    texto = unicodedata.normalize('NFKD', texto)
+    texto = ''.join(caractere for caractere in texto if not unicodedata.combining(caractere)).lower()
+    texto = _SEPARADORES.sub('', texto)
+    return _NAO_ALFANUMERICO.sub(' ', texto).strip()
+
+
+def normalizar_placa(placa: Optional[str]) -> Optional[str]:
+    """Placa sem separadores e em minúsculas (None se vazia)"""
+    normalizada = normalizar_texto(placa).replace(' ', '')
+    return normalizada or None
+
+
+def normalizar_chassi(chassi: Optional[str]) -> Optional[str]:
+    """Chassi (VIN) sem espaços nem separadores, em minúsculas"""
+    return normalizar_placa(chassi)
+
+
+def normalizar_renavam(renavam: Optional[str]) -> Optional[str]:
+    """Só os dígitos, com zeros à esquerda até 11 (renavams antigos têm 9)"""
+    digitos = ''.join(caractere for caractere in renavam or '' if caractere.isdigit())
+    return digitos.zfill(11) if digitos else None
+
+
+def trigramas(texto: str, prefixo: bool = False) -> Set[str]:
+    """
+    Trigramas das palavras de um texto já normalizado
+
+    Com `prefixo=True` (autocompletar) o trigrama final da última palavra
+    não é gerado, já que o usuário ainda pode estar digitando.
+    """
+    palavras = texto.split()
+    resultado = set()
+    for posicao, palavra in enumerate(palavras):
+        completa = f'  {palavra} '
+        if prefixo and posicao == len(palavras) - 1:
+            completa = completa[:-1]
+        resultado.update(completa[inicio:inicio + 3] for inicio in range(len(completa) - 2))
+    return resultado
+
+
+def texto_indexado(campos: Iterable[Optional[str]]) -> str:
+    return ' '.join(filter(None, (normalizar_texto(campo) for campo in campos)))
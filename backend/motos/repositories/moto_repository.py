@@ -1,7 +1,8 @@
 from django.db import models
-from django.db.models import Q
+from django.db.models import Case, IntegerField, Value, When
 from typing import Optional, List
 from ..models import Moto
+from ..services.busca_service import BuscaMotoService
 
 
 class MotoRepository:
@@ -45,15 +46,18 @@ class MotoRepository:
     @staticmethod
     def get_active_motos_by_user(user) -> models.QuerySet:
         """Retorna apenas motos ativas do usuário"""
-        return Moto.objects.filter(criado_por=user, ativo=True)
+        return Moto.ativos.filter(criado_por=user)
 
     @staticmethod
-    def search_motos_by_user(user, search_term: str) -> models.QuerySet:
-        """Busca motos por termo de pesquisa"""
-        return Moto.objects.filter(
-            criado_por=user
-        ).filter(
-            Q(modelo__icontains=search_term) |
-            Q(marca__icontains=search_term) |
-            Q(placa__icontains=search_term)
+    def search_motos_by_user(user, search_term: str, limit: int = 50) -> models.QuerySet:
+        """Busca motos por termo de pesquisa, das mais parecidas para as menos"""
+        ids = [
+            resultado['moto_id']
+            for resultado in BuscaMotoService.buscar(search_term, usuario=user, limite=limit)
+        ]
+        if not ids:
+            return Moto.objects.none()
+        return Moto.objects.filter(criado_por=user, pk__in=ids).order_by(
+            Case(*[When(pk=moto_id, then=Value(posicao)) for posicao, moto_id in enumerate(ids)],
+                 output_field=IntegerField())
         )
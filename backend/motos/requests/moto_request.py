@@ -1,6 +1,17 @@
+import re
 from django import forms
 from django.core.exceptions import ValidationError
-from typing import Dict, Any
+from django.utils.dateparse import parse_date
+from typing import Dict, Any, List, Tuple
+from ..models import KM_MAXIMO, Moto
+
+# Formatos aceitos: AAA-1234 ou AAA1A23
+PLACA_REGEX = re.compile(r'^[A-Z]{3}-?\d{4}$|^[A-Z]{3}\d[A-Z]\d{2}$')
+RENAVAM_REGEX = re.compile(r'^\d{11}$')
+TAMANHO_CHASSI = 17
+
+ANO_MINIMO = 1900
+ANO_MAXIMO = 2030
 
 
 class CriarMotoRequest:
@@ -31,13 +42,13 @@ class CriarMotoRequest:
 
     def _validate_required_fields(self):
         """Valida campos obrigatórios"""
-        required_fields = ['modelo', 'marca', 'ano', 'km_atual']
+        required_fields = ['modelo', 'marca', 'ano_inicio', 'km_atual']
 
         for field in required_fields:
-            if not self.data.get(field):
+            if self.data.get(field) in (None, ''):
                 self.errors[field] = ['Este campo é obrigatório.']
             else:
-                self.cleaned_data[field] = self.data[field].strip()
+                self.cleaned_data[field] = str(self.data[field]).strip()
 
     def _validate_modelo(self):
         """Valida o campo modelo"""
@@ -62,18 +73,24 @@ class CriarMotoRequest:
                 self.cleaned_data['marca'] = marca
 
     def _validate_ano(self):
-        """Valida o campo ano"""
-        if 'ano' in self.data and self.data['ano']:
-            try:
-                ano = int(self.data['ano'])
-                if ano < 1900:
-                    self.errors['ano'] = ['Ano deve ser maior ou igual a 1900.']
-                elif ano > 2030:
-                    self.errors['ano'] = ['Ano deve ser menor ou igual a 2030.']
-                else:
-                    self.cleaned_data['ano'] = ano
-            except (ValueError, TypeError):
-                self.errors['ano'] = ['Ano deve ser um número válido.']
+        """Valida os campos ano_inicio e ano_fim"""
+        for campo in ('ano_inicio', 'ano_fim'):
+            if campo in self.data and self.data[campo]:
+                try:
+                    ano = int(self.data[campo])
+                    if ano < ANO_MINIMO:
+                        self.errors[campo] = [f'Ano deve ser maior ou igual a {ANO_MINIMO}.']
+                    elif ano > ANO_MAXIMO:
+                        self.errors[campo] = [f'Ano deve ser menor ou igual a {ANO_MAXIMO}.']
+                    else:
+                        self.cleaned_data[campo] = ano
+                except (ValueError, TypeError):
+                    self.errors[campo] = ['Ano deve ser um número válido.']
+
+        ano_inicio = self.cleaned_data.get('ano_inicio')
+        ano_fim = self.cleaned_data.get('ano_fim')
+        if isinstance(ano_inicio, int) and isinstance(ano_fim, int) and ano_fim < ano_inicio:
+            self.errors['ano_fim'] = ['Ano fim deve ser maior ou igual ao ano início.']
 
     def _validate_km_atual(self):
         """Valida o campo km_atual"""
@@ -82,6 +99,8 @@ class CriarMotoRequest:
                 km = int(self.data['km_atual'])
                 if km < 0:
                     self.errors['km_atual'] = ['Quilometragem não pode ser negativa.']
+                elif km > KM_MAXIMO:
+                    self.errors['km_atual'] = [f'Quilometragem deve ser no máximo {KM_MAXIMO}.']
                 else:
                     self.cleaned_data['km_atual'] = km
             except (ValueError, TypeError):
@@ -91,9 +110,7 @@ class CriarMotoRequest:
         """Valida o campo placa"""
         if 'placa' in self.data and self.data['placa']:
             placa = self.data['placa'].strip().upper()
-            # Formatos aceitos: AAA-1234 ou AAA1A23
-            import re
-            if not re.match(r'^[A-Z]{3}-?\d{4}$|^[A-Z]{3}\d[A-Z]\d{2}$', placa):
+            if not PLACA_REGEX.match(placa):
                 self.errors['placa'] = ['Formato de placa inválido. Use AAA-1234 ou AAA1A23.']
             else:
                 self.cleaned_data['placa'] = placa
@@ -102,8 +119,8 @@ class CriarMotoRequest:
         """Valida o campo chassi"""
         if 'chassi' in self.data and self.data['chassi']:
             chassi = self.data['chassi'].strip().upper()
-            if len(chassi) != 17:
-                self.errors['chassi'] = ['Chassi deve ter exatamente 17 caracteres.']
+            if len(chassi) != TAMANHO_CHASSI:
+                self.errors['chassi'] = [f'Chassi deve ter exatamente {TAMANHO_CHASSI} caracteres.']
             else:
                 self.cleaned_data['chassi'] = chassi
 
@@ -111,7 +128,7 @@ class CriarMotoRequest:
         """Valida o campo renavam"""
         if 'renavam' in self.data and self.data['renavam']:
             renavam = self.data['renavam'].strip()
-            if not renavam.isdigit() or len(renavam) != 11:
+            if not RENAVAM_REGEX.match(renavam):
                 self.errors['renavam'] = ['RENAVAM deve ter exatamente 11 dígitos.']
             else:
                 self.cleaned_data['renavam'] = renavam
@@ -129,3 +146,150 @@ class AtualizarMotoRequest(CriarMotoRequest):
                     self.cleaned_data[field] = value.strip()
                 else:
                     self.cleaned_data[field] = value
+
+
+def _mapa_escolhas(choices) -> Dict[str, Any]:
+    """Valor e rótulo em minúsculas -> valor gravado"""
+    mapa = {}
+    for valor, rotulo in choices:
+        mapa[str(valor).lower()] = valor
+        mapa[str(rotulo).lower()] = valor
+    return mapa
+
+
+class ImportarMotosRequest:
+    """
+    Validação de um lote de motos (linhas de CSV/JSON) coluna a coluna
+
+    Cada regra percorre uma coluna inteira do lote com os padrões compilados
+    e as tabelas de escolhas já montadas, em vez de validar um dicionário
+    por vez. `validar()` retorna, para cada linha, os dados limpos e os erros.
+    """
+
+    CAMPOS_TEXTO = {'modelo': (2, 100)}
+
+    # Campo -> (mínimo, máximo, obrigatório)
+    CAMPOS_INTEIROS = {
+        'ano_inicio': (ANO_MINIMO, ANO_MAXIMO, True),
+        'ano_fim': (ANO_MINIMO, ANO_MAXIMO, False),
+        'km_atual': (0, KM_MAXIMO, False),
+        'km_compra': (0, KM_MAXIMO, False),
+    }
+
+    # Escolhas que não têm valor padrão útil no modelo
+    ESCOLHAS_OBRIGATORIAS = ('marca',)
+
+    def __init__(self, registros: List[Dict[str, Any]]):
+        self.registros = registros
+        self.escolhas = {
+            'marca': _mapa_escolhas(Moto.MARCAS_CHOICES),
+            'cor': _mapa_escolhas(Moto.COR_CHOICES),
+            'cilindrada': _mapa_escolhas(Moto.CILINDRADA_CHOICES),
+            'tipo_motor': _mapa_escolhas(Moto.TIPO_MOTOR_CHOICES),
+            'tipo_transmissao': _mapa_escolhas(Moto.TIPO_TRANSMISSAO_CHOICES),
+            'tipo_combustivel': _mapa_escolhas(Moto.TIPO_COMBUSTIVEL_CHOICES),
+        }
+        self.cleaned_data = [{} for _ in registros]
+        self.errors = [{} for _ in registros]
+
+    def _coluna(self, campo):
+        return [
+            str(registro.get(campo)).strip() if registro.get(campo) is not None else ''
+            for registro in self.registros
+        ]
+
+    def _erro(self, linha, campo, mensagem):
+        self.errors[linha].setdefault(campo, []).append(mensagem)
+
+    def validar(self) -> List[Tuple[Dict[str, Any], Dict[str, List[str]]]]:
+        """Valida todas as colunas; retorna (dados limpos, erros) de cada linha"""
+        for campo, (minimo, maximo) in self.CAMPOS_TEXTO.items():
+            self._validar_texto(campo, minimo, maximo)
+        for campo, (minimo, maximo, obrigatorio) in self.CAMPOS_INTEIROS.items():
+            self._validar_inteiro(campo, minimo, maximo, obrigatorio)
+        for campo, mapa in self.escolhas.items():
+            self._validar_escolha(campo, mapa)
+        self._validar_padrao('placa', PLACA_REGEX.match, 'Formato de placa inválido. Use AAA-1234 ou AAA1A23.')
+        self._validar_padrao('chassi', lambda chassi: len(chassi) == TAMANHO_CHASSI,
+                             f'Chassi deve ter exatamente {TAMANHO_CHASSI} caracteres.')
+        self._validar_padrao('renavam', RENAVAM_REGEX.match, 'RENAVAM deve ter exatamente 11 dígitos.', maiusculas=False)
+        for campo in ('data_compra', 'data_fabricacao'):
+            self._validar_data(campo)
+        self._validar_entre_colunas()
+
+        observacoes = self._coluna('observacoes')
+        for linha, valor in enumerate(observacoes):
+            if valor:
+                self.cleaned_data[linha]['observacoes'] = valor
+
+        return list(zip(self.cleaned_data, self.errors))
+
+    def _validar_texto(self, campo, minimo, maximo):
+        for linha, valor in enumerate(self._coluna(campo)):
+            if not valor:
+                self._erro(linha, campo, 'Este campo é obrigatório.')
+            elif not minimo <= len(valor) <= maximo:
+                self._erro(linha, campo, f'Deve ter entre {minimo} e {maximo} caracteres.')
+            else:
+                self.cleaned_data[linha][campo] = valor
+
+    def _validar_inteiro(self, campo, minimo, maximo, obrigatorio):
+        for linha, valor in enumerate(self._coluna(campo)):
+            if not valor:
+                if obrigatorio:
+                    self._erro(linha, campo, 'Este campo é obrigatório.')
+                continue
+            try:
+                numero = int(valor)
+            except ValueError:
+                self._erro(linha, campo, 'Deve ser um número inteiro.')
+                continue
+            if numero < minimo or (maximo is not None and numero > maximo):
+                intervalo = f'entre {minimo} e {maximo}' if maximo is not None else f'maior ou igual a {minimo}'
+                self._erro(linha, campo, f'Deve ser {intervalo}.')
+            else:
+                self.cleaned_data[linha][campo] = numero
+
+    def _validar_escolha(self, campo, mapa):
+        obrigatorio = campo in self.ESCOLHAS_OBRIGATORIAS
+        for linha, valor in enumerate(self._coluna(campo)):
+            if not valor:
+                if obrigatorio:
+                    self._erro(linha, campo, 'Este campo é obrigatório.')
+                continue
+            escolhido = mapa.get(valor.lower())
+            if escolhido is None:
+                self._erro(linha, campo, f'Valor inválido: {valor}.')
+            else:
+                self.cleaned_data[linha][campo] = escolhido
+
+    def _validar_padrao(self, campo, valido, mensagem, maiusculas=True):
+        for linha, valor in enumerate(self._coluna(campo)):
+            if not valor:
+                continue
+            if maiusculas:
+                valor = valor.upper()
+            if valido(valor):
+                self.cleaned_data[linha][campo] = valor
+            else:
+                self._erro(linha, campo, mensagem)
+
+    def _validar_data(self, campo):
+        for linha, valor in enumerate(self._coluna(campo)):
+            if not valor:
+                continue
+            try:
+                data = parse_date(valor[:10])
+            except ValueError:
+                data = None
+            if data is None:
+                self._erro(linha, campo, 'Data inválida. Use AAAA-MM-DD.')
+            else:
+                self.cleaned_data[linha][campo] = data
+
+    def _validar_entre_colunas(self):
+        for linha, dados in enumerate(self.cleaned_data):
+            if 'ano_fim' in dados and 'ano_inicio' in dados and dados['ano_fim'] < dados['ano_inicio']:
+                self._erro(linha, 'ano_fim', 'Ano fim deve ser maior ou igual ao ano início.')
+            if 'km_compra' in dados and 'km_atual' in dados and dados['km_compra'] > dados['km_atual']:
+                self._erro(linha, 'km_compra', 'Km na compra não pode ser maior que o km atual.')
@@ -1,5 +1,12 @@
 from rest_framework import serializers
+from arquivos.imagens import urls_rendicoes
 from .models import Moto, PerfilMoto, Rota
+from .normalizacao import normalizar_chassi, normalizar_placa, normalizar_renavam
+
+
+# Rotas aninhadas no detalhe da moto
+ROTAS_LIMITE_PADRAO = 20
+ROTAS_LIMITE_MAXIMO = 100
 
 
 class MotoSerializer(serializers.ModelSerializer):
@@ -16,6 +23,43 @@ class MotoSerializer(serializers.ModelSerializer):
             'atualizado_em', 'criado_por'
         ]
         read_only_fields = ['id', 'criado_em', 'atualizado_em', 'criado_por']
+
+    NORMALIZADORES = {
+        'placa': ('placa_normalizada', normalizar_placa),
+        'chassi': ('chassi_normalizado', normalizar_chassi),
+        'renavam': ('renavam_normalizado', normalizar_renavam),
+    }
+
+    def validate(self, attrs):
+        """Recusa placa, chassi ou renavam já usados por outra moto ativa do mesmo usuário"""
+        ativo = attrs.get('ativo', self.instance.ativo if self.instance else True)
+        if not ativo:
+            return attrs
+        # Ao reativar uma moto, os documentos que ela já tem também contam
+        reativando = self.instance is not None and not self.instance.ativo
+        if self.instance is not None:
+            dono = self.instance.criado_por_id
+        else:
+            request = self.context.get('request')
+            dono = request.user.pk if request is not None else None
+        erros = {}
+        for campo, (coluna, normalizar) in self.NORMALIZADORES.items():
+            if campo in attrs:
+                valor = normalizar(attrs[campo])
+            elif reativando:
+                valor = getattr(self.instance, coluna)
+            else:
+                continue
+            if not valor:
+                continue
+            duplicadas = Moto.objects.filter(ativo=True, criado_por_id=dono, **{coluna: valor})
+            if self.instance is not None:
+                duplicadas = duplicadas.exclude(pk=self.instance.pk)
+            if duplicadas.exists():
+                erros[campo] = 'Você já tem outra moto ativa com este valor.'
+        if erros:
+            raise serializers.ValidationError(erros)
+        return attrs
     
     def to_representation(self, instance):
         """Customiza a representação do objeto"""
@@ -35,6 +79,7 @@ class MotoSerializer(serializers.ModelSerializer):
         # URL da imagem
         if instance.imagem_principal:
             data['imagem_url'] = instance.imagem_principal.url
+        data['imagem_urls'] = urls_rendicoes(instance.imagem_principal)
         
         return data
 
@@ -55,6 +100,7 @@ class PerfilMotoSerializer(serializers.ModelSerializer):
         data['calibragem_atualizada'] = instance.calibragem_atualizada
         data['calibragem_dianteira_diferenca'] = float(instance.calibragem_dianteira_diferenca)
         data['calibragem_traseira_diferenca'] = float(instance.calibragem_traseira_diferenca)
+        data['imagem_urls'] = urls_rendicoes(instance.imagem_perfil)
         
         return data
 
@@ -69,10 +115,47 @@ class RotaSerializer(serializers.ModelSerializer):
 
 
 class MotoDetailSerializer(MotoSerializer):
-    """Serializer detalhado para Moto com perfil e rotas"""
+    """
+    Serializer detalhado para Moto com perfil e rotas ativas
+
+    As rotas vêm paginadas: o ViewSet pré-carrega só a página pedida em
+    `rotas_ativas` e informa limite/deslocamento pelo contexto.
+    """
     
     perfil = PerfilMotoSerializer(read_only=True)
-    rotas = RotaSerializer(many=True, read_only=True)
+    rotas = serializers.SerializerMethodField()
     
     class Meta(MotoSerializer.Meta):
         fields = MotoSerializer.Meta.fields + ['perfil', 'rotas']
+
+    def get_rotas(self, obj):
+        rotas = getattr(obj, 'rotas_ativas', None)
+        if rotas is None:
+            # Sem o prefetch do ViewSet: primeira página
+            limite = self.context.get('rotas_limit', ROTAS_LIMITE_PADRAO)
+            rotas = Rota.ativos.filter(moto=obj).order_by('-data_registro', '-id')[:limite]
+        return RotaSerializer(rotas, many=True).data
+
+    def to_representation(self, instance):
+        """Adiciona a paginação das rotas"""
+        data = super().to_representation(instance)
+
+        limite = self.context.get('rotas_limit', ROTAS_LIMITE_PADRAO)
+        deslocamento = self.context.get('rotas_offset', 0)
+        total = getattr(instance, 'total_rotas_ativas', None)
+        if total is None:
+            total = Rota.ativos.filter(moto=instance).count()
+
+        proxima = None
+        if deslocamento + limite < total:
+            proxima = f'?rotas_limit={limite}&rotas_offset={deslocamento + limite}'
+            request = self.context.get('request')
+            if request is not None:
+                proxima = request.build_absolute_uri(request.path) + proxima
+        data['rotas_paginacao'] = {
+            'total': total,
+            'limit': limite,
+            'offset': deslocamento,
+            'next': proxima,
+        }
+        return data
@@ -0,0 +1,138 @@
+"""
+Arquivamento de motos inativas há muito tempo.
+
+A moto e tudo o que seria apagado junto com ela (perfil, rotas, leituras,
+manutenções com itens e históricos, análises, alertas, métricas) vão para
+uma linha de MotoArquivada e saem das tabelas em uso, em lotes com uma
+transação cada. A restauração devolve as linhas com os mesmos ids e refaz
+os índices de busca, que não são arquivados.
+"""
+from datetime import timedelta
+from itertools import islice
+from typing import Any, Dict, Iterable, List
+
+from django.contrib.admin.utils import NestedObjects
+from django.core import serializers
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.utils import timezone
+from busca import indexacao
+from busca.models import DocumentoBusca
+from ..models import Moto, MotoArquivada, TrigramaMoto
+from .busca_service import BuscaMotoService
+from .estatisticas_service import invalidar_estatisticas
+from .uso_service import invalidar_uso
+
+
+DIAS_INATIVA_PADRAO = 180
+TAMANHO_LOTE_PADRAO = 100
+
+# Índices derivados: não são arquivados, são refeitos na restauração
+DERIVADOS = (TrigramaMoto, DocumentoBusca)
+
+
+def _lotes(ids: List[int], tamanho: int) -> Iterable[List[int]]:
+    ids = iter(ids)
+    while lote := list(islice(ids, tamanho)):
+        yield lote
+
+
+def _coletar(moto: Moto) -> NestedObjects:
+    """Os mesmos registros que moto.delete() apagaria, sem exclusões rápidas"""
+    coletor = NestedObjects(using=DEFAULT_DB_ALIAS)
+    coletor.collect([moto])
+    coletor.sort()
+    return coletor
+
+
+def _serializar(coletor: NestedObjects) -> List[Dict[str, Any]]:
+    # sort() deixa os dependentes primeiro (ordem de exclusão); a restauração
+    # grava na ordem inversa, a moto antes de tudo
+    objetos = []
+    for modelo, instancias in reversed(list(coletor.data.items())):
+        if modelo not in DERIVADOS:
+            objetos.extend(sorted(instancias, key=lambda instancia: instancia.pk))
+    return serializers.serialize('python', objetos)
+
+
+class ArquivamentoMotoService:
+    """Move motos inativas para MotoArquivada e as restaura"""
+
+    @staticmethod
+    def candidatas(dias: int = DIAS_INATIVA_PADRAO):
+        """Motos inativas sem alteração há mais de `dias` dias"""
+        limite = timezone.now() - timedelta(days=dias)
+        return Moto.objects.inativos().filter(atualizado_em__lt=limite).order_by('atualizado_em', 'id')
+
+    @staticmethod
+    def arquivar(dias: int = DIAS_INATIVA_PADRAO, tamanho_lote: int = TAMANHO_LOTE_PADRAO,
+                 dry_run: bool = False) -> Dict[str, Any]:
+        """
+        Arquiva as candidatas em lotes de `tamanho_lote` motos por transação
+
+        Returns:
+            Dict com o total de candidatas, de motos arquivadas e de registros
+        """
+        ids = list(ArquivamentoMotoService.candidatas(dias).values_list('id', flat=True))
+        resultado = {'candidatas': len(ids), 'arquivadas': 0, 'registros': 0, 'dry_run': dry_run}
+        if dry_run:
+            return resultado
+
+        limite = timezone.now() - timedelta(days=dias)
+        for lote in _lotes(ids, tamanho_lote):
+            with transaction.atomic():
+                # Confere de novo dentro da transação: a moto pode ter sido reativada
+                for moto in Moto.objects.inativos().filter(pk__in=lote, atualizado_em__lt=limite):
+                    coletor = _coletar(moto)
+                    dados = _serializar(coletor)
+                    MotoArquivada.objects.create(
+                        moto_id=moto.pk,
+                        criado_por_id=moto.criado_por_id,
+                        descricao=str(moto)[:200],
+                        placa=moto.placa,
+                        registros=len(dados),
+                        dados=dados,
+                        desativada_em=moto.atualizado_em,
+                    )
+                    coletor.delete()
+                    resultado['arquivadas'] += 1
+                    resultado['registros'] += len(dados)
+
+        if resultado['arquivadas']:
+            invalidar_estatisticas()
+            invalidar_uso()
+        return resultado
+
+    @staticmethod
+    def restaurar(moto_ids: Iterable[int], tamanho_lote: int = TAMANHO_LOTE_PADRAO) -> Dict[str, Any]:
+        """
+        Devolve motos arquivadas às tabelas em uso (continuam inativas)
+
+        Returns:
+            Dict com os ids restaurados e os não encontrados no arquivo
+        """
+        moto_ids = list(dict.fromkeys(moto_ids))
+        restauradas: List[int] = []
+        for lote in _lotes(moto_ids, tamanho_lote):
+            with transaction.atomic():
+                arquivadas = list(MotoArquivada.objects.filter(moto_id__in=lote))
+                documentos = []
+                for arquivada in arquivadas:
+                    for objeto in serializers.deserialize('python', arquivada.dados):
+                        # Gravação "raw": sem save() dos modelos nem efeitos dos signals
+                        objeto.save()
+                        if type(objeto.object) in indexacao.FONTES:
+                            documentos.append(objeto.object)
+                    restauradas.append(arquivada.moto_id)
+
+                BuscaMotoService.indexar_em_lote(Moto.objects.filter(pk__in=[a.moto_id for a in arquivadas]))
+                indexacao.indexar_em_lote(documentos)
+                MotoArquivada.objects.filter(pk__in=[arquivada.pk for arquivada in arquivadas]).delete()
+
+        if restauradas:
+            invalidar_estatisticas()
+            invalidar_uso()
+        encontradas = set(restauradas)
+        return {
+            'restauradas': restauradas,
+            'nao_encontradas': [moto_id for moto_id in moto_ids if moto_id not in encontradas],
+        }
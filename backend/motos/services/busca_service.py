@@ -0,0 +1,181 @@
+import math
+from typing import Any, Dict, Iterable, List
+
+from django.db import connection, transaction
+from django.db.models import Count, Q
+from ..models import Moto, TrigramaMoto
+from ..normalizacao import (
+    PLACA, normalizar_chassi, normalizar_placa, normalizar_renavam, normalizar_texto, texto_indexado, trigramas
+)
+
+
+TAMANHO_LOTE = 1000
+
+# Campos cujo texto entra no índice de trigramas
+CAMPOS_INDEXADOS = ('marca', 'modelo', 'placa', 'chassi')
+
+# Tipo de identificador aceito pelo resolvedor -> (coluna normalizada, normalizador)
+IDENTIFICADORES = {
+    'placas': ('placa_normalizada', normalizar_placa),
+    'chassis': ('chassi_normalizado', normalizar_chassi),
+    'renavams': ('renavam_normalizado', normalizar_renavam),
+}
+
+# Fração mínima dos trigramas da consulta presentes na moto (como o pg_trgm)
+SIMILARIDADE_MINIMA = 0.3
+
+
+def _linhas(moto: Moto) -> List[tuple]:
+    texto = texto_indexado(getattr(moto, campo) for campo in CAMPOS_INDEXADOS)
+    return [(moto.pk, moto.criado_por_id, trigrama) for trigrama in trigramas(texto)]
+
+
+def _inserir(linhas: List[tuple]) -> None:
+    """
+    Insere (moto_id, criado_por_id, trigrama) com executemany
+
+    São dezenas de linhas por moto; montar uma instância de modelo para cada
+    uma custaria mais que a própria inserção.
+    """
+    if not linhas:
+        return
+    tabela = connection.ops.quote_name(TrigramaMoto._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f'INSERT INTO {tabela} (moto_id, criado_por_id, trigrama) VALUES (%s, %s, %s)', linhas
+        )
+
+
+class BuscaMotoService:
+    """Busca aproximada de motos por trigramas de marca, modelo, placa e chassi"""
+
+    @staticmethod
+    def indexar(moto: Moto) -> None:
+        """Refaz os trigramas de uma moto"""
+        BuscaMotoService.indexar_em_lote([moto])
+
+    @staticmethod
+    def indexar_em_lote(motos: Iterable[Moto]) -> int:
+        """Refaz os trigramas de motos já gravadas (ex.: criadas com bulk_create)"""
+        total = 0
+        motos = list(motos)
+        for inicio in range(0, len(motos), TAMANHO_LOTE):
+            lote = motos[inicio:inicio + TAMANHO_LOTE]
+            linhas = [linha for moto in lote for linha in _linhas(moto)]
+            with transaction.atomic():
+                TrigramaMoto.objects.filter(moto_id__in=[moto.pk for moto in lote]).delete()
+                _inserir(linhas)
+            total += len(lote)
+        return total
+
+    @staticmethod
+    def reindexar_tudo() -> int:
+        """Reconstrói o índice de trigramas de todas as motos"""
+        total = 0
+        with transaction.atomic():
+            TrigramaMoto.objects.all().delete()
+            lote: List[tuple] = []
+            for moto in Moto.objects.only('id', 'criado_por_id', *CAMPOS_INDEXADOS).order_by('pk').iterator(chunk_size=TAMANHO_LOTE):
+                lote.extend(_linhas(moto))
+                total += 1
+                if len(lote) >= TAMANHO_LOTE * 10:
+                    _inserir(lote)
+                    lote = []
+            _inserir(lote)
+        return total
+
+    @staticmethod
+    def buscar(termo: str, usuario=None, limite: int = 20, prefixo: bool = False,
+               apenas_ativas: bool = False) -> List[Dict[str, Any]]:
+        """
+        Motos mais parecidas com `termo`: [{'moto_id', 'similaridade'}]
+
+        Uma placa completa é procurada primeiro pela coluna normalizada; os
+        demais termos são ordenados pela fração de trigramas em comum.
+        `usuario` restringe a busca às motos da conta.
+        """
+        motos = Moto.objects.all()
+        indice = TrigramaMoto.objects.all()
+        if usuario is not None:
+            motos = motos.filter(criado_por=usuario)
+            indice = indice.filter(criado_por=usuario)
+        if apenas_ativas:
+            motos = motos.filter(ativo=True)
+            indice = indice.filter(moto__ativo=True)
+
+        placa = normalizar_placa(termo)
+        if placa and PLACA.match(placa):
+            exatas = list(motos.filter(placa_normalizada=placa).values_list('id', flat=True)[:limite])
+            if exatas:
+                return [{'moto_id': moto_id, 'similaridade': 1.0} for moto_id in exatas]
+
+        consulta = trigramas(normalizar_texto(termo), prefixo=prefixo)
+        if not consulta:
+            return []
+        minimo = max(1, math.ceil(len(consulta) * SIMILARIDADE_MINIMA))
+        encontradas = indice.filter(trigrama__in=consulta).values('moto_id').annotate(
+            comuns=Count('id')
+        ).filter(comuns__gte=minimo).order_by('-comuns', '-moto_id')[:limite]
+
+        return [
+            {'moto_id': linha['moto_id'], 'similaridade': round(linha['comuns'] / len(consulta), 4)}
+            for linha in encontradas
+        ]
+
+    @staticmethod
+    def autocompletar(termo: str, usuario=None, limite: int = 10) -> List[Dict[str, Any]]:
+        """Top-k motos ativas para um termo ainda em digitação"""
+        resultados = BuscaMotoService.buscar(termo, usuario=usuario, limite=limite, prefixo=True, apenas_ativas=True)
+        motos = Moto.objects.only('id', 'marca', 'modelo', 'placa', 'ano_inicio', 'ano_fim').in_bulk(
+            [resultado['moto_id'] for resultado in resultados]
+        )
+        return [
+            {
+                'id': moto.pk,
+                'marca': moto.marca,
+                'modelo': moto.modelo,
+                'placa': moto.placa,
+                'ano_display': moto.ano_display,
+                'similaridade': resultado['similaridade'],
+            }
+            for resultado in resultados
+            if (moto := motos.get(resultado['moto_id'])) is not None
+        ]
+
+    @staticmethod
+    def resolver(identificadores: Dict[str, Iterable[str]], usuario=None) -> Dict[str, Dict[str, Any]]:
+        """
+        Mapeia placas, chassis e renavams para ids de motos ativas
+
+        `identificadores` é {'placas': [...], 'chassis': [...], 'renavams': [...]};
+        o retorno usa as mesmas chaves e os valores como enviados, com None
+        para os não encontrados. Uma consulta para todos os tipos, pelos
+        índices únicos das colunas normalizadas. Os documentos só são únicos
+        por usuário: sem `usuario`, um valor de várias contas resolve para
+        qualquer uma das motos.
+        """
+        normalizados = {
+            tipo: {valor: normalizar(valor) for valor in identificadores.get(tipo) or []}
+            for tipo, (_, normalizar) in IDENTIFICADORES.items()
+        }
+        filtro = Q()
+        for tipo, (coluna, _) in IDENTIFICADORES.items():
+            valores = {valor for valor in normalizados[tipo].values() if valor}
+            if valores:
+                filtro |= Q(**{f'{coluna}__in': valores})
+
+        encontrados = {tipo: {} for tipo in IDENTIFICADORES}
+        if filtro:
+            motos = Moto.objects.filter(filtro, ativo=True)
+            if usuario is not None:
+                motos = motos.filter(criado_por=usuario)
+            colunas = [coluna for coluna, _ in IDENTIFICADORES.values()]
+            for linha in motos.values('id', *colunas):
+                for tipo, (coluna, _) in IDENTIFICADORES.items():
+                    if linha[coluna]:
+                        encontrados[tipo][linha[coluna]] = linha['id']
+
+        return {
+            tipo: {valor: encontrados[tipo].get(normalizado) for valor, normalizado in valores.items()}
+            for tipo, valores in normalizados.items()
+        }
@@ -0,0 +1,124 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+
+from django.db.models import BooleanField, Case, DecimalField, F, Q, QuerySet, Value, When
+from django.db.models.functions import Abs
+from django.utils import timezone
+from ..models import PerfilMoto
+
+
+# Desvio aceito entre a calibragem atual e a recomendada, em fração da
+# recomendada. Pneus de uso misto e off-road rodam de propósito um pouco
+# fora da recomendação de asfalto.
+TOLERANCIA_POR_TIPO_PNEU = {
+    'urbano': Decimal('0.10'),
+    'misto': Decimal('0.15'),
+    'off_road': Decimal('0.20'),
+}
+TOLERANCIA_PADRAO = Decimal('0.10')
+
+# Dias até a calibragem vencer, por estilo de uso
+DIAS_POR_ESTILO_USO = {
+    'urbano': 30,
+    'estrada': 15,
+    'off_road': 7,
+    'esportivo': 7,
+}
+DIAS_PADRAO = 30
+
+CRITERIOS = ('pressao', 'vencida')
+
+TOLERANCIA = Case(
+    *[When(tipo_pneu=tipo, then=Value(tolerancia)) for tipo, tolerancia in TOLERANCIA_POR_TIPO_PNEU.items()],
+    default=Value(TOLERANCIA_PADRAO),
+    output_field=DecimalField(max_digits=4, decimal_places=2),
+)
+
+
+def _filtro_vencida(hoje: date) -> Q:
+    """Calibragem ausente ou mais antiga que o limite do estilo de uso"""
+    filtro = Q()
+    for estilo, dias in DIAS_POR_ESTILO_USO.items():
+        # Um ramo por estilo: cada um é uma faixa do índice (estilo_uso, ultima_calibragem)
+        filtro |= Q(estilo_uso=estilo) & (
+            Q(ultima_calibragem__lt=hoje - timedelta(days=dias)) | Q(ultima_calibragem__isnull=True)
+        )
+    return filtro | (~Q(estilo_uso__in=DIAS_POR_ESTILO_USO) & (
+        Q(ultima_calibragem__lt=hoje - timedelta(days=DIAS_PADRAO)) | Q(ultima_calibragem__isnull=True)
+    ))
+
+
+def _filtro_pressao() -> Q:
+    return (
+        Q(desvio_abs_dianteira__gt=F('tolerancia') * F('calibragem_recomendada_dianteira'))
+        | Q(desvio_abs_traseira__gt=F('tolerancia') * F('calibragem_recomendada_traseira'))
+    )
+
+
+class CalibragemService:
+    """Conformidade da calibragem dos pneus da frota calculada no banco"""
+
+    @staticmethod
+    def perfis_anotados(hoje: Optional[date] = None) -> QuerySet:
+        """Perfis das motos ativas com desvios, tolerância e vencimento anotados"""
+        hoje = hoje or timezone.localdate()
+        return PerfilMoto.objects.filter(moto__ativo=True).annotate(
+            desvio_dianteira=F('calibragem_atual_dianteira') - F('calibragem_recomendada_dianteira'),
+            desvio_traseira=F('calibragem_atual_traseira') - F('calibragem_recomendada_traseira'),
+            desvio_abs_dianteira=Abs(F('calibragem_atual_dianteira') - F('calibragem_recomendada_dianteira')),
+            desvio_abs_traseira=Abs(F('calibragem_atual_traseira') - F('calibragem_recomendada_traseira')),
+            tolerancia=TOLERANCIA,
+            vencida=Case(When(_filtro_vencida(hoje), then=Value(True)), default=Value(False), output_field=BooleanField()),
+        )
+
+    @staticmethod
+    def pendentes(criterios=CRITERIOS, usuario=None, hoje: Optional[date] = None) -> QuerySet:
+        """
+        Só os perfis fora da conformidade
+
+        `criterios` escolhe entre pressão fora da tolerância e calibragem
+        vencida; só 'vencida' é resolvido inteiramente pelo índice.
+        """
+        hoje = hoje or timezone.localdate()
+        filtro = Q()
+        if 'vencida' in criterios:
+            filtro |= _filtro_vencida(hoje)
+        if 'pressao' in criterios:
+            filtro |= _filtro_pressao()
+        perfis = CalibragemService.perfis_anotados(hoje).filter(filtro)
+        if usuario is not None:
+            perfis = perfis.filter(moto__criado_por=usuario)
+        return perfis.select_related('moto').order_by('ultima_calibragem', 'id')
+
+    @staticmethod
+    def descrever(perfil: PerfilMoto, hoje: Optional[date] = None) -> Dict[str, Any]:
+        """Resumo de um perfil anotado por perfis_anotados()/pendentes()"""
+        hoje = hoje or timezone.localdate()
+        problemas: List[str] = []
+        for lado in ('dianteira', 'traseira'):
+            desvio = getattr(perfil, f'desvio_{lado}')
+            limite = perfil.tolerancia * getattr(perfil, f'calibragem_recomendada_{lado}')
+            if desvio < -limite:
+                problemas.append(f'{lado}_baixa')
+            elif desvio > limite:
+                problemas.append(f'{lado}_alta')
+        if perfil.vencida:
+            problemas.append('calibragem_vencida')
+
+        moto = perfil.moto
+        return {
+            'moto_id': moto.id,
+            'moto': str(moto),
+            'placa': moto.placa,
+            'tipo_pneu': perfil.tipo_pneu,
+            'estilo_uso': perfil.estilo_uso,
+            'ultima_calibragem': perfil.ultima_calibragem,
+            'dias_sem_calibrar': (hoje - perfil.ultima_calibragem).days if perfil.ultima_calibragem else None,
+            'desvio_dianteira': float(perfil.desvio_dianteira),
+            'desvio_traseira': float(perfil.desvio_traseira),
+            'tolerancia': float(perfil.tolerancia),
+            'problemas': problemas,
+            # Pressão baixa é a que mais compromete a segurança
+            'severidade': 'alta' if any(p.endswith('_baixa') for p in problemas) else 'media',
+        }
@@ -0,0 +1,68 @@
+from typing import Any, Dict, Iterable
+
+from django.core.cache import cache
+from django.db.models import Avg, Count, ExpressionWrapper, F, IntegerField, Sum
+from moto_maintenance.roteamento import fixar_primario
+from moto_maintenance.versoes import obter_versao, invalidar_versao
+from ..models import Moto
+
+
+VERSAO_MOTOS = 'motos'
+
+# Dimensões aceitas em ?group_by=
+DIMENSOES = ('marca', 'cilindrada', 'tipo_combustivel')
+
+CACHE_TIMEOUT = 60 * 60
+
+KM_PERCORRIDOS = ExpressionWrapper(F('km_atual') - F('km_compra'), output_field=IntegerField())
+
+
+def invalidar_estatisticas() -> None:
+    invalidar_versao(VERSAO_MOTOS)
+
+
+class EstatisticasMotoService:
+    """Estatísticas das motos ativas calculadas com agregações no banco"""
+
+    @staticmethod
+    def calcular(dimensoes: Iterable[str] = DIMENSOES) -> Dict[str, Any]:
+        """
+        Totais gerais e um agrupamento por dimensão
+
+        O resultado fica no cache até a próxima gravação de Moto (versão
+        'motos'), então só a primeira requisição após uma alteração vai ao banco.
+        """
+        dimensoes = [dimensao for dimensao in DIMENSOES if dimensao in set(dimensoes)]
+        chave = f"motos_estatisticas:{obter_versao(VERSAO_MOTOS)}:{','.join(dimensoes)}"
+        resultado = cache.get(chave)
+        if resultado is None:
+            with fixar_primario():
+                resultado = EstatisticasMotoService._calcular(dimensoes)
+            cache.set(chave, resultado, CACHE_TIMEOUT)
+        return resultado
+
+    @staticmethod
+    def _calcular(dimensoes) -> Dict[str, Any]:
+        motos = Moto.ativos.all()
+
+        totais = motos.aggregate(total=Count('id'), km_total=Sum(KM_PERCORRIDOS))
+        resultado = {
+            'total_motos': totais['total'],
+            'km_total_percorridos': totais['km_total'] or 0,
+        }
+
+        for dimensao in dimensoes:
+            linhas = motos.values(dimensao).annotate(
+                quantidade=Count('id'),
+                km_total=Sum(KM_PERCORRIDOS),
+                km_medio=Avg(KM_PERCORRIDOS),
+            ).order_by(dimensao)
+            resultado[f'estatisticas_por_{dimensao}'] = {
+                linha[dimensao]: {
+                    'quantidade': linha['quantidade'],
+                    'km_total': linha['km_total'] or 0,
+                    'km_medio': round(linha['km_medio'] or 0, 1),
+                }
+                for linha in linhas
+            }
+        return resultado
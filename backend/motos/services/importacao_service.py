@@ -0,0 +1,146 @@
+from itertools import islice
+from typing import Any, Dict, Iterable, List, Tuple
+
+from django.db import DatabaseError, transaction
+from ..models import Moto, LeituraKm
+from ..requests.moto_request import ImportarMotosRequest
+from .busca_service import IDENTIFICADORES, BuscaMotoService
+from .estatisticas_service import invalidar_estatisticas
+
+
+TAMANHO_LOTE_PADRAO = 1000
+
+# Coluna do arquivo -> chave do resolvedor de identificadores
+DOCUMENTOS = {'placa': 'placas', 'chassi': 'chassis', 'renavam': 'renavams'}
+
+
+class ImportacaoMotoService:
+    """Service para importação em lote de motos (cadastro de frotas)"""
+
+    @staticmethod
+    def importar(registros: Iterable[Tuple[int, Dict[str, Any]]], usuario=None,
+                 tamanho_lote: int = TAMANHO_LOTE_PADRAO, dry_run: bool = False) -> Dict[str, Any]:
+        """
+        Serviço para importar motos em lote
+
+        Args:
+            registros: Iterável de tuplas (número da linha, registro), lido sob demanda
+            usuario: Usuário registrado como criador das motos
+            tamanho_lote: Quantidade de linhas validadas e gravadas por transação
+            dry_run: Apenas valida, sem gravar no banco
+
+        Returns:
+            Dict com o resumo da importação e os erros por linha
+        """
+        importador = _Importador(usuario, dry_run)
+        registros = iter(registros)
+
+        while True:
+            lote = list(islice(registros, tamanho_lote))
+            if not lote:
+                break
+            importador.processar_lote(lote)
+
+        if importador.importadas:
+            invalidar_estatisticas()
+
+        return {
+            'success': not importador.erros,
+            'total_linhas': importador.total_linhas,
+            'validas': importador.validas,
+            'importadas': importador.importadas,
+            'dry_run': dry_run,
+            'erros': importador.erros,
+        }
+
+
+class _Importador:
+    """Estado de uma importação: documentos já vistos e contadores"""
+
+    def __init__(self, usuario, dry_run: bool):
+        self.usuario = usuario if usuario is not None and usuario.is_authenticated else None
+        self.dry_run = dry_run
+        self.total_linhas = 0
+        self.validas = 0
+        self.importadas = 0
+        self.erros: List[Dict[str, Any]] = []
+        # Documentos normalizados já aceitos nesta importação
+        self.vistos = {campo: set() for campo in DOCUMENTOS}
+
+    def processar_lote(self, lote: List[Tuple[int, Dict[str, Any]]]):
+        """Valida o lote inteiro e grava as linhas válidas em uma transação"""
+        self.total_linhas += len(lote)
+
+        linhas, registros = [], []
+        for numero, registro in lote:
+            if not isinstance(registro, dict):
+                self.erros.append({'linha': numero, 'erros': {'__all__': ['Registro deve ser um objeto.']}})
+            elif '__erro__' in registro:
+                self.erros.append({'linha': numero, 'erros': {'__all__': [registro['__erro__']]}})
+            else:
+                linhas.append(numero)
+                registros.append(registro)
+
+        resultados = ImportarMotosRequest(registros).validar()
+        self._marcar_duplicadas(resultados)
+
+        validas = []
+        for numero, (dados, erros) in zip(linhas, resultados):
+            if erros:
+                self.erros.append({'linha': numero, 'erros': erros})
+                continue
+            dados.setdefault('km_atual', dados.get('km_compra', 0))
+            moto = Moto(criado_por=self.usuario, **dados)
+            # bulk_create não passa pelo save()
+            moto.preencher_normalizados()
+            validas.append((numero, moto))
+
+        self.validas += len(validas)
+        if not validas or self.dry_run:
+            return
+
+        try:
+            with transaction.atomic():
+                motos = Moto.objects.bulk_create([moto for _, moto in validas])
+                LeituraKm.objects.bulk_create([
+                    LeituraKm(moto_id=moto.pk, km=moto.km_atual, origem='importacao', usuario=self.usuario)
+                    for moto in motos if moto.km_atual
+                ])
+                # Nem signals nem save(): o índice de busca é montado aqui
+                BuscaMotoService.indexar_em_lote(motos)
+        except DatabaseError as e:
+            for numero, _ in validas:
+                self.erros.append({'linha': numero, 'erros': {'__all__': [f'Erro ao gravar lote: {str(e)}']}})
+            return
+
+        self.importadas += len(motos)
+
+    def _marcar_duplicadas(self, resultados):
+        """
+        Recusa placa, chassi e renavam repetidos no arquivo ou já usados
+
+        Uma consulta por lote, pelos índices únicos das colunas normalizadas.
+        """
+        identificadores = {
+            chave: [dados[campo] for dados, erros in resultados if not erros and campo in dados]
+            for campo, chave in DOCUMENTOS.items()
+        }
+        existentes = BuscaMotoService.resolver(identificadores, usuario=self.usuario)
+
+        for dados, erros in resultados:
+            if erros:
+                continue
+            aceitos = []
+            for campo, chave in DOCUMENTOS.items():
+                if campo not in dados:
+                    continue
+                normalizado = IDENTIFICADORES[chave][1](dados[campo])
+                if existentes[chave].get(dados[campo]) is not None:
+                    erros.setdefault(campo, []).append('O usuário já tem uma moto ativa com este valor.')
+                elif normalizado in self.vistos[campo]:
+                    erros.setdefault(campo, []).append('Valor repetido no arquivo.')
+                else:
+                    aceitos.append((campo, normalizado))
+            if not erros:
+                for campo, normalizado in aceitos:
+                    self.vistos[campo].add(normalizado)
@@ -0,0 +1,48 @@
+from typing import Any, Dict, Optional
+
+from django.db import transaction
+from django.utils import timezone
+from ..models import Moto, LeituraKm
+from .estatisticas_service import invalidar_estatisticas
+
+
+class QuilometragemService:
+    """Atualização do hodômetro sem corrida entre gravações concorrentes"""
+
+    @staticmethod
+    def registrar_leitura(moto_id: int, km: int, origem: str = 'manual', usuario=None,
+                          lida_em=None, filtros: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Registra uma leitura e avança km_atual se ela for maior
+
+        Um único UPDATE condicional (WHERE km_atual < km) toca só km_atual e
+        atualizado_em, então leituras concorrentes nunca fazem o hodômetro
+        voltar. Retorna o km efetivo depois da gravação. Levanta
+        Moto.DoesNotExist se a moto não existir (ou não passar em `filtros`).
+        """
+        agora = timezone.now()
+        motos = Moto.objects.filter(pk=moto_id, ativo=True, **(filtros or {}))
+
+        with transaction.atomic():
+            atualizado = motos.filter(km_atual__lt=km).update(km_atual=km, atualizado_em=agora)
+            valores = motos.values('km_atual', 'km_compra').first()
+            if valores is None:
+                raise Moto.DoesNotExist
+            LeituraKm.objects.create(
+                moto_id=moto_id,
+                km=km,
+                aceita=valores['km_atual'] <= km,
+                origem=origem,
+                usuario=usuario,
+                lida_em=lida_em or agora,
+            )
+
+        if atualizado:
+            # O UPDATE direto não dispara o post_save de Moto
+            invalidar_estatisticas()
+
+        return {
+            'atualizado': bool(atualizado),
+            'km_atual': valores['km_atual'],
+            'km_total_percorridos': valores['km_atual'] - valores['km_compra'],
+        }
@@ -0,0 +1,110 @@
+"""
+Perfil de uso semanal das motos a partir das rotas frequentes.
+
+Para cada moto: km por semana (distância x frequência das rotas ativas) e a
+fração desses km por tipo de via, condição da via e clima. A frota inteira é
+calculada com consultas agrupadas e mantida em memória em cada processo até
+a próxima gravação de Rota (versão 'rotas'), então quem estima desgaste ou
+intervalos de manutenção lê os perfis sem ir ao banco.
+"""
+from collections import defaultdict
+from typing import Any, Dict, Iterable
+
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Sum
+from moto_maintenance.versoes import CacheVersionado, invalidar_versao
+from ..models import Rota
+
+
+VERSAO_ROTAS = 'rotas'
+
+# Condições das rotas cuja participação nos km semanais é calculada
+DIMENSOES_USO = ('tipo_via', 'condicoes_via', 'clima')
+
+KM_SEMANA = ExpressionWrapper(
+    F('distancia_km') * F('frequencia_semanal'),
+    output_field=DecimalField(max_digits=9, decimal_places=2),
+)
+
+PERFIL_VAZIO = {
+    'rotas': 0,
+    'viagens_semana': 0,
+    'km_semana': 0.0,
+    'km_dia': 0.0,
+    **{dimensao: {} for dimensao in DIMENSOES_USO},
+}
+
+
+def invalidar_uso() -> None:
+    invalidar_versao(VERSAO_ROTAS)
+
+
+class UsoFrota:
+    """Fotografia imutável dos perfis de uso de todas as motos"""
+
+    def __init__(self, perfis: Dict[int, Dict[str, Any]], resumo: Dict[str, Any]):
+        self.perfis = perfis
+        self.resumo = resumo
+
+    def perfil(self, moto_id: int) -> Dict[str, Any]:
+        return self.perfis.get(moto_id, PERFIL_VAZIO)
+
+
+def _construir_uso() -> UsoFrota:
+    """Quatro consultas agrupadas para a frota inteira"""
+    rotas = Rota.ativos.filter(moto__ativo=True)
+
+    perfis = {}
+    for linha in rotas.values('moto_id').annotate(
+        rotas=Count('id'), viagens_semana=Sum('frequencia_semanal'), km_semana=Sum(KM_SEMANA)
+    ).order_by():
+        km_semana = float(linha['km_semana'] or 0)
+        perfis[linha['moto_id']] = {
+            'rotas': linha['rotas'],
+            'viagens_semana': linha['viagens_semana'],
+            'km_semana': round(km_semana, 2),
+            'km_dia': round(km_semana / 7, 2),
+            **{dimensao: {} for dimensao in DIMENSOES_USO},
+        }
+
+    km_frota = {dimensao: defaultdict(float) for dimensao in DIMENSOES_USO}
+    for dimensao in DIMENSOES_USO:
+        for linha in rotas.values('moto_id', dimensao).annotate(km=Sum(KM_SEMANA)).order_by():
+            km = float(linha['km'] or 0)
+            km_frota[dimensao][linha[dimensao]] += km
+            perfil = perfis[linha['moto_id']]
+            if perfil['km_semana']:
+                perfil[dimensao][linha[dimensao]] = round(km / perfil['km_semana'], 4)
+
+    km_total = sum(perfil['km_semana'] for perfil in perfis.values())
+    resumo = {
+        'motos_com_rotas': len(perfis),
+        'rotas': sum(perfil['rotas'] for perfil in perfis.values()),
+        'km_semana': round(km_total, 2),
+        **{
+            dimensao: {valor: round(km / km_total, 4) for valor, km in km_frota[dimensao].items()} if km_total else {}
+            for dimensao in DIMENSOES_USO
+        },
+    }
+    return UsoFrota(perfis, resumo)
+
+
+_uso = CacheVersionado(VERSAO_ROTAS, _construir_uso)
+
+
+class UsoRotasService:
+    """Leitura dos perfis de uso semanal (calculados uma vez por versão)"""
+
+    @staticmethod
+    def perfis(moto_ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+        """Perfis das motos pedidas; motos sem rotas ativas recebem o perfil vazio"""
+        uso = _uso.obter()
+        return {moto_id: uso.perfil(moto_id) for moto_id in moto_ids}
+
+    @staticmethod
+    def perfil(moto_id: int) -> Dict[str, Any]:
+        return _uso.obter().perfil(moto_id)
+
+    @staticmethod
+    def frota() -> Dict[str, Any]:
+        """Totais da frota e a mesma divisão por via, condição e clima"""
+        return _uso.obter().resumo
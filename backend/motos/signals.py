@@ -0,0 +1,38 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+from .models import Moto, Rota
+from .services.busca_service import CAMPOS_INDEXADOS, BuscaMotoService
+from .services.estatisticas_service import invalidar_estatisticas
+from .services.uso_service import invalidar_uso
+
+
+@receiver(post_save, sender=Moto)
+@receiver(post_delete, sender=Moto)
+def moto_alterada(sender, **kwargs):
+    """Invalida as estatísticas e os perfis de uso em cache"""
+    invalidar_estatisticas()
+    # Motos desativadas saem do perfil de uso da frota
+    invalidar_uso()
+
+
+@receiver(post_save, sender=Rota)
+@receiver(post_delete, sender=Rota)
+def rota_alterada(sender, instance, raw=False, **kwargs):
+    """Invalida os perfis de uso semanal em cache e marca a moto como alterada"""
+    invalidar_uso()
+    if raw:
+        return
+    # Os km das rotas entram nas datas do plano de manutenção: o gerador
+    # incremental reprocessa as motos com atualizado_em novo. update() não
+    # dispara o post_save de Moto
+    Moto.objects.filter(pk=instance.moto_id).update(atualizado_em=timezone.now())
+
+
+@receiver(post_save, sender=Moto)
+def moto_salva_indexar(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Mantém o índice de trigramas da busca atualizado"""
+    if raw:
+        return
+    if update_fields is None or {*CAMPOS_INDEXADOS, 'criado_por'} & set(update_fields):
+        BuscaMotoService.indexar(instance)
@@ -0,0 +1,219 @@
+"""
+Ingestão de telemetria (leituras de hodômetro) com escrita adiada.
+
+As leituras recebidas ficam em um buffer do processo, agrupadas por moto:
+guarda-se o maior km e uma amostra do histórico (no máximo uma leitura por
+intervalo de amostragem). Uma thread grava o buffer a cada intervalo com um
+bulk_create das leituras e um UPDATE em lote do km_atual, em vez de uma
+requisição, uma leitura e um save() por ping.
+
+Leituras ainda no buffer se perdem se o processo morrer antes do próximo
+flush (no máximo TELEMETRIA_INTERVALO_FLUSH segundos). Um lote que falha é
+gravado moto a moto; as motos que ainda falham voltam ao buffer e só são
+descartadas, com log, depois de MAXIMO_TENTATIVAS flushes.
+"""
+import atexit
+import logging
+import threading
+from datetime import timedelta
+from typing import Dict, List, Tuple
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Case, F, PositiveIntegerField, Q, Value, When
+from django.utils import timezone
+from .models import Moto, LeituraKm
+from .services.estatisticas_service import invalidar_estatisticas
+
+
+logger = logging.getLogger(__name__)
+
+TAMANHO_LOTE = 500
+
+MAXIMO_TENTATIVAS = 3
+
+
+class _Pendente:
+    """Leituras de uma moto aguardando o flush"""
+
+    __slots__ = ('km_maximo', 'lida_em_maximo', 'amostras', 'tentativas')
+
+    def __init__(self):
+        self.km_maximo = -1
+        self.lida_em_maximo = None
+        self.amostras: List[Tuple] = []
+        self.tentativas = 0
+
+    def juntar(self, outro: '_Pendente') -> None:
+        """Incorpora as leituras de `outro` (devolvido ao buffer após uma falha)"""
+        if outro.km_maximo > self.km_maximo:
+            self.km_maximo = outro.km_maximo
+            self.lida_em_maximo = outro.lida_em_maximo
+        self.amostras = sorted(set(self.amostras) | set(outro.amostras))
+        self.tentativas = max(self.tentativas, outro.tentativas)
+
+
+class BufferTelemetria:
+    """Buffer de escrita adiada das leituras de telemetria"""
+
+    def __init__(self, intervalo: float, amostragem: timedelta, limite: int):
+        self.intervalo = intervalo
+        self.amostragem = amostragem
+        self.limite = limite
+        self._pendentes: Dict[int, _Pendente] = {}
+        self._total = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._acordar = threading.Event()
+        self._thread = None
+
+    def adicionar(self, leituras) -> int:
+        """Agrupa leituras (moto_id, lida_em, km) no buffer; retorna quantas entraram"""
+        with self._lock:
+            for moto_id, lida_em, km in leituras:
+                pendente = self._pendentes.get(moto_id)
+                if pendente is None:
+                    pendente = self._pendentes[moto_id] = _Pendente()
+                if km > pendente.km_maximo:
+                    pendente.km_maximo = km
+                    pendente.lida_em_maximo = lida_em
+                if not pendente.amostras or abs(lida_em - pendente.amostras[-1][0]) >= self.amostragem:
+                    pendente.amostras.append((lida_em, km))
+                self._total += 1
+            cheio = self._total >= self.limite
+        self._iniciar()
+        if cheio:
+            self._acordar.set()
+        return len(leituras)
+
+    def _iniciar(self):
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._executar, name='telemetria-flush', daemon=True)
+                    self._thread.start()
+
+    def _executar(self):
+        while True:
+            self._acordar.wait(self.intervalo)
+            self._acordar.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Falha ao gravar o buffer de telemetria')
+            finally:
+                connection.close()
+
+    def flush(self) -> Dict[str, int]:
+        """Grava o conteúdo atual do buffer"""
+        with self._flush_lock:
+            with self._lock:
+                pendentes, self._pendentes = self._pendentes, {}
+                self._total = 0
+            if not pendentes:
+                return {'motos': 0, 'leituras': 0, 'atualizadas': 0}
+
+            resultado = {'motos': 0, 'leituras': 0, 'atualizadas': 0}
+            ids = list(pendentes)
+            for inicio in range(0, len(ids), TAMANHO_LOTE):
+                lote = {moto_id: pendentes[moto_id] for moto_id in ids[inicio:inicio + TAMANHO_LOTE]}
+                try:
+                    parciais = [self._gravar_lote(lote)]
+                except Exception:
+                    logger.exception('Telemetria: falha ao gravar lote de %s moto(s); gravando moto a moto', len(lote))
+                    parciais = self._gravar_separadamente(lote)
+                for parcial in parciais:
+                    for chave in resultado:
+                        resultado[chave] += parcial[chave]
+
+            if resultado['atualizadas']:
+                # UPDATE direto não dispara o post_save de Moto
+                invalidar_estatisticas()
+            return resultado
+
+    def _gravar_separadamente(self, lote: Dict[int, _Pendente]) -> List[Dict[str, int]]:
+        """Isola as motos que fazem o lote falhar; as demais são gravadas"""
+        parciais, falhas = [], {}
+        for moto_id, pendente in lote.items():
+            try:
+                parciais.append(self._gravar_lote({moto_id: pendente}))
+            except Exception as e:
+                pendente.tentativas += 1
+                if pendente.tentativas >= MAXIMO_TENTATIVAS:
+                    logger.error('Telemetria: %s leitura(s) da moto %s descartada(s) após %s tentativas: %s',
+                                 len(pendente.amostras), moto_id, pendente.tentativas, e)
+                else:
+                    falhas[moto_id] = pendente
+        if falhas:
+            self._devolver(falhas)
+        return parciais
+
+    def _devolver(self, pendentes: Dict[int, _Pendente]) -> None:
+        """Recoloca leituras não gravadas no buffer para o próximo flush"""
+        with self._lock:
+            for moto_id, pendente in pendentes.items():
+                atual = self._pendentes.get(moto_id)
+                if atual is None:
+                    self._pendentes[moto_id] = pendente
+                else:
+                    atual.juntar(pendente)
+                self._total += len(pendente.amostras)
+
+    def _gravar_lote(self, lote: Dict[int, _Pendente]) -> Dict[str, int]:
+        agora = timezone.now()
+        km_atuais = dict(
+            Moto.objects.filter(pk__in=lote.keys(), ativo=True).values_list('id', 'km_atual')
+        )
+        descartadas = len(lote) - len(km_atuais)
+        if descartadas:
+            logger.warning('Telemetria: %s moto(s) inexistente(s) ou inativa(s) ignorada(s)', descartadas)
+
+        leituras = []
+        avancos = {}
+        for moto_id, km_atual in km_atuais.items():
+            pendente = lote[moto_id]
+            amostras = pendente.amostras
+            if (pendente.lida_em_maximo, pendente.km_maximo) not in amostras:
+                amostras.append((pendente.lida_em_maximo, pendente.km_maximo))
+            for lida_em, km in amostras:
+                leituras.append(LeituraKm(
+                    moto_id=moto_id, km=km, aceita=km >= km_atual, origem='telemetria', lida_em=lida_em
+                ))
+            if pendente.km_maximo > km_atual:
+                avancos[moto_id] = pendente.km_maximo
+
+        with transaction.atomic():
+            LeituraKm.objects.bulk_create(leituras, batch_size=TAMANHO_LOTE)
+            atualizadas = 0
+            if avancos:
+                # Um UPDATE para o lote; o km_atual__lt no WHEN mantém o
+                # hodômetro monotônico mesmo com gravações concorrentes
+                atualizadas = Moto.objects.filter(pk__in=avancos.keys()).update(
+                    km_atual=Case(
+                        *[When(Q(pk=moto_id) & Q(km_atual__lt=km), then=Value(km)) for moto_id, km in avancos.items()],
+                        default=F('km_atual'),
+                        output_field=PositiveIntegerField(),
+                    ),
+                    atualizado_em=agora,
+                )
+
+        return {'motos': len(km_atuais), 'leituras': len(leituras), 'atualizadas': atualizadas}
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def obter_buffer() -> BufferTelemetria:
+    """Buffer único do processo (criado no primeiro uso)"""
+    global _buffer
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                _buffer = BufferTelemetria(
+                    intervalo=settings.TELEMETRIA_INTERVALO_FLUSH,
+                    amostragem=timedelta(seconds=settings.TELEMETRIA_AMOSTRAGEM),
+                    limite=settings.TELEMETRIA_LIMITE_BUFFER,
+                )
+                atexit.register(_buffer.flush)
+    return _buffer
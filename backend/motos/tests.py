@@ -1,3 +1,104 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .models import LeituraKm, Moto
+from .telemetria import MAXIMO_TENTATIVAS, BufferTelemetria
+
+
+class BufferTelemetriaTests(TestCase):
+    """Uma leitura que o banco recusa não pode levar junto as demais do buffer"""
+
+    def setUp(self):
+        self.usuario = User.objects.create_user('telemetria', password='senha')
+        self.moto = Moto.objects.create(
+            modelo='CG 160', marca='Honda', ano_inicio=2022, km_atual=100, criado_por=self.usuario
+        )
+        # Sem flush automático durante o teste
+        self.buffer = BufferTelemetria(intervalo=3600, amostragem=timedelta(minutes=1), limite=10 ** 6)
+
+    def test_lote_com_leitura_invalida_grava_as_validas(self):
+        agora = timezone.now()
+        self.buffer.adicionar([(self.moto.pk, agora, 500), (10 ** 20, agora, 5)])
+
+        with self.assertLogs('motos.telemetria', level='ERROR'):
+            resultado = self.buffer.flush()
+
+        self.moto.refresh_from_db()
+        self.assertEqual(self.moto.km_atual, 500)
+        self.assertEqual(LeituraKm.objects.filter(moto=self.moto, origem='telemetria').count(), 1)
+        self.assertEqual(resultado['atualizadas'], 1)
+        # A leitura recusada volta ao buffer para a próxima tentativa
+        self.assertEqual(list(self.buffer._pendentes), [10 ** 20])
+
+    def test_leitura_recusada_e_descartada_apos_tentativas(self):
+        self.buffer.adicionar([(10 ** 20, timezone.now(), 5)])
+
+        with self.assertLogs('motos.telemetria', level='ERROR') as logs:
+            for _ in range(MAXIMO_TENTATIVAS):
+                self.buffer.flush()
+
+        self.assertIn('descartada', logs.output[-1])
+        self.assertEqual(self.buffer._pendentes, {})
+
+
+class TelemetriaAPITests(TestCase):
+
+    def setUp(self):
+        self.usuario = User.objects.create_user('telemetria', password='senha')
+        self.moto = Moto.objects.create(
+            modelo='CG 160', marca='Honda', ano_inicio=2022, km_atual=100, criado_por=self.usuario
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.usuario)
+        # Buffer do teste, em vez do buffer do processo (gravado no atexit)
+        self.buffer = BufferTelemetria(intervalo=3600, amostragem=timedelta(minutes=1), limite=10 ** 6)
+        patcher = mock.patch('motos.api_views.obter_buffer', return_value=self.buffer)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_recusa_moto_e_km_fora_da_faixa_das_colunas(self):
+        agora = timezone.now().isoformat()
+        resposta = self.client.post(reverse('api_telemetria'), [
+            {'moto_id': self.moto.pk, 'timestamp': agora, 'km': 500},
+            {'moto_id': 10 ** 20, 'timestamp': agora, 'km': 5},
+            {'moto_id': self.moto.pk, 'timestamp': agora, 'km': 10 ** 12},
+        ], format='json')
+
+        self.assertEqual(resposta.status_code, 202)
+        self.assertEqual(resposta.data['data']['aceitas'], 1)
+        self.assertEqual([erro['indice'] for erro in resposta.data['data']['erros']], [1, 2])
+        self.assertEqual(list(self.buffer._pendentes), [self.moto.pk])
+
+
+class DocumentosUnicosTests(TestCase):
+    """Placa, chassi e renavam não se repetem entre as motos ativas de um usuário"""
+
+    def setUp(self):
+        self.usuario = User.objects.create_user('dono', password='senha')
+        self.outro = User.objects.create_user('outro', password='senha')
+        Moto.objects.create(
+            modelo='CG 160', marca='Honda', ano_inicio=2022, placa='ABC-1D23', criado_por=self.usuario
+        )
+        self.client = APIClient()
+
+    def _criar(self, usuario, placa):
+        self.client.force_authenticate(usuario)
+        return self.client.post(reverse('moto-list'), {
+            'modelo': 'Fazer 250', 'marca': 'Yamaha', 'ano_inicio': 2023, 'placa': placa,
+        }, format='json')
+
+    def test_recusa_placa_repetida_do_mesmo_usuario(self):
+        resposta = self._criar(self.usuario, 'abc1d23')
+        self.assertEqual(resposta.status_code, 400)
+        self.assertIn('placa', resposta.data)
 
-# Create your tests here.
+    def test_aceita_mesma_placa_em_outra_conta(self):
+        resposta = self._criar(self.outro, 'ABC1D23')
+        self.assertEqual(resposta.status_code, 201)
+        self.assertEqual(Moto.objects.filter(placa_normalizada='abc1d23').count(), 2)
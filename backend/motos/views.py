@@ -1,11 +1,12 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.http import JsonResponse
+from django.http import Http404, JsonResponse
 from django.views.decorators.http import require_POST
 from .models import Moto, PerfilMoto, Rota
 from .forms import MotoForm, PerfilMotoForm, RotaForm
 from .controllers.moto_controller import MotoController
+from .services.quilometragem_service import QuilometragemService
 
 
 # Reutilizando as views antigas para manter compatibilidade
@@ -102,7 +103,8 @@ def api_moto_detalhes(request, moto_id):
         'id': moto.id,
         'modelo': moto.modelo,
         'marca': moto.marca,
-        'ano': moto.ano,
+        'ano_inicio': moto.ano_inicio,
+        'ano_fim': moto.ano_fim,
         'km_atual': moto.km_atual,
         'km_compra': moto.km_compra,
         'cor': moto.cor,
@@ -130,21 +132,26 @@ def api_atualizar_km(request, moto_id):
     if request.method != 'POST':
         return JsonResponse({'error': 'Método não permitido'}, status=405)
 
-    moto = get_object_or_404(Moto, id=moto_id, criado_por=request.user)
-
     try:
         novo_km = int(request.POST.get('km_atual'))
-        if novo_km < moto.km_atual:
-            return JsonResponse({'error': 'Novo KM não pode ser menor que o atual'}, status=400)
-
-        moto.km_atual = novo_km
-        moto.save()
-
-        return JsonResponse({
-            'success': True,
-            'km_atual': moto.km_atual,
-            'km_total_percorridos': moto.km_total_percorridos
-        })
-
+        if novo_km < 0:
+            raise ValueError
+        resultado = QuilometragemService.registrar_leitura(
+            moto_id, novo_km, origem='manual', usuario=request.user, filtros={'criado_por': request.user}
+        )
+    except Moto.DoesNotExist:
+        raise Http404
     except (ValueError, TypeError):
         return JsonResponse({'error': 'Valor de KM inválido'}, status=400)
+
+    if resultado['km_atual'] > novo_km:
+        return JsonResponse({
+            'error': 'Novo KM não pode ser menor que o atual',
+            'km_atual': resultado['km_atual']
+        }, status=400)
+
+    return JsonResponse({
+        'success': True,
+        'km_atual': resultado['km_atual'],
+        'km_total_percorridos': resultado['km_total_percorridos']
+    })